@@ -1,5 +1,15 @@
-
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
 
 class PharmacyManagementAppConfig(AppConfig):
-    name = 'pharmacy_management_app'
\ No newline at end of file
+    name = 'pharmacy_management_app'
+
+    def ready(self):
+        from .services.autocomplete_service import connect_autocomplete_index
+        from .services.cache_service import connect_cache_invalidation
+        from .services.search_service import ensure_sqlite_search_triggers
+        from .services.user_service import connect_user_cache_invalidation
+        post_migrate.connect(ensure_sqlite_search_triggers, sender=self)
+        connect_cache_invalidation()
+        connect_autocomplete_index()
+        connect_user_cache_invalidation()
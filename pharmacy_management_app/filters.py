@@ -0,0 +1,40 @@
+import django_filters
+from rest_framework.filters import OrderingFilter
+from .models.purchase import Purchase
+from .models.product import Product
+from .models.suppliers import Suppliers
+
+class PurchaseFilter(django_filters.FilterSet):
+    purchased_after = django_filters.IsoDateTimeFilter(field_name='purchase_date', lookup_expr='gte')
+    purchased_before = django_filters.IsoDateTimeFilter(field_name='purchase_date', lookup_expr='lt')
+
+    class Meta:
+        model = Purchase
+        fields = ['product', 'purchased_after', 'purchased_before']
+
+class ProductFilter(django_filters.FilterSet):
+    min_price = django_filters.NumberFilter(field_name='price', lookup_expr='gte')
+    max_price = django_filters.NumberFilter(field_name='price', lookup_expr='lte')
+
+    class Meta:
+        model = Product
+        fields = ['name', 'supplier', 'min_price', 'max_price']
+
+class SupplierFilter(django_filters.FilterSet):
+    name = django_filters.CharFilter(field_name='name', lookup_expr='icontains')
+    contact_info = django_filters.CharFilter(field_name='contact_info', lookup_expr='icontains')
+    created_after = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='gte')
+    created_before = django_filters.IsoDateTimeFilter(field_name='created_at', lookup_expr='lt')
+
+    class Meta:
+        model = Suppliers
+        fields = ['name', 'contact_info', 'created_after', 'created_before']
+
+class StableOrderingFilter(OrderingFilter):
+    """Appends the primary key so pages stay stable when many rows share the sort value."""
+
+    def get_ordering(self, request, queryset, view):
+        ordering = super().get_ordering(request, queryset, view)
+        if ordering and not {'id', '-id', 'pk', '-pk'} & set(ordering):
+            ordering = list(ordering) + ['id']
+        return ordering
@@ -0,0 +1,51 @@
+import random
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.models.suppliers import Suppliers
+from pharmacy_management_app.services.autocomplete_service import product_name_index, suggest_from_database
+from pharmacy_management_app.management.commands.benchmark_product_search import WORDS
+
+class Command(BaseCommand):
+    help = 'Compare autocomplete latency of the in-process name index and the database fallback'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Products to generate (e.g. 1000000)')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=200)
+
+    def handle(self, *args, **kwargs):
+        rows = kwargs['rows']
+        rng = random.Random(42)
+        supplier = Suppliers.objects.create(name=f'Benchmark supplier {uuid.uuid4().hex[:8]}', contact_info='benchmark')
+        try:
+            self.stdout.write(f'Inserting {rows} products...')
+            for start in range(0, rows, kwargs['batch_size']):
+                with transaction.atomic():
+                    Product.objects.bulk_create([
+                        Product(name=' '.join(rng.sample(WORDS, 3)) + f' {start + i}', description='benchmark',
+                                cost_price=1, quantity=0, supplier=supplier)
+                        for i in range(min(kwargs['batch_size'], rows - start))
+                    ])
+
+            started = time.perf_counter()
+            product_name_index.rebuild()
+            self.stdout.write(f'Index built in {time.perf_counter() - started:.2f}s')
+
+            prefixes = ['i', 'ibu', 'vitamin t', 'Chewable Children', 'zzz']
+            self.stdout.write(f'{"prefix":<20} {"index ms":>10} {"database ms":>12}')
+            for prefix in prefixes:
+                medians = []
+                for fetch in (lambda: product_name_index.suggest(prefix, 10),
+                              lambda: suggest_from_database(prefix, 10)):
+                    timings = []
+                    for _ in range(kwargs['repeat']):
+                        started = time.perf_counter()
+                        fetch()
+                        timings.append((time.perf_counter() - started) * 1000)
+                    medians.append(sorted(timings)[len(timings) // 2])
+                self.stdout.write(f'{prefix:<20} {medians[0]:>10.3f} {medians[1]:>12.2f}')
+        finally:
+            supplier.delete()
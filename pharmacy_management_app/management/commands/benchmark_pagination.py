@@ -0,0 +1,60 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.models.suppliers import Suppliers
+from pharmacy_management_app.pagination import ListPagination
+
+class Command(BaseCommand):
+    help = 'Compare deep-page latency of exact-count, estimated-count and cursor pagination on the product list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Products to generate (e.g. 1000000)')
+        parser.add_argument('--page', type=int, default=1000)
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **kwargs):
+        rows, page, page_size = kwargs['rows'], kwargs['page'], kwargs['page_size']
+        if (page - 1) * page_size >= rows:
+            self.stderr.write(f'Page {page} is past the end of {rows} rows.')
+            return
+        supplier = Suppliers.objects.create(name=f'Benchmark supplier {uuid.uuid4().hex[:8]}', contact_info='benchmark')
+        try:
+            self.stdout.write(f'Inserting {rows} products...')
+            for start in range(0, rows, kwargs['batch_size']):
+                with transaction.atomic():
+                    Product.objects.bulk_create([
+                        Product(name=f'Benchmark {start + i}', description='benchmark', cost_price=1,
+                                quantity=0, supplier=supplier)
+                        for i in range(min(kwargs['batch_size'], rows - start))
+                    ])
+
+            queryset = Product.objects.order_by('id')
+            anchor = queryset.values_list('id', flat=True)[(page - 1) * page_size - 1] if page > 1 else None
+            cursor_params = {'pagination': 'cursor', 'page_size': page_size}
+            if anchor is not None:
+                cursor_params['cursor'] = ListPagination.cursor_pagination_class().encode_cursor([anchor])
+            modes = [
+                ('exact count', {'page': page, 'page_size': page_size}),
+                ('estimated count', {'page': page, 'page_size': page_size, 'count': 'estimated'}),
+                ('cursor', cursor_params),
+            ]
+            factory = APIRequestFactory()
+            self.stdout.write(f'{"mode":<18} {"median ms":>10}  (page {page}, {page_size} rows per page)')
+            for name, params in modes:
+                request = Request(factory.get('/api/products/', params, SERVER_NAME='localhost'))
+                timings = []
+                for _ in range(kwargs['repeat']):
+                    started = time.perf_counter()
+                    paginator = ListPagination()
+                    results = paginator.paginate_queryset(queryset, request)
+                    paginator.get_paginated_response([product.pk for product in results])
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(f'{name:<18} {sorted(timings)[len(timings) // 2]:>10.2f}')
+        finally:
+            supplier.delete()
@@ -0,0 +1,51 @@
+import random
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.models.suppliers import Suppliers
+from pharmacy_management_app.services.search_service import search_product_ids
+
+WORDS = [
+    'ibuprofen', 'paracetamol', 'amoxicillin', 'vitamin', 'zinc', 'omeprazole', 'loratadine', 'cetirizine',
+    'tablet', 'capsule', 'syrup', 'cream', 'drops', 'spray', 'relief', 'pain', 'allergy', 'immune', 'support',
+    'children', 'extra', 'strength', 'chewable', 'coated', 'sugar', 'free', 'night', 'daily', 'fast', 'acting',
+]
+
+class Command(BaseCommand):
+    help = 'Measure ranked product search latency against a large synthetic catalog'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Products to generate (e.g. 1000000)')
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **kwargs):
+        rows = kwargs['rows']
+        rng = random.Random(42)
+        supplier = Suppliers.objects.create(name=f'Benchmark supplier {uuid.uuid4().hex[:8]}', contact_info='benchmark')
+        try:
+            self.stdout.write(f'Inserting {rows} products...')
+            for start in range(0, rows, kwargs['batch_size']):
+                with transaction.atomic():
+                    Product.objects.bulk_create([
+                        Product(
+                            name=' '.join(rng.sample(WORDS, 3)) + f' {start + i}',
+                            description=' '.join(rng.choices(WORDS, k=12)),
+                            cost_price=1, quantity=0, supplier=supplier,
+                        )
+                        for i in range(min(kwargs['batch_size'], rows - start))
+                    ])
+
+            queries = ['ibuprofen', 'vitamin tablet', 'amoxicilin', 'chewable children allergy', 'paracet']
+            self.stdout.write(f'{"query":<28} {"hits":>6} {"median ms":>10}')
+            for query in queries:
+                hits, timings = 0, []
+                for _ in range(kwargs['repeat']):
+                    started = time.perf_counter()
+                    hits = len(search_product_ids(query, limit=20))
+                    timings.append((time.perf_counter() - started) * 1000)
+                self.stdout.write(f'{query:<28} {hits:>6} {sorted(timings)[len(timings) // 2]:>10.2f}')
+        finally:
+            supplier.delete()
@@ -0,0 +1,64 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.models.purchase import Purchase
+from pharmacy_management_app.models.suppliers import Suppliers
+from pharmacy_management_app.models.user import User
+from pharmacy_management_app.pagination import KeysetPagination
+from pharmacy_management_app.services.purchase_service import get_user_purchases
+
+class Command(BaseCommand):
+    help = 'Compare keyset and OFFSET pagination latency on a large purchase history'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--rows', type=int, default=100000, help='Purchases to generate (e.g. 10000000)')
+        parser.add_argument('--page-size', type=int, default=20)
+        parser.add_argument('--batch-size', type=int, default=10000)
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **kwargs):
+        rows, page_size = kwargs['rows'], kwargs['page_size']
+        run_id = uuid.uuid4().hex[:8]
+        supplier = Suppliers.objects.create(name=f'Benchmark supplier {run_id}', contact_info='benchmark')
+        user = User.objects.create(email=f'bench-{run_id}@example.com', name='Benchmark')
+        try:
+            product = Product.objects.create(name='Benchmark product', description='benchmark', cost_price=1,
+                                             quantity=0, supplier=supplier)
+            self.stdout.write(f'Inserting {rows} purchases...')
+            for start in range(0, rows, kwargs['batch_size']):
+                with transaction.atomic():
+                    Purchase.objects.bulk_create([
+                        Purchase(user=user, product=product, quantity=1)
+                        for _ in range(min(kwargs['batch_size'], rows - start))
+                    ])
+
+            ordering = ('-purchase_date', '-id')
+            paginator = KeysetPagination()
+            paginator.ordering_fields = ordering
+            queryset = get_user_purchases(user).order_by(*ordering)
+            depth = 1
+            self.stdout.write(f'{"page":>10} {"offset ms":>12} {"keyset ms":>12}')
+            while depth * page_size < rows:
+                offset = depth * page_size
+                anchor = queryset[offset - 1]
+                position = paginator.get_position(anchor)
+                position = [Purchase._meta.get_field(f.lstrip('-')).to_python(v) for f, v in zip(ordering, position)]
+                offset_ms = self.measure(lambda: list(queryset[offset:offset + page_size]), kwargs['repeat'])
+                keyset_ms = self.measure(
+                    lambda: list(queryset.filter(paginator.position_filter(position))[:page_size]), kwargs['repeat']
+                )
+                self.stdout.write(f'{depth:>10} {offset_ms:>12.2f} {keyset_ms:>12.2f}')
+                depth *= 10
+        finally:
+            user.delete()
+            supplier.delete()
+
+    def measure(self, fetch, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            fetch()
+            timings.append((time.perf_counter() - started) * 1000)
+        return sorted(timings)[len(timings) // 2]
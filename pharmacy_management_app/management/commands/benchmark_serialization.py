@@ -0,0 +1,61 @@
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.models.suppliers import Suppliers
+from pharmacy_management_app.serializers.product import ProductSerializer
+from pharmacy_management_app.serializers.sparse import narrow_queryset, serialize_values
+
+class Command(BaseCommand):
+    help = 'Compare full, sparse and values() serialization of a product page'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--page-size', type=int, default=100)
+        parser.add_argument('--fields', default='id,name,price')
+        parser.add_argument('--repeat', type=int, default=50)
+
+    def handle(self, *args, **kwargs):
+        page_size = kwargs['page_size']
+        supplier = Suppliers.objects.create(name=f'Benchmark supplier {uuid.uuid4().hex[:8]}', contact_info='benchmark')
+        try:
+            Product.objects.bulk_create([
+                Product(name=f'Benchmark {i}', description='benchmark ' * 100, cost_price=i % 50 + 1,
+                        quantity=i, supplier=supplier)
+                for i in range(page_size)
+            ])
+            queryset = Product.objects.filter(supplier=supplier).order_by('id')
+            factory = APIRequestFactory()
+            full_request = Request(factory.get('/api/products/', SERVER_NAME='localhost'))
+            sparse_request = Request(factory.get('/api/products/', {'fields': kwargs['fields']}, SERVER_NAME='localhost'))
+
+            def full():
+                return ProductSerializer(list(queryset), many=True, context={'request': full_request}).data
+
+            def sparse_instances():
+                serializer = ProductSerializer(context={'request': sparse_request})
+                rows = list(queryset.only(*serializer.get_load_columns()))
+                return ProductSerializer(rows, many=True, context={'request': sparse_request}).data
+
+            def sparse_values():
+                serializer = ProductSerializer(context={'request': sparse_request})
+                if not serializer.uses_values_path:
+                    return sparse_instances()
+                return serialize_values(list(narrow_queryset(queryset, serializer)), serializer)
+
+            self.stdout.write(f'{"path":<28} {"median ms":>10}  ({page_size} rows, fields={kwargs["fields"]})')
+            baseline = None
+            for name, fetch in [('ModelSerializer, all fields', full),
+                                ('ModelSerializer + only()', sparse_instances),
+                                ('values() tuples', sparse_values)]:
+                timings = []
+                for _ in range(kwargs['repeat']):
+                    started = time.perf_counter()
+                    fetch()
+                    timings.append((time.perf_counter() - started) * 1000)
+                median = sorted(timings)[len(timings) // 2]
+                baseline = baseline or median
+                self.stdout.write(f'{name:<28} {median:>10.2f}  x{baseline / median:.1f}')
+        finally:
+            supplier.delete()
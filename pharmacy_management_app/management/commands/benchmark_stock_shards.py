@@ -0,0 +1,61 @@
+import threading
+import time
+import uuid
+from django.core.management.base import BaseCommand
+from django.db import connection
+from pharmacy_management_app.models.bank_account import BankAccount
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.models.suppliers import Suppliers
+from pharmacy_management_app.models.user import User
+from pharmacy_management_app.services.purchase_service import post_purchase
+from pharmacy_management_app.services.stock_service import enable_sharded_stock
+
+class Command(BaseCommand):
+    help = 'Compare purchase throughput on one hot product with single-row and sharded stock'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--threads', type=int, default=16)
+        parser.add_argument('--purchases', type=int, default=50, help='Purchases per thread')
+        parser.add_argument('--shards', type=int, default=16)
+
+    def handle(self, *args, **kwargs):
+        threads, purchases = kwargs['threads'], kwargs['purchases']
+        run_id = uuid.uuid4().hex[:8]
+        supplier = Suppliers.objects.create(name=f'Benchmark supplier {run_id}', contact_info='benchmark')
+        users = []
+        for index in range(threads):
+            user = User.objects.create(email=f'bench-{run_id}-{index}@example.com', name=f'Benchmark {index}')
+            BankAccount.objects.create(user=user, account_number=f'{run_id}{index:04d}', bank_name='Benchmark',
+                                       branch_code='000', account_type='Checking', balance=10 ** 7)
+            users.append(user)
+        try:
+            for label, shards in (('single-row', 0), (f'{kwargs["shards"]} shards', kwargs['shards'])):
+                product = Product.objects.create(name=f'Benchmark product {run_id}', description='benchmark',
+                                                 cost_price=1, profit_margin=0, quantity=threads * purchases,
+                                                 supplier=supplier)
+                if shards:
+                    enable_sharded_stock(product.pk, shards)
+                elapsed, sold = self.run(users, product.pk, purchases)
+                self.stdout.write(f'{label:>12}: {sold} purchases in {elapsed:.2f}s ({sold / elapsed:.1f}/s)')
+        finally:
+            supplier.delete()
+            User.objects.filter(pk__in=[user.pk for user in users]).delete()
+
+    def run(self, users, product_id, purchases):
+        sold = []
+
+        def worker(user):
+            try:
+                for _ in range(purchases):
+                    post_purchase(user=user, product_id=product_id, quantity=1)
+                    sold.append(1)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=worker, args=(user,)) for user in users]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        return time.perf_counter() - started, len(sold)
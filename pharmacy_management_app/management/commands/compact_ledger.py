@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from pharmacy_management_app.services.bank_account_service import compact_ledger, get_accounts_to_compact
+
+class Command(BaseCommand):
+    help = 'Fold bank ledger entries into a new balance snapshot for each account'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--min-entries', type=int, default=1, help='Only compact accounts with at least this many pending entries')
+
+    def handle(self, *args, **kwargs):
+        compacted = 0
+        for bank_account_id in list(get_accounts_to_compact(kwargs['min_entries'])):
+            if compact_ledger(bank_account_id):
+                compacted += 1
+        self.stdout.write(self.style.SUCCESS(f'Compacted {compacted} bank accounts'))
@@ -0,0 +1,18 @@
+import time
+from django.core.management.base import BaseCommand
+from pharmacy_management_app.services.reservation_service import expire_reservations
+
+class Command(BaseCommand):
+    help = 'Release stock held by reservations whose TTL has expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=500)
+        parser.add_argument('--interval', type=int, default=0, help='Keep sweeping every N seconds instead of running once')
+
+    def handle(self, *args, **kwargs):
+        while True:
+            expired = expire_reservations(batch_size=kwargs['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Expired {expired} reservations'))
+            if not kwargs['interval']:
+                break
+            time.sleep(kwargs['interval'])
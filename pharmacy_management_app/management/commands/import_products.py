@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from pharmacy_management_app.services.product_service import import_products_csv
+
+class Command(BaseCommand):
+    help = 'Stream a supplier catalog CSV into the products table in chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--chunk-size', type=int, default=1000)
+        parser.add_argument('--no-update', action='store_true', help='Always create products instead of updating matches')
+
+    def handle(self, *args, **kwargs):
+        try:
+            with open(kwargs['path'], encoding='utf-8-sig', newline='') as file:
+                result = import_products_csv(
+                    file,
+                    chunk_size=kwargs['chunk_size'],
+                    update_existing=not kwargs['no_update']
+                )
+        except (OSError, ValueError) as e:
+            raise CommandError(str(e))
+        for error in result.errors:
+            self.stderr.write(f"line {error['line']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {result.created}, updated {result.updated}, failed {result.failed} products'
+        ))
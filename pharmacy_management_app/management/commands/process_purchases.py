@@ -0,0 +1,46 @@
+import threading
+from django.core.management.base import BaseCommand
+from django.db import connection
+from pharmacy_management_app.services.purchase_job_service import process_pending_jobs
+
+class Command(BaseCommand):
+    help = 'Run worker threads that process queued purchase jobs'
+    BATCH_SIZE = 50
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4)
+        parser.add_argument('--poll-interval', type=float, default=1.0)
+        parser.add_argument('--once', action='store_true', help='Exit once the queue is drained')
+
+    def handle(self, *args, **kwargs):
+        self.processed = 0
+        self.lock = threading.Lock()
+        self.stop = threading.Event()
+        workers = [
+            threading.Thread(target=self.work, args=(kwargs['poll_interval'], kwargs['once']), daemon=True)
+            for _ in range(kwargs['workers'])
+        ]
+        for worker in workers:
+            worker.start()
+        try:
+            for worker in workers:
+                while worker.is_alive():
+                    worker.join(timeout=0.5)
+        except KeyboardInterrupt:
+            self.stop.set()
+            for worker in workers:
+                worker.join()
+        self.stdout.write(self.style.SUCCESS(f'Processed {self.processed} purchase jobs'))
+
+    def work(self, poll_interval, once):
+        try:
+            while not self.stop.is_set():
+                processed = process_pending_jobs(limit=self.BATCH_SIZE)
+                with self.lock:
+                    self.processed += processed
+                if not processed:
+                    if once:
+                        return
+                    self.stop.wait(poll_interval)
+        finally:
+            connection.close()
@@ -0,0 +1,42 @@
+import csv
+import json
+from django.core.management.base import BaseCommand, CommandError
+from pharmacy_management_app.services.user_provisioning_service import PROVISION_BATCH_SIZE, provision_users
+
+TRUE_VALUES = {'1', 'true', 'yes', 'y'}
+
+class Command(BaseCommand):
+    help = 'Create user accounts in bulk from a CSV (email,name,password[,is_staff]) or a JSON list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--batch-size', type=int, default=PROVISION_BATCH_SIZE)
+        parser.add_argument('--workers', type=int, default=None, help='Hashing processes, defaults to the CPU count')
+
+    def read_rows(self, path: str) -> list:
+        with open(path, encoding='utf-8-sig', newline='') as file:
+            if path.endswith('.json'):
+                rows = json.load(file)
+                if not isinstance(rows, list):
+                    raise ValueError('Expected a JSON list of users')
+                return rows
+            rows = []
+            for row in csv.DictReader(file):
+                if 'is_staff' in row:
+                    row['is_staff'] = (row['is_staff'] or '').strip().lower() in TRUE_VALUES
+                rows.append(row)
+            return rows
+
+    def handle(self, *args, **kwargs):
+        try:
+            rows = self.read_rows(kwargs['path'])
+        except (OSError, ValueError, csv.Error) as e:
+            raise CommandError(str(e))
+        result = provision_users(rows, batch_size=kwargs['batch_size'], workers=kwargs['workers'])
+        for duplicate in result.duplicates:
+            self.stderr.write(f"row {duplicate['index']}: {duplicate['email']} already exists")
+        for error in result.errors:
+            self.stderr.write(f"row {error['index']}: {error['errors']}")
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {result.created}, skipped {result.skipped} duplicates, failed {result.failed} users'
+        ))
@@ -0,0 +1,12 @@
+from django.core.management.base import BaseCommand
+from pharmacy_management_app.services.idempotency_service import purge_expired_idempotency_keys
+
+class Command(BaseCommand):
+    help = 'Delete stored Idempotency-Key responses whose TTL has expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        deleted = purge_expired_idempotency_keys(batch_size=kwargs['batch_size'])
+        self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired idempotency keys'))
@@ -0,0 +1,37 @@
+import csv
+import json
+from django.core.management.base import BaseCommand
+from pharmacy_management_app.services.stock_service import get_reorder_list
+
+class Command(BaseCommand):
+    help = 'List products below their reorder level, grouped by supplier'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--supplier', type=int, help='Only report this supplier id')
+        parser.add_argument('--format', choices=['text', 'csv', 'json'], default='text')
+
+    def handle(self, *args, **kwargs):
+        suppliers = get_reorder_list(kwargs['supplier'])
+        if kwargs['format'] == 'json':
+            self.stdout.write(json.dumps(suppliers, indent=2))
+            return
+        if kwargs['format'] == 'csv':
+            writer = csv.writer(self.stdout)
+            writer.writerow(['supplier_id', 'supplier_name', 'product_id', 'product_name', 'quantity', 'reorder_level', 'order_quantity'])
+            for supplier in suppliers:
+                for product in supplier['products']:
+                    writer.writerow([
+                        supplier['supplier_id'], supplier['supplier_name'], product['id'], product['name'],
+                        product['quantity'], product['reorder_level'], product['order_quantity'],
+                    ])
+            return
+        if not suppliers:
+            self.stdout.write(self.style.SUCCESS('No products below their reorder level'))
+            return
+        for supplier in suppliers:
+            self.stdout.write(self.style.MIGRATE_HEADING(f"{supplier['supplier_name']} (#{supplier['supplier_id']})"))
+            for product in supplier['products']:
+                self.stdout.write(
+                    f"  #{product['id']:<8} {product['name'][:40]:<40} stock {product['quantity']:>6} / "
+                    f"reorder at {product['reorder_level']:>6}  order {product['order_quantity']:>6}"
+                )
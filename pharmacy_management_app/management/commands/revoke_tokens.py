@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from pharmacy_management_app.models.user import User
+from pharmacy_management_app.services.token_revocation_service import purge_expired_revocations, revoke_user_tokens
+
+class Command(BaseCommand):
+    help = 'Revoke every token issued so far to the given users, and/or purge revocations that have expired'
+
+    def add_arguments(self, parser):
+        parser.add_argument('emails', nargs='*')
+        parser.add_argument('--purge-expired', action='store_true')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, **kwargs):
+        emails = [User.objects.normalize_email(email) for email in kwargs['emails']]
+        if not emails and not kwargs['purge_expired']:
+            raise CommandError('Give at least one email or --purge-expired')
+        users = dict(User.objects.filter(email__in=emails).values_list('email', 'id'))
+        missing = [email for email in emails if email not in users]
+        if missing:
+            raise CommandError(f'Unknown users: {", ".join(missing)}')
+        for email in emails:
+            revoke_user_tokens(users[email])
+            self.stdout.write(f'Revoked tokens of {email}')
+        if kwargs['purge_expired']:
+            deleted = purge_expired_revocations(batch_size=kwargs['batch_size'])
+            self.stdout.write(self.style.SUCCESS(f'Deleted {deleted} expired revocations'))
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand, CommandError
+from pharmacy_management_app.models.product import Product
+from pharmacy_management_app.services.stock_service import enable_sharded_stock, disable_sharded_stock, get_sharded_quantity
+
+class Command(BaseCommand):
+    help = 'Split a product\'s stock across N counter rows, or fold it back into the product row'
+
+    def add_arguments(self, parser):
+        parser.add_argument('product_id', type=int)
+        parser.add_argument('--shards', type=int, default=8)
+        parser.add_argument('--disable', action='store_true')
+
+    def handle(self, *args, **kwargs):
+        try:
+            if kwargs['disable']:
+                product = disable_sharded_stock(kwargs['product_id'])
+                self.stdout.write(self.style.SUCCESS(f'Disabled sharded stock for {product.name} ({product.quantity} units)'))
+            else:
+                product = enable_sharded_stock(kwargs['product_id'], kwargs['shards'])
+                self.stdout.write(self.style.SUCCESS(
+                    f'Split stock for {product.name} across {product.stock_shards} shards ({get_sharded_quantity(product)} units)'
+                ))
+        except Product.DoesNotExist:
+            raise CommandError('Product not found')
+        except ValueError as e:
+            raise CommandError(str(e))
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:44
+
+import django.db.models.functions.text
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy_management_app', '0011_purchase_history_indexes'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(models.F('supplier'), django.db.models.functions.text.Lower('name'), name='product_supplier_lname_idx'),
+        ),
+    ]
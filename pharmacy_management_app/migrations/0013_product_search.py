@@ -0,0 +1,66 @@
+from django.db import migrations
+
+PRODUCT_TABLE = 'pharmacy_management_app_product'
+SEARCH_TABLE = 'pharmacy_management_app_product_search'
+
+POSTGRES_FORWARD = [
+    'CREATE EXTENSION IF NOT EXISTS pg_trgm',
+    f"""ALTER TABLE {PRODUCT_TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(description, '')), 'B')
+    ) STORED""",
+    f'CREATE INDEX product_search_vector_idx ON {PRODUCT_TABLE} USING gin (search_vector)',
+    f'CREATE INDEX product_name_trgm_idx ON {PRODUCT_TABLE} USING gin (name gin_trgm_ops)',
+]
+
+POSTGRES_REVERSE = [
+    'DROP INDEX IF EXISTS product_name_trgm_idx',
+    'DROP INDEX IF EXISTS product_search_vector_idx',
+    f'ALTER TABLE {PRODUCT_TABLE} DROP COLUMN IF EXISTS search_vector',
+]
+
+# External-content FTS5 table: it stores only the index, the triggers keep it in step with the product rows.
+SQLITE_FORWARD = [
+    f"""CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        name, description, content='{PRODUCT_TABLE}', content_rowid='id', tokenize='porter unicode61 remove_diacritics 2'
+    )""",
+    f"""CREATE TRIGGER product_search_ai AFTER INSERT ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"""CREATE TRIGGER product_search_ad AFTER DELETE ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    f"""CREATE TRIGGER product_search_au AFTER UPDATE OF name, description ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+
+SQLITE_REVERSE = [
+    'DROP TRIGGER IF EXISTS product_search_au',
+    'DROP TRIGGER IF EXISTS product_search_ad',
+    'DROP TRIGGER IF EXISTS product_search_ai',
+    f'DROP TABLE IF EXISTS {SEARCH_TABLE}',
+]
+
+def run_statements(forward):
+    def operation(apps, schema_editor):
+        vendor = schema_editor.connection.vendor
+        statements = {'postgresql': POSTGRES_FORWARD, 'sqlite': SQLITE_FORWARD}
+        if not forward:
+            statements = {'postgresql': POSTGRES_REVERSE, 'sqlite': SQLITE_REVERSE}
+        for statement in statements.get(vendor, []):
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy_management_app', '0012_product_import_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(run_statements(True), run_statements(False)),
+    ]
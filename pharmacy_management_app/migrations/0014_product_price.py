@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 14:03
+
+from decimal import Decimal, ROUND_HALF_UP
+from django.db import migrations, models
+
+
+def backfill_prices(apps, schema_editor):
+    Product = apps.get_model('pharmacy_management_app', 'Product')
+    batch = []
+    for product in Product.objects.only('id', 'cost_price', 'profit_margin').iterator(chunk_size=2000):
+        product.price = (product.cost_price * (1 + product.profit_margin)).quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+        batch.append(product)
+        if len(batch) == 2000:
+            Product.objects.bulk_update(batch, ['price'])
+            batch = []
+    Product.objects.bulk_update(batch, ['price'])
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('pharmacy_management_app', '0013_product_search'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='product',
+            name='price',
+            field=models.DecimalField(decimal_places=2, default=0, editable=False, max_digits=12),
+        ),
+        migrations.RunPython(backfill_prices, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='product',
+            index=models.Index(fields=['price', 'id'], name='product_price_idx'),
+        ),
+    ]
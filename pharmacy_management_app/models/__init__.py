@@ -1,3 +1,9 @@
 from .user import User
 from .bank_account import BankAccount
 from .product import Product
+from .idempotency_key import IdempotencyKey
+from .stock_reservation import StockReservation
+from .stock_shard import ProductStockShard
+from .bank_ledger import BankLedgerEntry, BalanceSnapshot
+from .purchase_job import PurchaseJob
+from .token_revocation import TokenRevocation
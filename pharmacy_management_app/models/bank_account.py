@@ -7,7 +7,9 @@ class BankAccount(models.Model):
     bank_name = models.CharField(max_length=100)
     branch_code = models.CharField(max_length=10)
     account_type = models.CharField(max_length=50)
+    # Balance as of the latest snapshot; entries after snapshot_entry_id are not folded in yet.
     balance = models.DecimalField(max_digits=10, decimal_places=2)
+    snapshot_entry_id = models.BigIntegerField(default=0)
 
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
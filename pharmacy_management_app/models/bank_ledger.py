@@ -0,0 +1,39 @@
+from django.db import models
+from .bank_account import BankAccount
+
+class BankLedgerEntry(models.Model):
+    KIND_DEBIT = 'debit'
+    KIND_CREDIT = 'credit'
+    KIND_CHOICES = [
+        (KIND_DEBIT, 'Debit'),
+        (KIND_CREDIT, 'Credit'),
+    ]
+
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='ledger_entries')
+    kind = models.CharField(max_length=6, choices=KIND_CHOICES)
+    amount = models.DecimalField(max_digits=12, decimal_places=2)
+    description = models.CharField(max_length=255, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['account', 'id'], name='ledger_account_id_idx'),
+        ]
+
+    @property
+    def signed_amount(self):
+        return -self.amount if self.kind == self.KIND_DEBIT else self.amount
+
+    def __str__(self):
+        return f"{self.account_id} {self.kind} {self.amount}"
+
+class BalanceSnapshot(models.Model):
+    account = models.ForeignKey(BankAccount, on_delete=models.CASCADE, related_name='balance_snapshots')
+    balance = models.DecimalField(max_digits=12, decimal_places=2)
+    last_entry_id = models.BigIntegerField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.account_id} {self.balance} @ {self.last_entry_id}"
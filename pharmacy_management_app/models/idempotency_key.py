@@ -0,0 +1,27 @@
+from django.db import models
+
+class IdempotencyKey(models.Model):
+    user = models.ForeignKey('pharmacy_management_app.user', on_delete=models.CASCADE, related_name='idempotency_keys')
+    key = models.CharField(max_length=255)
+    endpoint = models.CharField(max_length=255)
+    request_hash = models.CharField(max_length=64)
+    response_status = models.PositiveSmallIntegerField(null=True, blank=True)
+    response_body = models.JSONField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+    # Lease held by the request processing the key; a retry may take over once it lapses.
+    locked_until = models.DateTimeField(null=True, blank=True)
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'key'], name='unique_idempotency_key_per_user'),
+        ]
+
+    @property
+    def is_completed(self):
+        return self.response_status is not None
+
+    def __str__(self):
+        return f"{self.user_id} - {self.key}"
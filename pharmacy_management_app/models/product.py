@@ -1,19 +1,100 @@
+from decimal import Decimal, ROUND_HALF_UP
 from django.db import models
+from django.db.models import F, Value
+from django.db.models.functions import Lower
 from ..models.suppliers import Suppliers
+from ..signals import BulkWriteQuerySet
+
+PRICE_FIELDS = {'cost_price', 'profit_margin'}
+
+def calculate_price(cost_price, profit_margin) -> Decimal:
+    price = Decimal(str(cost_price)) * (1 + Decimal(str(profit_margin)))
+    return price.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP)
+
+class ProductQuerySet(BulkWriteQuerySet):
+    """Keeps the stored price column in step on the write paths that bypass Product.save()."""
+
+    def bulk_create(self, objs, *args, **kwargs):
+        objs = list(objs)
+        for obj in objs:
+            obj.refresh_price()
+        return super().bulk_create(objs, *args, **kwargs)
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        if PRICE_FIELDS & set(fields):
+            for obj in objs:
+                obj.refresh_price()
+            fields = list(fields) + ['price']
+        return super().bulk_update(objs, fields, *args, **kwargs)
+
+    def update(self, **kwargs):
+        if PRICE_FIELDS & set(kwargs) and 'price' not in kwargs:
+            cost_price = kwargs.get('cost_price', F('cost_price'))
+            profit_margin = kwargs.get('profit_margin', F('profit_margin'))
+            if not hasattr(cost_price, 'resolve_expression'):
+                cost_price = Value(Decimal(str(cost_price)))
+            if not hasattr(profit_margin, 'resolve_expression'):
+                profit_margin = Value(Decimal(str(profit_margin)))
+            kwargs['price'] = models.ExpressionWrapper(
+                cost_price * (Value(Decimal('1')) + profit_margin),
+                output_field=models.DecimalField(max_digits=12, decimal_places=2)
+            )
+        return super().update(**kwargs)
 
 class Product(models.Model):
     name = models.CharField(max_length=255)
     description = models.TextField()
     cost_price = models.DecimalField(max_digits=10, decimal_places=2)
     profit_margin = models.DecimalField(max_digits=5, decimal_places=2, default=0.20) 
+    price = models.DecimalField(max_digits=12, decimal_places=2, default=0, editable=False)
     quantity = models.IntegerField()
+    reserved_quantity = models.PositiveIntegerField(default=0)
+    stock_shards = models.PositiveSmallIntegerField(default=0)
+    reorder_level = models.PositiveIntegerField(default=0)
+    reorder_quantity = models.PositiveIntegerField(default=0)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     supplier = models.ForeignKey(Suppliers, on_delete=models.CASCADE, related_name='products')
 
+    objects = ProductQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(F('supplier'), Lower('name'), name='product_supplier_lname_idx'),
+            models.Index(fields=['price', 'id'], name='product_price_idx'),
+            # Only rows below their threshold are indexed, so the low-stock scan stays small however large the catalog.
+            models.Index(
+                fields=['supplier', 'id'], name='product_low_stock_idx',
+                condition=models.Q(stock_shards=0, quantity__lt=F('reorder_level'))
+            ),
+            models.Index(fields=['id'], name='product_sharded_idx', condition=models.Q(stock_shards__gt=0)),
+        ]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # The name as read, so the autocomplete index can tell a rename from a save that left it alone.
+        instance._loaded_name = instance.__dict__.get('name')
+        return instance
+
+    def refresh_price(self):
+        self.price = calculate_price(self.cost_price, self.profit_margin)
+
+    def save(self, *args, **kwargs):
+        self.refresh_price()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and PRICE_FIELDS & set(update_fields):
+            kwargs['update_fields'] = list(update_fields) + ['price']
+        super().save(*args, **kwargs)
+
+    @property
+    def is_sharded(self):
+        return self.stock_shards > 0
+
     @property
-    def price(self):
-        return self.cost_price * (1 + self.profit_margin)
+    def available_quantity(self):
+        return self.quantity - self.reserved_quantity
 
     def __str__(self):
         return self.name
@@ -9,3 +9,8 @@ class Purchase(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', '-purchase_date', '-id'], name='purchase_user_date_idx'),
+            models.Index(fields=['user', 'product', '-purchase_date', '-id'], name='purchase_user_product_date_idx'),
+        ]
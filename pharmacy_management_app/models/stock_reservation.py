@@ -0,0 +1,32 @@
+from django.db import models
+from ..models.product import Product
+
+class StockReservation(models.Model):
+    STATUS_ACTIVE = 'active'
+    STATUS_CONFIRMED = 'confirmed'
+    STATUS_RELEASED = 'released'
+    STATUS_EXPIRED = 'expired'
+    STATUS_CHOICES = [
+        (STATUS_ACTIVE, 'Active'),
+        (STATUS_CONFIRMED, 'Confirmed'),
+        (STATUS_RELEASED, 'Released'),
+        (STATUS_EXPIRED, 'Expired'),
+    ]
+
+    user = models.ForeignKey('pharmacy_management_app.user', on_delete=models.CASCADE, related_name='stock_reservations')
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='reservations')
+    quantity = models.PositiveIntegerField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_ACTIVE)
+    expires_at = models.DateTimeField()
+
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['expires_at'], condition=models.Q(status='active'), name='active_reservation_expiry_idx'),
+            models.Index(fields=['user', 'status'], name='reservation_user_status_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.product} x{self.quantity} ({self.status})"
@@ -0,0 +1,18 @@
+from django.db import models
+from ..models.product import Product
+from ..signals import BulkWriteQuerySet
+
+class ProductStockShard(models.Model):
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name='stock_shards_set')
+    shard_index = models.PositiveSmallIntegerField()
+    quantity = models.PositiveIntegerField(default=0)
+
+    objects = BulkWriteQuerySet.as_manager()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['product', 'shard_index'], name='unique_product_stock_shard'),
+        ]
+
+    def __str__(self):
+        return f"{self.product_id} shard {self.shard_index}: {self.quantity}"
@@ -1,4 +1,5 @@
 from django.db import models
+from ..signals import BulkWriteQuerySet
 
 class Suppliers(models.Model):
     name = models.CharField(max_length=255)
@@ -7,6 +8,8 @@ class Suppliers(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = BulkWriteQuerySet.as_manager()
+
     def __str__(self):
         return self.name
 
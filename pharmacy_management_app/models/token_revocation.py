@@ -0,0 +1,27 @@
+from django.db import models
+
+class TokenRevocation(models.Model):
+    """
+    Either one revoked token (jti set) or a per-user cutoff that revokes every token issued
+    before issued_before. expires_at is when the last token the row can affect expires, after
+    which the row may be purged.
+    """
+    user = models.ForeignKey('pharmacy_management_app.user', on_delete=models.CASCADE, related_name='token_revocations')
+    jti = models.CharField(max_length=255, unique=True, null=True, blank=True)
+    issued_before = models.DateTimeField(null=True, blank=True)
+    expires_at = models.DateTimeField(db_index=True)
+
+    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    class Meta:
+        constraints = [
+            models.CheckConstraint(
+                condition=models.Q(jti__isnull=False) | models.Q(issued_before__isnull=False),
+                name='token_revocation_has_target',
+            ),
+        ]
+
+    def __str__(self):
+        if self.jti:
+            return f"{self.user_id} - token {self.jti}"
+        return f"{self.user_id} - tokens issued before {self.issued_before}"
@@ -4,8 +4,9 @@ from django.contrib.auth.models import AbstractBaseUser, BaseUserManager
 from django.conf import settings
 from ..models.product import Product
 from ..models.purchase import Purchase
+from ..signals import BulkWriteQuerySet
 
-class UserManager(BaseUserManager):
+class UserManager(BaseUserManager.from_queryset(BulkWriteQuerySet)):
     def create_user(self, email, password=None, **extra_fields):
         if not email:
             raise ValueError('The Email field must be set')
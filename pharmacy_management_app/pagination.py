@@ -0,0 +1,217 @@
+import base64
+import json
+from decimal import Decimal
+from uuid import UUID
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+from .serializers.sparse import paginate_sparse
+from .services.etag_service import evaluate_preconditions, get_values_page_validators, set_validators
+
+class KeysetPagination(BasePagination):
+    """
+    Seek pagination on a unique, indexed ordering such as ('-purchase_date', '-id').
+    Each page is fetched with a WHERE on the last row seen, so deep pages cost the same as the first.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    ordering = ('-created_at', '-id')
+    invalid_cursor_message = 'Invalid cursor'
+
+    def get_page_size(self, request):
+        try:
+            page_size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(page_size, self.max_page_size))
+
+    def get_ordering(self, request, queryset, view):
+        return getattr(view, 'keyset_ordering', self.ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        self.ordering_fields = self.get_ordering(request, queryset, view)
+        queryset = queryset.order_by(*self.ordering_fields)
+
+        position = self.decode_cursor(request, queryset.model)
+        if position is not None:
+            queryset = queryset.filter(self.position_filter(position))
+
+        results = list(queryset[:self.page_size + 1])
+        self.has_next = len(results) > self.page_size
+        results = results[:self.page_size]
+        self.next_position = self.get_position(results[-1]) if self.has_next else None
+        return results
+
+    def position_filter(self, position):
+        # (a, b) after (x, y) means a > x OR (a = x AND b > y); descending fields use <.
+        condition = None
+        for field, value in reversed(list(zip(self.ordering_fields, position))):
+            name = field.lstrip('-')
+            after = Q(**{f"{name}__{'lt' if field.startswith('-') else 'gt'}": value})
+            condition = after if condition is None else after | (Q(**{name: value}) & condition)
+        # Repeat the leading bound on its own so the database can turn it into an index range scan.
+        leading = self.ordering_fields[0]
+        bound = Q(**{f"{leading.lstrip('-')}__{'lte' if leading.startswith('-') else 'gte'}": position[0]})
+        return bound & condition
+
+    def get_position(self, instance):
+        position = []
+        for field in self.ordering_fields:
+            value = instance[field.lstrip('-')] if isinstance(instance, dict) else getattr(instance, field.lstrip('-'))
+            if hasattr(value, 'isoformat'):
+                value = value.isoformat()
+            elif isinstance(value, (Decimal, UUID)):
+                value = str(value)
+            position.append(value)
+        return position
+
+    def encode_cursor(self, position):
+        return base64.urlsafe_b64encode(json.dumps(position).encode('utf-8')).decode('ascii')
+
+    def decode_cursor(self, request, model):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+        try:
+            position = json.loads(base64.urlsafe_b64decode(encoded.encode('ascii')).decode('utf-8'))
+            if len(position) != len(self.ordering_fields):
+                raise ValueError
+            return [
+                model._meta.get_field(field.lstrip('-')).to_python(value)
+                for field, value in zip(self.ordering_fields, position)
+            ]
+        except Exception:
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_cursor(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response({
+            'next': self.get_next_link(),
+            'results': data,
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
+
+
+class QuerysetKeysetPagination(KeysetPagination):
+    """Keyset pagination that follows whatever ordering the view's filters already applied."""
+    ordering = ('id',)
+
+    def get_ordering(self, request, queryset, view):
+        ordering = []
+        for field in queryset.query.order_by or getattr(view, 'keyset_ordering', self.ordering):
+            if not isinstance(field, str) or '__' in field:
+                raise ValidationError({'pagination': 'Cursor pagination is not available for this ordering.'})
+            ordering.append({'pk': 'id', '-pk': '-id'}.get(field, field))
+        # The position must identify a single row, so the primary key always closes the ordering.
+        if ordering[-1:] not in (['id'], ['-id']):
+            ordering.append('id')
+        return tuple(ordering)
+
+
+def estimate_count(queryset, exact_below: int = 1000) -> int:
+    """
+    Planner row estimate on PostgreSQL: reltuples for an unfiltered table, the EXPLAIN
+    estimate otherwise. Small results and other databases get an exact COUNT(*).
+    """
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return queryset.count()
+    with connection.cursor() as cursor:
+        if not queryset.query.where and not queryset.query.distinct:
+            cursor.execute('SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                           [connection.ops.quote_name(queryset.model._meta.db_table)])
+            row = cursor.fetchone()
+            estimate = row[0] if row else -1
+        else:
+            sql, params = queryset.order_by().query.sql_with_params()
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            estimate = int(plan[0]['Plan']['Plan Rows'])
+    # reltuples is -1 before the first ANALYZE and planner estimates are poor on small sets.
+    if estimate < exact_below:
+        return queryset.count()
+    return estimate
+
+
+class EstimatedCountPaginator(Paginator):
+    @cached_property
+    def count(self):
+        return estimate_count(self.object_list)
+
+
+class ListPagination(PageNumberPagination):
+    """
+    Page numbers with an exact count by default. Per request, ?count=estimated swaps the
+    COUNT(*) for the planner estimate, and ?pagination=cursor switches to keyset seeking
+    (no count, no OFFSET) following the next links.
+    """
+    page_size = 10
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    mode_query_param = 'pagination'
+    count_query_param = 'count'
+    cursor_pagination_class = QuerysetKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor_paginator = None
+        params = request.query_params
+        if params.get(self.mode_query_param) == 'cursor' or self.cursor_pagination_class.cursor_query_param in params:
+            self.cursor_paginator = self.cursor_pagination_class()
+            self.cursor_paginator.page_size = self.page_size
+            self.cursor_paginator.max_page_size = self.max_page_size
+            return self.cursor_paginator.paginate_queryset(queryset, request, view)
+        if params.get(self.count_query_param) == 'estimated':
+            self.django_paginator_class = EstimatedCountPaginator
+        else:
+            self.django_paginator_class = Paginator
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor_paginator is not None:
+            return self.cursor_paginator.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+def paginated_list_response(view, request, queryset, page_validators, extra=('updated_at',)):
+    """
+    One page of a list view with its validators. page_validators(page, envelope) covers pages of
+    model instances; pages narrowed to values() rows by ?fields= use get_values_page_validators.
+    A delete can leave the newest updated_at unchanged, so lists only trust If-None-Match.
+    """
+    page, data = paginate_sparse(view, queryset, extra=list(extra))
+    envelope = view.paginator.get_paginated_response([]).data
+    envelope.pop('results')
+    if data is not None:
+        etag, last_modified = get_values_page_validators(page, envelope)
+    else:
+        etag, last_modified = page_validators(page, envelope)
+    not_modified = evaluate_preconditions(request, etag)
+    if not_modified is not None:
+        return not_modified
+    if data is None:
+        data = view.get_serializer(page, many=True).data
+    return set_validators(view.get_paginated_response(data), etag, last_modified, use_last_modified=False)
@@ -1,9 +1,12 @@
+from django.contrib.auth import get_user_model
 from rest_framework.permissions import BasePermission
 
 class IsOwner(BasePermission):
 
     def has_object_permission(self, request, view, obj):
-        return obj.user == request.user
+        # Compare ids: obj.user would load the owner row on every check.
+        owner_id = obj.pk if isinstance(obj, get_user_model()) else obj.user_id
+        return owner_id == request.user.pk
 
 class IsAdminUser(BasePermission):
  
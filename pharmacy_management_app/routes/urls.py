@@ -1,22 +1,29 @@
 from django.urls import path, include
 from rest_framework.routers import DefaultRouter
-from ..views.user import UserViewSet, RegisterView, LoginView
+from ..views.user import UserViewSet, RegisterView, LoginView, TokenRevokeView
 from ..views.bank_account import BankAccountViewSet
 from ..views.product import ProductViewSet
 from rest_framework_simplejwt.views import TokenRefreshView
-from ..views.transaction import PurchaseProductView
+from ..views.transaction import PurchaseProductView, CartCheckoutView, PurchaseJobStatusView
 from ..views.supplier import SupplierViewSet
+from ..views.reservation import StockReservationViewSet
+from ..views.purchase import PurchaseHistoryViewSet
 
 router = DefaultRouter()
 router.register(r'users', UserViewSet)
 router.register(r'bank-accounts', BankAccountViewSet)
 router.register(r'products', ProductViewSet)
 router.register(r'suppliers', SupplierViewSet)
+router.register(r'reservations', StockReservationViewSet)
+router.register(r'purchases', PurchaseHistoryViewSet)
 
 urlpatterns = [
     path('', include(router.urls)),
     path('register/', RegisterView.as_view(), name='register'),
     path('login/', LoginView.as_view(), name='login'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/revoke/', TokenRevokeView.as_view(), name='token_revoke'),
     path('purchase-product/', PurchaseProductView.as_view(), name='purchase-product'),
+    path('checkout/', CartCheckoutView.as_view(), name='cart-checkout'),
+    path('purchase-jobs/<int:pk>/', PurchaseJobStatusView.as_view(), name='purchase-job-detail'),
 ]
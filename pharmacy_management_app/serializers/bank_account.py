@@ -1,5 +1,7 @@
 from rest_framework import serializers
 from ..models.bank_account import BankAccount
+from ..models.bank_ledger import BankLedgerEntry
+from ..services.bank_account_service import get_current_balance, adjust_bank_account_balance
 
 class BankAccountSerializer(serializers.ModelSerializer):
     class Meta:
@@ -11,3 +13,25 @@ class BankAccountSerializer(serializers.ModelSerializer):
         user = self.context['request'].user
         validated_data['user'] = user
         return super().create(validated_data)
+
+    def update(self, instance, validated_data):
+        if 'balance' in validated_data:
+            adjust_bank_account_balance(instance, validated_data.pop('balance'))
+            instance.ledger_delta = None
+        # Save only the edited columns so a concurrent compaction's snapshot is never overwritten.
+        for attr, value in validated_data.items():
+            setattr(instance, attr, value)
+        instance.save(update_fields=[*validated_data, 'updated_at'])
+        return instance
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        data['balance'] = self.fields['balance'].to_representation(get_current_balance(instance))
+        return data
+
+class BankLedgerEntrySerializer(serializers.ModelSerializer):
+    class Meta:
+        model = BankLedgerEntry
+        fields = ['id', 'kind', 'amount', 'description', 'created_at']
+        read_only_fields = fields
+        ref_name = 'BankLedgerEntrySerializer'
@@ -1,9 +1,72 @@
+from decimal import Decimal
 from rest_framework import serializers
 from ..models.product import Product
+from ..services.stock_service import get_sharded_quantity, set_sharded_quantity
+from .sparse import SparseFieldsetMixin
+
+class ProductSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    values_fields = ('id', 'name', 'description', 'cost_price', 'profit_margin', 'price', 'reserved_quantity', 'stock_shards', 'reorder_level', 'reorder_quantity', 'created_at', 'updated_at')
+    field_sources = {
+        'quantity': ['quantity', 'stock_shards'],
+        'available_quantity': ['quantity', 'reserved_quantity', 'stock_shards'],
+    }
 
-class ProductSerializer(serializers.ModelSerializer):
     class Meta:
         model = Product
-        fields = ['id', 'name', 'description', 'cost_price', 'profit_margin', 'price', 'quantity', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+        fields = ['id', 'name', 'description', 'supplier', 'cost_price', 'profit_margin', 'price', 'quantity', 'reserved_quantity', 'available_quantity', 'stock_shards', 'reorder_level', 'reorder_quantity', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'reserved_quantity', 'stock_shards', 'created_at', 'updated_at']
         ref_name = 'ProductSerializer'
+
+    def get_fields(self):
+        fields = super().get_fields()
+        if self.instance is not None and 'supplier' in fields:
+            # A PUT may leave the supplier out and keep the current one; creates still need it.
+            fields['supplier'].required = False
+        return fields
+
+    def to_representation(self, instance):
+        data = super().to_representation(instance)
+        if {'quantity', 'available_quantity'} & set(data) and instance.is_sharded:
+            # Querysets annotated with current_quantity_expression() save a shard query per product.
+            quantity = getattr(instance, 'current_quantity', None)
+            if quantity is None:
+                quantity = get_sharded_quantity(instance)
+            if 'quantity' in data:
+                data['quantity'] = quantity
+            if 'available_quantity' in data:
+                data['available_quantity'] = quantity - instance.reserved_quantity
+        return data
+
+    def validate(self, attrs):
+        attrs = super().validate(attrs)
+        quantity = attrs.get('quantity')
+        # Same rule as bulk_update_products and the CSV importer.
+        if self.instance is not None and quantity is not None and quantity < self.instance.reserved_quantity:
+            raise serializers.ValidationError({'quantity': [f'Below the {self.instance.reserved_quantity} units reserved.']})
+        return attrs
+
+    def update(self, instance, validated_data):
+        if instance.is_sharded and 'quantity' in validated_data:
+            set_sharded_quantity(instance, validated_data.pop('quantity'))
+        return super().update(instance, validated_data)
+
+
+class ProductImportRowSerializer(serializers.Serializer):
+    name = serializers.CharField(max_length=255)
+    description = serializers.CharField(allow_blank=True, default='')
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'))
+    profit_margin = serializers.DecimalField(max_digits=5, decimal_places=2, default=Decimal('0.20'))
+    quantity = serializers.IntegerField(min_value=0)
+    supplier = serializers.CharField(max_length=255)
+
+
+
+class ProductBulkUpdateItemSerializer(serializers.Serializer):
+    id = serializers.IntegerField()
+    cost_price = serializers.DecimalField(max_digits=10, decimal_places=2, min_value=Decimal('0'), required=False)
+    profit_margin = serializers.DecimalField(max_digits=5, decimal_places=2, required=False)
+    quantity = serializers.IntegerField(min_value=0, required=False)
+
+
+class ProductBulkUpdateSerializer(serializers.Serializer):
+    items = serializers.ListField(child=serializers.JSONField(), allow_empty=False, max_length=10000)
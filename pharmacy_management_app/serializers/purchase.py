@@ -0,0 +1,11 @@
+from rest_framework import serializers
+from ..models.purchase import Purchase
+
+class PurchaseHistorySerializer(serializers.ModelSerializer):
+    product_name = serializers.CharField(source='product.name', read_only=True)
+
+    class Meta:
+        model = Purchase
+        fields = ['id', 'product', 'product_name', 'quantity', 'purchase_date']
+        read_only_fields = fields
+        ref_name = 'PurchaseHistorySerializer'
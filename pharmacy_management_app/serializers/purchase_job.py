@@ -0,0 +1,9 @@
+from rest_framework import serializers
+from ..models.purchase_job import PurchaseJob
+
+class PurchaseJobSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PurchaseJob
+        fields = ['id', 'items', 'status', 'result', 'error', 'attempts', 'created_at', 'updated_at']
+        read_only_fields = fields
+        ref_name = 'PurchaseJobSerializer'
@@ -0,0 +1,9 @@
+from rest_framework import serializers
+from ..models.stock_reservation import StockReservation
+
+class StockReservationSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = StockReservation
+        fields = ['id', 'product', 'quantity', 'status', 'expires_at', 'created_at', 'updated_at']
+        read_only_fields = fields
+        ref_name = 'StockReservationSerializer'
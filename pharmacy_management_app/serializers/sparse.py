@@ -0,0 +1,103 @@
+from django.core.exceptions import FieldDoesNotExist
+from rest_framework import serializers
+from rest_framework.permissions import SAFE_METHODS
+
+FIELDS_QUERY_PARAM = 'fields'
+INCLUDE_QUERY_PARAM = 'include'
+
+def get_requested_fields(request, serializer_class):
+    """The ?fields=a,b,c subset for reads, None when absent. Writes always return the full body."""
+    if request is None or request.method not in SAFE_METHODS:
+        return None
+    raw = request.query_params.get(FIELDS_QUERY_PARAM)
+    if not raw:
+        return None
+    requested = list(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+    unknown = [name for name in requested if name not in serializer_class.Meta.fields]
+    if unknown:
+        raise serializers.ValidationError({FIELDS_QUERY_PARAM: [f"Unknown field(s): {', '.join(unknown)}"]})
+    return requested or None
+
+def get_requested_includes(request, options) -> set:
+    """The ?include=a,b expansions a list opted into; 400 for names not in options."""
+    if request is None:
+        return set()
+    raw = request.query_params.get(INCLUDE_QUERY_PARAM, '')
+    includes = {name.strip() for name in raw.split(',') if name.strip()}
+    unknown = includes - set(options)
+    if unknown:
+        raise serializers.ValidationError({INCLUDE_QUERY_PARAM: [f"Unknown option(s): {', '.join(sorted(unknown))}"]})
+    return includes
+
+
+class SparseFieldsetMixin:
+    """
+    Drops every field not named in ?fields=. Serializers may declare:
+      values_fields: fields that render straight from their column, so lists can skip model instances;
+      field_sources: columns a computed field reads, so .only() loads them.
+    """
+    values_fields = ()
+    field_sources = {}
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.requested_fields = get_requested_fields(self.context.get('request'), type(self))
+        if self.requested_fields is not None:
+            for name in set(self.fields) - set(self.requested_fields):
+                self.fields.pop(name)
+
+    @property
+    def uses_values_path(self) -> bool:
+        return self.requested_fields is not None and set(self.requested_fields) <= set(self.values_fields)
+
+    def get_load_columns(self) -> set:
+        model = self.Meta.model
+        columns = {model._meta.pk.name}
+        for name in self.fields:
+            for source in self.field_sources.get(name, [self.fields[name].source]):
+                try:
+                    if model._meta.get_field(source).concrete:
+                        columns.add(source)
+                except FieldDoesNotExist:
+                    continue
+        return columns
+
+
+def get_ordering_columns(queryset) -> set:
+    columns = {'id'}
+    for field in queryset.query.order_by:
+        if isinstance(field, str):
+            name = field.lstrip('-')
+            columns.add('id' if name == 'pk' else name)
+    return columns
+
+def narrow_queryset(queryset, serializer, extra=()):
+    """.values() for the tuple fast path, .only() otherwise; unchanged without ?fields=."""
+    if serializer.requested_fields is None:
+        return queryset
+    annotations = set(queryset.query.annotations)
+    columns = serializer.get_load_columns() | get_ordering_columns(queryset) | set(extra)
+    if serializer.uses_values_path:
+        # Annotations aren't model fields, so get_load_columns() can't see them; values() must name them.
+        # Prefetches have no instances to attach to once rows are dicts.
+        return queryset.prefetch_related(None).values(*sorted(columns | (set(serializer.fields) & annotations)))
+    return queryset.only(*sorted(columns - annotations))
+
+def serialize_values(rows, serializer) -> list:
+    # Each field's to_representation is looked up once per page instead of once per row and field.
+    columns = [(name, field.source, field.to_representation) for name, field in serializer.fields.items()]
+    return [
+        {name: None if row[source] is None else render(row[source]) for name, source, render in columns}
+        for row in rows
+    ]
+
+def paginate_sparse(view, queryset, extra=()):
+    """
+    Returns (page, data). data is already rendered on the values() path and None otherwise,
+    in which case the caller serializes the page of model instances as usual.
+    """
+    serializer = view.get_serializer()
+    page = view.paginate_queryset(narrow_queryset(queryset, serializer, extra))
+    if page is not None and serializer.uses_values_path:
+        return page, serialize_values(page, serializer)
+    return page, None
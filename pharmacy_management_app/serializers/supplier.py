@@ -1,9 +1,44 @@
 from rest_framework import serializers
 from ..models.suppliers import Suppliers
+from .product import ProductSerializer
+from .sparse import SparseFieldsetMixin
+
+class SupplierSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    values_fields = ('id', 'name', 'contact_info', 'created_at', 'updated_at')
 
-class SupplierSerializer(serializers.ModelSerializer):
     class Meta:
         model = Suppliers
         fields = ['id', 'name', 'contact_info', 'created_at', 'updated_at']
         read_only_fields = ['id', 'created_at', 'updated_at']
         ref_name = 'SupplierSerializer'
+
+
+class SupplierListSerializer(SupplierSerializer):
+    """
+    SupplierSerializer plus the ?include= expansions, kept only when context['includes'] names
+    them: stats reads the aggregates added by annotate_supplier_stats(), products the slice
+    attached by prefetch_supplier_products().
+    """
+    include_fields = {
+        'stats': ('product_count', 'total_units', 'inventory_value'),
+        'products': ('products',),
+    }
+    values_fields = SupplierSerializer.values_fields + include_fields['stats']
+
+    product_count = serializers.IntegerField(read_only=True)
+    total_units = serializers.IntegerField(read_only=True)
+    inventory_value = serializers.DecimalField(max_digits=20, decimal_places=2, read_only=True)
+    products = ProductSerializer(many=True, read_only=True, source='included_products')
+
+    class Meta(SupplierSerializer.Meta):
+        fields = SupplierSerializer.Meta.fields + ['product_count', 'total_units', 'inventory_value', 'products']
+        read_only_fields = SupplierSerializer.Meta.read_only_fields + ['product_count', 'total_units', 'inventory_value', 'products']
+        ref_name = 'SupplierListSerializer'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        includes = self.context.get('includes', set())
+        for option, names in self.include_fields.items():
+            if option not in includes:
+                for name in names:
+                    self.fields.pop(name, None)
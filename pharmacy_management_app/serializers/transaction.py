@@ -2,4 +2,7 @@ from rest_framework import serializers
 
 class PurchaseSerializer(serializers.Serializer):
     product_id = serializers.IntegerField()
-    quantity = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+
+class CartCheckoutSerializer(serializers.Serializer):
+    items = PurchaseSerializer(many=True, allow_empty=False, max_length=500)
@@ -1,22 +1,39 @@
+from django.conf import settings
 from rest_framework import serializers
 from ..models.user import User
 from django.contrib.auth.password_validation import validate_password
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import authenticate
-from ..models.product import Product
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.exceptions import TokenError
+from rest_framework_simplejwt.serializers import TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
+from ..services.token_revocation_service import is_token_revoked, revoke_token
+from .purchase import PurchaseHistorySerializer
+from .sparse import SparseFieldsetMixin
 
-class ProductSerializer(serializers.ModelSerializer):
-    class Meta:
-        model = Product
-        fields = ['id', 'name', 'description', 'cost_price', 'profit_margin', 'quantity']
-        ref_name = 'UserProductSerializer'
+class UserSerializer(SparseFieldsetMixin, serializers.ModelSerializer):
+    """
+    Purchase stats come from annotate_purchase_stats(); recent_purchases is kept only when
+    context['includes'] asks for it and reads the slice attached by prefetch_recent_purchases().
+    """
+    values_fields = ('id', 'name', 'email', 'status', 'created_at', 'updated_at',
+                     'purchase_count', 'units_purchased', 'last_purchase_at')
 
-class UserSerializer(serializers.ModelSerializer):
-    purchased_products = ProductSerializer(many=True, read_only=True)
+    purchase_count = serializers.IntegerField(read_only=True)
+    units_purchased = serializers.IntegerField(read_only=True)
+    last_purchase_at = serializers.DateTimeField(read_only=True, allow_null=True)
+    recent_purchases = PurchaseHistorySerializer(many=True, read_only=True)
 
     class Meta:
         model = User
-        fields = ['id', 'name', 'email', 'status', 'created_at', 'updated_at', 'purchased_products']
+        fields = ['id', 'name', 'email', 'status', 'created_at', 'updated_at',
+                  'purchase_count', 'units_purchased', 'last_purchase_at', 'recent_purchases']
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if 'recent_purchases' not in self.context.get('includes', set()):
+            self.fields.pop('recent_purchases', None)
 
 class RegisterSerializer(serializers.ModelSerializer):
     password = serializers.CharField(write_only=True, required=True, validators=[validate_password])
@@ -44,6 +61,24 @@ class RegisterSerializer(serializers.ModelSerializer):
         user.save()
         return user
 
+class UserProvisionRowSerializer(serializers.Serializer):
+    email = serializers.EmailField(max_length=254)
+    name = serializers.CharField(max_length=100)
+    password = serializers.CharField(write_only=True, validators=[validate_password])
+    is_staff = serializers.BooleanField(default=False)
+
+
+class UserProvisionSerializer(serializers.Serializer):
+    users = serializers.ListField(child=serializers.DictField(), allow_empty=False)
+    batch_size = serializers.IntegerField(min_value=1, max_value=10000, default=1000)
+
+    def validate_users(self, value):
+        limit = settings.USER_PROVISIONING_MAX_HTTP_USERS
+        if len(value) > limit:
+            raise serializers.ValidationError(
+                f'At most {limit} users per request; use the provision_users command for larger batches.')
+        return value
+
 class LoginSerializer(serializers.Serializer):
     email = serializers.EmailField()
     password = serializers.CharField(write_only=True)
@@ -65,3 +100,30 @@ class LoginSerializer(serializers.Serializer):
 class TokenSerializer(serializers.Serializer):
     refresh = serializers.CharField()
     access = serializers.CharField()
+
+class RevocationCheckingTokenRefreshSerializer(TokenRefreshSerializer):
+    """
+    Refuses revoked refresh tokens. With ROTATE_REFRESH_TOKENS and BLACKLIST_AFTER_ROTATION the
+    rotated-out token is revoked, standing in for the simplejwt blacklist app.
+    """
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        if is_token_revoked(refresh):
+            raise TokenError(_('Token has been revoked'))
+        data = super().validate(attrs)
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            revoke_token(refresh)
+        return data
+
+class TokenRevokeSerializer(serializers.Serializer):
+    refresh = serializers.CharField(required=False)
+
+    def validate_refresh(self, value):
+        try:
+            refresh = RefreshToken(value)
+        except TokenError as e:
+            raise serializers.ValidationError(str(e))
+        if str(refresh.get(api_settings.USER_ID_CLAIM)) != str(self.context['request'].user.pk):
+            raise serializers.ValidationError('Token belongs to another user')
+        return refresh
@@ -0,0 +1,188 @@
+import logging
+import threading
+import time
+import unicodedata
+from bisect import bisect_left, bisect_right
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models.functions import Lower
+from django.db.models.signals import post_delete, post_save
+from ..models.product import Product
+from ..signals import bulk_write
+from ..services.cache_service import bump_cache_version, get_cache_version
+
+logger = logging.getLogger(__name__)
+
+MAX_SUGGESTIONS = 10
+# Bumped in the shared cache whenever a product name changes, so every worker process can
+# tell that its own copy of the index has fallen behind.
+NAME_VERSION_NAMESPACE = 'product_name'
+
+def normalize_name(name: str) -> str:
+    """Case-folded, accent-stripped, with runs of whitespace collapsed: 'Ibuprofène  400' -> 'ibuprofene 400'."""
+    decomposed = unicodedata.normalize('NFKD', name or '')
+    stripped = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return ' '.join(stripped.casefold().split())
+
+
+class ProductNameIndex:
+    """
+    Sorted array of normalized product names held in process memory. A prefix lookup is one
+    bisect plus a short forward scan, independent of catalog size. Writes made by this process
+    are applied in place once they commit; writes from other processes only bump the shared
+    version, after which this copy is rebuilt in the background and callers fall back to the
+    database until it is ready again. A copy older than PRODUCT_NAME_INDEX_MAX_AGE keeps serving
+    while it is rebuilt, in case a bump never reached this process.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._keys = []   # normalized names, sorted
+        self._ids = []    # product id at the same position as its key
+        self._names = {}  # product id -> name as stored
+        self._version = None
+        self._built_at = None
+        self._building = False
+
+    def suggest(self, prefix: str, limit: int = MAX_SUGGESTIONS):
+        """(id, name) pairs whose normalized name starts with prefix, or None when the index is not current."""
+        prefix = normalize_name(prefix)
+        current = get_cache_version(NAME_VERSION_NAMESPACE)
+        with self._lock:
+            if self._version is None or self._version != current:
+                return None
+            keys = self._keys
+            results = []
+            position = bisect_left(keys, prefix)
+            while position < len(keys) and len(results) < limit and keys[position].startswith(prefix):
+                pk = self._ids[position]
+                results.append((pk, self._names[pk]))
+                position += 1
+            return results
+
+    def is_expired(self) -> bool:
+        return self._built_at is not None and time.monotonic() - self._built_at > settings.PRODUCT_NAME_INDEX_MAX_AGE
+
+    def rebuild(self):
+        # Read the version before the rows: a write committed during the load bumps it again
+        # and leaves this build stale rather than silently missing the change.
+        version = get_cache_version(NAME_VERSION_NAMESPACE)
+        started = time.monotonic()
+        rows = sorted(
+            (normalize_name(name), pk, name)
+            for pk, name in Product.objects.values_list('id', 'name').iterator(chunk_size=10000)
+        )
+        with self._lock:
+            self._keys = [key for key, _, _ in rows]
+            self._ids = [pk for _, pk, _ in rows]
+            self._names = {pk: name for _, pk, name in rows}
+            self._version = version
+            self._built_at = started
+
+    def rebuild_in_background(self):
+        # A request inside a transaction could load rows that never commit; let a later one start the build.
+        if self._building or connection.in_atomic_block:
+            return
+        self._building = True
+        threading.Thread(target=self._run_rebuild, name='product-name-index', daemon=True).start()
+
+    def _run_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception:
+            logger.exception('Rebuilding the product name index failed')
+        finally:
+            self._building = False
+            connection.close()
+
+    def apply(self, changes):
+        """changes: (id, name) pairs, name None for a deleted product. Publishes the change to other processes."""
+        # Always published, even when a rebuild here already picked the new name up: other
+        # processes only learn about it through the bump.
+        with self._lock:
+            expected = self._version
+            version = bump_cache_version(NAME_VERSION_NAMESPACE)
+            if expected is None:
+                return
+            for pk, name in changes:
+                self._remove(pk)
+                if name is not None:
+                    self._insert(pk, name)
+            # Another process wrote in between when the counter moved by more than our own bump;
+            # keep the old version so the next lookup sees the index as stale.
+            if version == expected + 1:
+                self._version = version
+
+    def invalidate(self):
+        bump_cache_version(NAME_VERSION_NAMESPACE)
+
+    def _insert(self, pk, name):
+        key = normalize_name(name)
+        position = bisect_right(self._keys, key)
+        self._keys.insert(position, key)
+        self._ids.insert(position, pk)
+        self._names[pk] = name
+
+    def _remove(self, pk):
+        name = self._names.pop(pk, None)
+        if name is None:
+            return
+        key = normalize_name(name)
+        start, end = bisect_left(self._keys, key), bisect_right(self._keys, key)
+        position = self._ids.index(pk, start, end)
+        del self._keys[position]
+        del self._ids[position]
+
+
+product_name_index = ProductNameIndex()
+
+def suggest_product_names(prefix: str, limit: int = MAX_SUGGESTIONS) -> list[tuple]:
+    """(id, name) pairs, alphabetical. Served from the in-process index, or the database while it (re)builds."""
+    limit = max(1, min(limit, MAX_SUGGESTIONS))
+    suggestions = product_name_index.suggest(prefix, limit)
+    if suggestions is None or product_name_index.is_expired():
+        product_name_index.rebuild_in_background()
+    if suggestions is not None:
+        return suggestions
+    return suggest_from_database(prefix, limit)
+
+def suggest_from_database(prefix: str, limit: int = MAX_SUGGESTIONS) -> list[tuple]:
+    # Case-insensitive but accent-sensitive, and a full scan: only meant to cover a cold or stale index.
+    return list(
+        Product.objects.filter(name__istartswith=' '.join(prefix.split()))
+        .order_by(Lower('name'), 'id')
+        .values_list('id', 'name')[:limit]
+    )
+
+def _publish(changes):
+    transaction.on_commit(lambda: product_name_index.apply(changes))
+
+def _name_changed(product) -> bool:
+    # Products not read with their name (new, deferred, built by hand) are assumed renamed.
+    changed = getattr(product, '_loaded_name', None) != product.name
+    product._loaded_name = product.name
+    return changed
+
+def _product_saved(sender, instance, update_fields=None, **kwargs):
+    if update_fields is not None and 'name' not in update_fields:
+        return
+    if _name_changed(instance):
+        _publish([(instance.pk, instance.name)])
+
+def _product_deleted(sender, instance, **kwargs):
+    _publish([(instance.pk, None)])
+
+def _products_bulk_written(sender, objs=None, fields=None, **kwargs):
+    if fields is not None and 'name' not in fields:
+        return
+    if objs is None or any(obj.pk is None for obj in objs):
+        transaction.on_commit(product_name_index.invalidate)
+        return
+    changes = [(obj.pk, obj.name) for obj in objs if _name_changed(obj)]
+    if changes:
+        _publish(changes)
+
+def connect_autocomplete_index():
+    post_save.connect(_product_saved, sender=Product, dispatch_uid='product_name_index_save')
+    post_delete.connect(_product_deleted, sender=Product, dispatch_uid='product_name_index_delete')
+    bulk_write.connect(_products_bulk_written, sender=Product, dispatch_uid='product_name_index_bulk')
@@ -1,5 +1,43 @@
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from django.db.models import Case, Count, DecimalField, F, OuterRef, Q, Subquery, Sum, Value, When
+from django.db.models.functions import Coalesce
 from ..models import BankAccount, User
-from django.db.models import Q
+from ..models.bank_ledger import BankLedgerEntry, BalanceSnapshot
+
+def ledger_delta_subquery():
+    signed_amount = Case(
+        When(kind=BankLedgerEntry.KIND_DEBIT, then=-F('amount')),
+        default=F('amount'),
+        output_field=DecimalField(max_digits=12, decimal_places=2),
+    )
+    delta = (
+        BankLedgerEntry.objects.filter(account=OuterRef('pk'), id__gt=OuterRef('snapshot_entry_id'))
+        .values('account')
+        .annotate(delta=Sum(signed_amount))
+        .values('delta')
+    )
+    return Coalesce(Subquery(delta), Value(Decimal('0.00')), output_field=DecimalField(max_digits=12, decimal_places=2))
+
+def with_current_balance(queryset):
+    return queryset.annotate(ledger_delta=ledger_delta_subquery())
+
+def get_ledger_delta(bank_account: BankAccount, up_to_entry_id: int = None) -> Decimal:
+    entries = BankLedgerEntry.objects.filter(account=bank_account, id__gt=bank_account.snapshot_entry_id)
+    if up_to_entry_id is not None:
+        entries = entries.filter(id__lte=up_to_entry_id)
+    delta = Decimal('0.00')
+    for kind, total in entries.values_list('kind').annotate(total=Sum('amount')):
+        delta += -total if kind == BankLedgerEntry.KIND_DEBIT else total
+    return delta
+
+def get_current_balance(bank_account: BankAccount) -> Decimal:
+    delta = getattr(bank_account, 'ledger_delta', None)
+    if delta is None:
+        delta = get_ledger_delta(bank_account)
+    return Decimal(str(bank_account.balance)) + delta
 
 def get_bank_account(user: User):
     try:
@@ -8,19 +46,92 @@ def get_bank_account(user: User):
     except BankAccount.DoesNotExist:
         return None
 
-def debite_from_bank_account(user: User, amount: float):
-    try:
-        bank_account = get_bank_account(user)
-        bank_account.balance -= amount
-        bank_account.save()
-    except Exception as e:
-        print(f"Error occurred while debiting from bank account: {e}")
+# Locking: a ledger insert takes a KEY SHARE lock on its account row through the foreign key
+# check. Debits and adjustments take FOR NO KEY UPDATE, which serializes them with each other for
+# the balance check but not with that KEY SHARE, so credits append without waiting. Compaction
+# takes FOR UPDATE, which conflicts with both and so waits out every in-flight append.
+
+def debite_from_bank_account(user: User, amount: Decimal, description: str = ''):
+    with transaction.atomic():
+        try:
+            bank_account = BankAccount.objects.select_for_update(no_key=True).get(user=user)
+        except BankAccount.DoesNotExist:
+            raise BankAccount.DoesNotExist('Bank account not found')
+        # Credits still in flight are not counted yet, which can only make the check stricter.
+        if get_current_balance(bank_account) < amount:
+            raise ValueError('Insufficient funds')
+        return BankLedgerEntry.objects.create(
+            account=bank_account,
+            kind=BankLedgerEntry.KIND_DEBIT,
+            amount=amount,
+            description=description[:255],
+        )
+
+def credit_bank_account(bank_account: BankAccount, amount: Decimal, description: str = ''):
+    return BankLedgerEntry.objects.create(
+        account_id=bank_account.pk,
+        kind=BankLedgerEntry.KIND_CREDIT,
+        amount=amount,
+        description=description[:255],
+    )
+
+def adjust_bank_account_balance(bank_account: BankAccount, new_balance: Decimal):
+    # Serialized like a debit; a credit landing meanwhile is added on top of the new balance.
+    with transaction.atomic():
+        bank_account = BankAccount.objects.select_for_update(no_key=True).get(pk=bank_account.pk)
+        difference = Decimal(new_balance) - get_current_balance(bank_account)
+        if difference:
+            BankLedgerEntry.objects.create(
+                account=bank_account,
+                kind=BankLedgerEntry.KIND_CREDIT if difference > 0 else BankLedgerEntry.KIND_DEBIT,
+                amount=abs(difference),
+                description='Balance adjustment',
+            )
+
+def get_ledger_entries(bank_account: BankAccount):
+    return BankLedgerEntry.objects.filter(account=bank_account).order_by('-id')
+
+def compact_ledger(bank_account_id: int, settled_before=None) -> BalanceSnapshot:
+    """
+    Folds entries created before settled_before (LEDGER_COMPACTION_SETTLE_TIME ago by default)
+    into the account's balance. Ids are handed out before an insert takes its account lock, so
+    a just-created entry may still be joined by an uncommitted one with a lower id; leaving
+    recent entries for the next run keeps the snapshot from skipping past it.
+    """
+    settled_before = settled_before or timezone.now() - settings.LEDGER_COMPACTION_SETTLE_TIME
+    with transaction.atomic():
+        bank_account = BankAccount.objects.select_for_update().get(pk=bank_account_id)
+        last_entry_id = (
+            BankLedgerEntry.objects.filter(account=bank_account, id__gt=bank_account.snapshot_entry_id,
+                                           created_at__lt=settled_before)
+            .order_by('-id')
+            .values_list('id', flat=True)
+            .first()
+        )
+        if last_entry_id is None:
+            return None
+        bank_account.balance += get_ledger_delta(bank_account, up_to_entry_id=last_entry_id)
+        bank_account.snapshot_entry_id = last_entry_id
+        bank_account.save(update_fields=['balance', 'snapshot_entry_id', 'updated_at'])
+        return BalanceSnapshot.objects.create(
+            account=bank_account,
+            balance=bank_account.balance,
+            last_entry_id=last_entry_id,
+        )
+
+def get_accounts_to_compact(min_entries: int = 1):
+    return (
+        BankAccount.objects.filter(ledger_entries__id__gt=F('snapshot_entry_id'))
+        .annotate(pending=Count('ledger_entries'))
+        .filter(pending__gte=min_entries)
+        .values_list('pk', flat=True)
+    )
 
 def get_user_bank_accounts(user: User, bank_name_contains: str = ""):
     query = Q(user=user)
     if bank_name_contains:
         query &= Q(bank_name__icontains=bank_name_contains)
-    return BankAccount.objects.filter(query)
+    return with_current_balance(BankAccount.objects.filter(query))
 
 def create_bank_account(serializer, user: User):
-    serializer.save(user=user)
\ No newline at end of file
+    serializer.save(user=user)
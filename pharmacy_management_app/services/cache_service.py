@@ -0,0 +1,97 @@
+import hashlib
+import time
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from rest_framework import status
+from rest_framework.response import Response
+from ..models.product import Product
+from ..models.stock_shard import ProductStockShard
+from ..models.suppliers import Suppliers
+from ..signals import bulk_write
+from ..services.etag_service import evaluate_preconditions, set_validators
+
+# Cached catalog responses are keyed by these per-model versions; a write bumps the version
+# instead of hunting down every key that might contain the changed row.
+CACHE_NAMESPACES = {
+    Product: 'product',
+    ProductStockShard: 'product',
+    Suppliers: 'supplier',
+}
+
+def get_catalog_cache():
+    return caches[settings.CATALOG_CACHE_ALIAS]
+
+def _version_key(namespace: str) -> str:
+    return f'catalog:version:{namespace}'
+
+def get_cache_version(namespace: str) -> int:
+    cache = get_catalog_cache()
+    version = cache.get(_version_key(namespace))
+    if version is None:
+        # Seed from the clock so an evicted counter never reuses a number that old entries carry.
+        cache.add(_version_key(namespace), time.time_ns(), timeout=None)
+        version = cache.get(_version_key(namespace), 0)
+    return version
+
+def get_cache_versions(namespaces) -> dict:
+    # One round trip for the common case where every counter already exists.
+    found = get_catalog_cache().get_many([_version_key(namespace) for namespace in namespaces])
+    return {
+        namespace: found[_version_key(namespace)] if _version_key(namespace) in found else get_cache_version(namespace)
+        for namespace in namespaces
+    }
+
+def bump_cache_version(namespace: str) -> int:
+    cache = get_catalog_cache()
+    try:
+        return cache.incr(_version_key(namespace))
+    except ValueError:
+        version = time.time_ns()
+        cache.set(_version_key(namespace), version, timeout=None)
+        return version
+
+def invalidate_namespace(namespace: str):
+    bump_cache_version(namespace)
+    # Bump again once the write is visible, so a read racing the commit can't cache the old rows
+    # under the new version.
+    transaction.on_commit(lambda: bump_cache_version(namespace))
+
+def build_cache_key(request, namespaces) -> str:
+    versions = ':'.join(f'{namespace}={version}' for namespace, version in sorted(get_cache_versions(namespaces).items()))
+    params = sorted((key, value) for key in request.query_params for value in request.query_params.getlist(key))
+    digest = hashlib.sha256(f'{request.path}|{params}|{versions}'.encode('utf-8')).hexdigest()
+    return f'catalog:response:{digest}'
+
+def cached_response(request, namespaces, build_response) -> Response:
+    # Reads inside an open transaction may see rows that never commit; don't let them into the cache.
+    if connection.in_atomic_block:
+        return build_response()
+    cache = get_catalog_cache()
+    key = build_cache_key(request, namespaces)
+    entry = cache.get(key)
+    if entry is not None:
+        response = Response(entry['data'])
+        validators = entry['validators']
+        if validators is None:
+            return response
+        preconditions = dict(validators)
+        if not preconditions.pop('use_last_modified'):
+            preconditions['last_modified'] = None
+        return evaluate_preconditions(request, **preconditions) or set_validators(response, **validators)
+    response = build_response()
+    if response.status_code == status.HTTP_200_OK:
+        entry = {'data': response.data, 'validators': getattr(response, 'validators', None)}
+        cache.set(key, entry, timeout=settings.CATALOG_CACHE_TIMEOUT)
+    return response
+
+def invalidate_catalog_cache(sender, **kwargs):
+    invalidate_namespace(CACHE_NAMESPACES[sender])
+
+def connect_cache_invalidation():
+    # Connected per model: a post_delete receiver without a sender would stop Django from
+    # fast-deleting every other table.
+    for model in CACHE_NAMESPACES:
+        for signal in (post_save, post_delete, bulk_write):
+            signal.connect(invalidate_catalog_cache, sender=model, dispatch_uid=f'catalog_cache_{model.__name__}')
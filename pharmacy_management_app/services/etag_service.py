@@ -0,0 +1,84 @@
+import hashlib
+from django.db.models import Count, Max, Sum
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+from ..models.product import Product
+from ..models.stock_shard import ProductStockShard
+from ..services.stock_service import get_sharded_quantity
+
+CONDITIONAL_HEADERS = ('HTTP_IF_MATCH', 'HTTP_IF_NONE_MATCH', 'HTTP_IF_MODIFIED_SINCE', 'HTTP_IF_UNMODIFIED_SINCE')
+
+def make_etag(*parts) -> str:
+    return '"%s"' % hashlib.sha256(repr(parts).encode('utf-8')).hexdigest()[:32]
+
+def has_preconditions(request) -> bool:
+    return any(header in request.META for header in CONDITIONAL_HEADERS)
+
+def get_instance_validators(instance, *extra) -> tuple:
+    return make_etag(instance._meta.label, instance.pk, instance.updated_at.isoformat(), *extra), instance.updated_at
+
+def get_product_validators(product: Product) -> tuple:
+    if not product.is_sharded:
+        return get_instance_validators(product)
+    # Sharded stock moves without touching the product row, so updated_at can't vouch for it:
+    # the shard total goes into the ETag and no Last-Modified is offered.
+    shard_quantity = getattr(product, 'current_quantity', None)
+    if shard_quantity is None:
+        shard_quantity = get_sharded_quantity(product)
+    etag, _ = get_instance_validators(product, shard_quantity)
+    return etag, None
+
+def get_collection_validators(queryset, *extra) -> tuple:
+    """
+    Max(updated_at) and COUNT(*) over the filtered set: edits and inserts move the maximum,
+    deletes and rows leaving the filter move the count.
+    """
+    summary = queryset.order_by().aggregate(last_modified=Max('updated_at'), total=Count('pk'))
+    last_modified = summary['last_modified']
+    stamp = last_modified.isoformat() if last_modified else None
+    return make_etag(queryset.model._meta.label, stamp, summary['total'], *extra), last_modified
+
+def get_page_validators(instances, envelope: dict, *extra) -> tuple:
+    """
+    Validators for one page of a list, computed from the rows already fetched for it so that
+    cursor and estimated-count pagination don't pay for a COUNT(*). The envelope carries the
+    count and next/previous links.
+    """
+    rows = [(instance.pk, instance.updated_at.isoformat()) for instance in instances]
+    last_modified = max((instance.updated_at for instance in instances), default=None)
+    label = instances[0]._meta.label if instances else None
+    return make_etag(label, rows, sorted(envelope.items()), *extra), last_modified
+
+def get_values_page_validators(rows, envelope: dict) -> tuple:
+    # values() rows carry updated_at and stock_shards; shard totals only matter when quantity was requested.
+    last_modified = max((row['updated_at'] for row in rows), default=None)
+    return make_etag(rows, sorted(envelope.items())), last_modified
+
+def get_product_page_validators(products, envelope: dict) -> tuple:
+    sharded = [product for product in products if product.is_sharded]
+    shard_totals = []
+    if all(hasattr(product, 'current_quantity') for product in sharded):
+        shard_totals = sorted((product.pk, product.current_quantity) for product in sharded)
+    elif sharded:
+        shard_totals = list(
+            ProductStockShard.objects.filter(product_id__in=[product.pk for product in sharded])
+            .values('product_id').annotate(total=Sum('quantity')).order_by('product_id')
+            .values_list('product_id', 'total')
+        )
+    return get_page_validators(products, envelope, shard_totals)
+
+def evaluate_preconditions(request, etag: str, last_modified=None):
+    """Returns a 304 or 412 response when the request's conditional headers call for one, otherwise None."""
+    timestamp = int(last_modified.timestamp()) if last_modified else None
+    response = get_conditional_response(request, etag=etag, last_modified=timestamp)
+    if response is not None and response.status_code == 304:
+        set_validators(response, etag, last_modified)
+    return response
+
+def set_validators(response, etag: str, last_modified=None, use_last_modified: bool = True):
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified.timestamp())
+    # Kept for the response cache, which re-evaluates the preconditions on a hit.
+    response.validators = {'etag': etag, 'last_modified': last_modified, 'use_last_modified': use_last_modified}
+    return response
@@ -0,0 +1,120 @@
+import hashlib
+import json
+from django.conf import settings
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.response import Response
+from ..models.idempotency_key import IdempotencyKey
+from ..models.user import User
+from ..services.purchase_service import run_with_retries
+
+def hash_request(endpoint: str, data) -> str:
+    payload = json.dumps({'endpoint': endpoint, 'data': data}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+def claim_idempotency_key(user: User, key: str, endpoint: str, request_hash: str):
+    now = timezone.now()
+    try:
+        with transaction.atomic():
+            return IdempotencyKey.objects.create(
+                user=user,
+                key=key,
+                endpoint=endpoint,
+                request_hash=request_hash,
+                expires_at=now + settings.IDEMPOTENCY_KEY_TTL,
+                locked_until=now + settings.IDEMPOTENCY_KEY_LEASE,
+            ), True
+    except IntegrityError:
+        return IdempotencyKey.objects.get(user=user, key=key), False
+
+def _held_lease(record: IdempotencyKey):
+    # The lease timestamp doubles as a fencing token: whoever took the key over last holds it.
+    if record.locked_until is None:
+        return IdempotencyKey.objects.filter(pk=record.pk, locked_until__isnull=True)
+    return IdempotencyKey.objects.filter(pk=record.pk, locked_until=record.locked_until)
+
+def take_over_idempotency_key(record: IdempotencyKey) -> bool:
+    """Claims an unfinished key whose lease has lapsed, e.g. because the process handling it died."""
+    now = timezone.now()
+    if record.is_completed or (record.locked_until is not None and record.locked_until > now):
+        return False
+    locked_until = now + settings.IDEMPOTENCY_KEY_LEASE
+    if not _held_lease(record).filter(response_status__isnull=True).update(locked_until=locked_until):
+        return False
+    record.locked_until = locked_until
+    return True
+
+def store_idempotent_response(record: IdempotencyKey, response: Response) -> bool:
+    """Saves the response unless another request has taken the key over in the meantime."""
+    record.response_status = response.status_code
+    record.response_body = response.data
+    return bool(_held_lease(record).filter(response_status__isnull=True).update(
+        response_status=record.response_status,
+        response_body=record.response_body,
+        updated_at=timezone.now(),
+    ))
+
+def release_idempotency_key(record: IdempotencyKey):
+    _held_lease(record).filter(response_status__isnull=True).delete()
+
+def replay_idempotent_response(record: IdempotencyKey, request_hash: str) -> Response:
+    if record.request_hash != request_hash:
+        return Response({'detail': 'Idempotency-Key was already used with a different request.'}, status=status.HTTP_422_UNPROCESSABLE_ENTITY)
+    if not record.is_completed:
+        return in_progress_response()
+    response = Response(record.response_body, status=record.response_status)
+    response['Idempotent-Replayed'] = 'true'
+    return response
+
+def in_progress_response() -> Response:
+    return Response({'detail': 'A request with this Idempotency-Key is still being processed.'}, status=status.HTTP_409_CONFLICT)
+
+def _respond_and_store(record: IdempotencyKey, handler) -> Response:
+    # The response is stored in the handler's transaction, so a committed purchase can't be
+    # left behind a key that still reads as in progress.
+    with transaction.atomic():
+        response = handler()
+        if response.status_code < 500 and not store_idempotent_response(record, response):
+            # Our lease lapsed and a retry took the key over; it owns the outcome, undo ours.
+            transaction.set_rollback(True)
+            return in_progress_response()
+        return response
+
+def idempotent_response(request, handler) -> Response:
+    key = request.headers.get('Idempotency-Key')
+    if not key:
+        return handler()
+    if len(key) > 255:
+        return Response({'detail': 'Idempotency-Key must be at most 255 characters.'}, status=status.HTTP_400_BAD_REQUEST)
+
+    request_hash = hash_request(request.get_full_path(), request.data)
+    record, created = claim_idempotency_key(request.user, key, request.path, request_hash)
+    if not created:
+        if record.expires_at <= timezone.now():
+            record.delete()
+            record, created = claim_idempotency_key(request.user, key, request.path, request_hash)
+        elif record.request_hash == request_hash:
+            created = take_over_idempotency_key(record)
+        if not created:
+            return replay_idempotent_response(record, request_hash)
+
+    try:
+        # Retried as a whole: a deadlock or serialization failure inside the handler dooms the
+        # transaction it shares with the stored response.
+        response = run_with_retries(_respond_and_store, record, handler)
+    except Exception:
+        release_idempotency_key(record)
+        raise
+    if response.status_code >= 500:
+        # Server errors are not final; let the client retry with the same key.
+        release_idempotency_key(record)
+    return response
+
+def purge_expired_idempotency_keys(batch_size: int = 1000) -> int:
+    deleted = 0
+    while True:
+        ids = list(IdempotencyKey.objects.filter(expires_at__lte=timezone.now()).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += IdempotencyKey.objects.filter(pk__in=ids).delete()[0]
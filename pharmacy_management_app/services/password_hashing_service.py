@@ -0,0 +1,66 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
+from django.conf import settings
+from django.contrib.auth.hashers import make_password
+
+# Kept free of model imports: spawned workers unpickle references into this module before
+# Django is set up.
+
+# Below this many passwords the pool's start-up costs more than hashing them in-process.
+MIN_PARALLEL_PASSWORDS = 4
+
+def _setup_worker():
+    # Spawned workers start from a bare interpreter; make_password needs PASSWORD_HASHERS.
+    import django
+    django.setup()
+
+@contextmanager
+def password_hashing_pool(workers: int = None):
+    """
+    Process pool for make_password(). PBKDF2 is CPU-bound and holds the GIL, so threads would
+    not help. Spawned rather than forked: forking a threaded server process can deadlock.
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers < 2:
+        yield None
+        return
+    context = multiprocessing.get_context('spawn')
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_setup_worker) as executor:
+        executor.workers = workers
+        yield executor
+
+_shared_pool = None
+_shared_pool_lock = threading.Lock()
+
+def shared_password_hashing_pool():
+    """
+    Pool for request handlers: started once per process with USER_PROVISIONING_HTTP_WORKERS
+    workers and shared by every request, instead of each request spawning a pool per CPU.
+    None when that setting leaves nothing to parallelize.
+    """
+    global _shared_pool
+    workers = settings.USER_PROVISIONING_HTTP_WORKERS
+    if workers < 2:
+        return None
+    with _shared_pool_lock:
+        if _shared_pool is None or _shared_pool.broken:
+            context = multiprocessing.get_context('spawn')
+            _shared_pool = ProcessPoolExecutor(max_workers=workers, mp_context=context, initializer=_setup_worker)
+            _shared_pool.workers = workers
+            _shared_pool.broken = False
+        return _shared_pool
+
+def hash_passwords(passwords: list, executor=None) -> list:
+    if executor is None or len(passwords) < MIN_PARALLEL_PASSWORDS:
+        return [make_password(password) for password in passwords]
+    chunksize = max(1, len(passwords) // (executor.workers * 4))
+    try:
+        return list(executor.map(make_password, passwords, chunksize=chunksize))
+    except BrokenProcessPool:
+        # A worker died, e.g. killed for memory; the shared pool is replaced on its next use.
+        executor.broken = True
+        return [make_password(password) for password in passwords]
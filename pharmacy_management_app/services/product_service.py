@@ -1,8 +1,18 @@
 from ..models import Product
-from ..serializers.product import ProductSerializer
+from ..serializers.product import ProductImportRowSerializer, ProductBulkUpdateItemSerializer
+from ..services.bulk_service import bulk_update_columns
 from ..models.suppliers import Suppliers
+from ..services.stock_service import current_quantity_expression, set_sharded_quantity
 import csv
+import io
+import json
+from itertools import islice
+from django.db import DatabaseError, transaction
 from django.db.models import Q
+from django.db.models.functions import Lower
+from django.utils import timezone
+from django.core.serializers.json import DjangoJSONEncoder
+from rest_framework import serializers
 
 def get_products(name_contains: str = "", **kwargs) -> list[Product]:
     try:
@@ -13,28 +23,286 @@ def get_products(name_contains: str = "", **kwargs) -> list[Product]:
     except Product.DoesNotExist:
         raise ValueError("Product not found")
 
-# def process_csv(file):
-#     decoded_file = file.read().decode('utf-8').splitlines()
-#     reader = csv.DictReader(decoded_file)
-#     products = []
-#     for row in reader:
-#         supplier_name = row.get('supplier')
-#         if not supplier_name or not supplier_name.strip():
-#             raise ValueError("No supplier name provided.")
-#         supplier_name = supplier_name.strip()
-#         supplier, _ = Suppliers.objects.get_or_create(
-#             name__iexact=supplier_name,
-#             defaults={'name': supplier_name}
-#         )
-        
-#         row['supplier'] = supplier.id
-#         if 'cost_price' in row:
-#             row['cost_price'] = float(row['cost_price'])
-#         if 'profit_margin' in row:
-#             row['profit_margin'] = float(row['profit_margin'])
-#         serializer = ProductSerializer(data=row)
-#         if serializer.is_valid():
-#             products.append(serializer.save())
-#         else:
-#             raise ValueError(f"Invalid data: {serializer.errors}")
-#     return products
\ No newline at end of file
+class SupplierCache:
+    """Resolves supplier names case-insensitively, creating missing suppliers in bulk."""
+
+    def __init__(self):
+        self.ids = {}
+
+    def resolve(self, names) -> dict:
+        missing = {name.lower(): name for name in names if name.lower() not in self.ids}
+        if missing:
+            existing = (
+                Suppliers.objects.annotate(lower_name=Lower('name'))
+                .filter(lower_name__in=list(missing))
+                .order_by('id')
+                .values_list('lower_name', 'id')
+            )
+            for lower_name, supplier_id in existing:
+                self.ids.setdefault(lower_name, supplier_id)
+            new = [Suppliers(name=name, contact_info='') for key, name in missing.items() if key not in self.ids]
+            for supplier in Suppliers.objects.bulk_create(new):
+                self.ids[supplier.name.lower()] = supplier.pk
+        return {name: self.ids[name.lower()] for name in names}
+
+class ProductImportResult:
+    def __init__(self, max_errors: int = 1000):
+        self.created = 0
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, line: int, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'line': line, 'errors': errors})
+
+    def as_dict(self) -> dict:
+        return {
+            'created': self.created,
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+def open_csv_stream(file) -> io.TextIOBase:
+    if isinstance(file, io.TextIOBase):
+        return file
+    return io.TextIOWrapper(file, encoding='utf-8-sig', newline='')
+
+def validate_import_row(fields: dict, row: dict) -> dict:
+    # Runs each field directly; a full Serializer.run_validation per row dominates import time.
+    data, errors = {}, {}
+    for name, field in fields.items():
+        value = row.get(name)
+        if value is None or value == '':
+            if field.required:
+                errors[name] = [field.error_messages['required']]
+            else:
+                data[name] = field.get_default()
+            continue
+        try:
+            data[name] = field.run_validation(value)
+        except serializers.ValidationError as e:
+            errors[name] = e.detail
+    if errors:
+        raise serializers.ValidationError(errors)
+    return data
+
+def _import_chunk(rows: list, suppliers: SupplierCache, result: ProductImportResult, update_existing: bool):
+    fields = ProductImportRowSerializer().fields
+    valid = {}
+    for line, row in rows:
+        try:
+            data = validate_import_row(fields, row)
+        except serializers.ValidationError as e:
+            result.add_error(line, e.detail)
+            continue
+        # A later line for the same product wins, as it would with row-by-row saves.
+        valid[(data['supplier'].lower(), data['name'].lower())] = (line, data)
+    if not valid:
+        return
+
+    try:
+        with transaction.atomic():
+            supplier_ids = suppliers.resolve({data['supplier'] for _, data in valid.values()})
+            existing = {}
+            if update_existing:
+                names = {data['name'].lower() for _, data in valid.values()}
+                # Locked like bulk_update_products, so the reserved check below holds until commit.
+                candidates = Product.objects.select_for_update().annotate(lower_name=Lower('name')).filter(
+                    supplier_id__in=set(supplier_ids.values()),
+                    lower_name__in=names
+                )
+                for product in candidates.order_by('id'):
+                    existing.setdefault((product.supplier_id, product.lower_name), product)
+
+            to_create, to_update, sharded = [], [], []
+            for line, data in valid.values():
+                supplier_id = supplier_ids[data['supplier']]
+                fields = {
+                    'description': data['description'],
+                    'cost_price': data['cost_price'],
+                    'profit_margin': data['profit_margin'],
+                    'quantity': data['quantity'],
+                }
+                product = existing.get((supplier_id, data['name'].lower()))
+                if product is None:
+                    to_create.append(Product(name=data['name'], supplier_id=supplier_id, **fields))
+                    continue
+                if product.is_sharded:
+                    # Product.quantity is ignored once stock is sharded; the shards carry it.
+                    sharded.append((product, fields.pop('quantity')))
+                elif fields['quantity'] < product.reserved_quantity:
+                    result.add_error(line, {'quantity': [f'Below the {product.reserved_quantity} units reserved.']})
+                    continue
+                for field, value in fields.items():
+                    setattr(product, field, value)
+                product.refresh_price()
+                to_update.append(product)
+
+            Product.objects.bulk_create(to_create)
+            now = timezone.now()
+            for product in to_update:
+                product.updated_at = now
+            bulk_update_columns(Product, to_update, ['description', 'cost_price', 'profit_margin', 'price', 'quantity', 'updated_at'])
+            for product, quantity in sharded:
+                set_sharded_quantity(product, quantity)
+    except DatabaseError as e:
+        # Suppliers created inside the rolled back transaction are gone too.
+        suppliers.ids.clear()
+        for line, _ in valid.values():
+            result.add_error(line, {'non_field_errors': [str(e)]})
+        return
+    result.created += len(to_create)
+    result.updated += len(to_update)
+
+def import_products_csv(file, chunk_size: int = 1000, update_existing: bool = True, max_errors: int = 1000) -> ProductImportResult:
+    reader = csv.DictReader(open_csv_stream(file))
+    required = {'name', 'cost_price', 'quantity', 'supplier'}
+    missing = required - set(reader.fieldnames or [])
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+
+    suppliers = SupplierCache()
+    result = ProductImportResult(max_errors=max_errors)
+    numbered = ((reader.line_num, row) for row in reader)
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+        _import_chunk(chunk, suppliers, result, update_existing)
+    return result
+
+BULK_UPDATE_FIELDS = ('cost_price', 'profit_margin', 'quantity')
+BULK_UPDATE_CHUNK_SIZE = 1000
+
+class ProductBulkUpdateResult:
+    def __init__(self, max_errors: int = 1000):
+        self.updated = 0
+        self.failed = 0
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_error(self, index: int, product_id, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'index': index, 'id': product_id, 'errors': errors})
+
+    def as_dict(self) -> dict:
+        return {
+            'updated': self.updated,
+            'failed': self.failed,
+            'errors': self.errors,
+        }
+
+def validate_bulk_update_item(fields: dict, item) -> dict:
+    if not isinstance(item, dict):
+        raise serializers.ValidationError({'non_field_errors': ['Expected an object.']})
+    data, errors = {}, {}
+    for name, field in fields.items():
+        if item.get(name) in (None, ''):
+            if field.required:
+                errors[name] = [field.error_messages['required']]
+            continue
+        try:
+            data[name] = field.run_validation(item[name])
+        except serializers.ValidationError as e:
+            errors[name] = e.detail
+    if not errors and not set(BULK_UPDATE_FIELDS) & set(data):
+        errors['non_field_errors'] = [f"Provide at least one of: {', '.join(BULK_UPDATE_FIELDS)}."]
+    if errors:
+        raise serializers.ValidationError(errors)
+    return data
+
+def bulk_update_products(items: list, chunk_size: int = BULK_UPDATE_CHUNK_SIZE) -> ProductBulkUpdateResult:
+    """
+    Validates every entry, then locks the referenced products in primary key order and writes the
+    valid changes with chunked CASE updates in one transaction. Invalid entries are reported and skipped.
+    """
+    result = ProductBulkUpdateResult()
+    fields = ProductBulkUpdateItemSerializer().fields
+    changes = {}
+    for index, item in enumerate(items):
+        try:
+            data = validate_bulk_update_item(fields, item)
+        except serializers.ValidationError as e:
+            result.add_error(index, item.get('id') if isinstance(item, dict) else None, e.detail)
+            continue
+        if data['id'] in changes:
+            result.add_error(index, data['id'], {'id': ['Duplicate product id.']})
+            continue
+        changes[data['id']] = (index, data)
+    if not changes:
+        return result
+
+    with transaction.atomic():
+        products = {
+            product.pk: product
+            for product in Product.objects.select_for_update()
+            .filter(pk__in=list(changes)).order_by('pk')
+            .only('id', 'cost_price', 'profit_margin', 'quantity', 'reserved_quantity', 'stock_shards')
+        }
+        now = timezone.now()
+        to_update = []
+        for product_id, (index, data) in changes.items():
+            product = products.get(product_id)
+            if product is None:
+                result.add_error(index, product_id, {'id': ['Product not found.']})
+                continue
+            if 'quantity' in data:
+                if product.is_sharded:
+                    result.add_error(index, product_id, {'quantity': ['Stock is sharded; update it through the product endpoint.']})
+                    continue
+                if data['quantity'] < product.reserved_quantity:
+                    result.add_error(index, product_id, {'quantity': [f'Below the {product.reserved_quantity} units reserved.']})
+                    continue
+            for field in BULK_UPDATE_FIELDS:
+                if field in data:
+                    setattr(product, field, data[field])
+            product.refresh_price()
+            product.updated_at = now
+            to_update.append(product)
+        bulk_update_columns(
+            Product, to_update, ['cost_price', 'profit_margin', 'price', 'quantity', 'updated_at'], batch_size=chunk_size
+        )
+    result.updated = len(to_update)
+    return result
+
+EXPORT_COLUMNS = ['id', 'name', 'description', 'cost_price', 'profit_margin', 'quantity', 'supplier_id', 'supplier_name', 'updated_at', 'price']
+
+class Echo:
+    """File-like object whose write() hands the line back to csv.writer's caller."""
+
+    def write(self, value):
+        return value
+
+def get_product_export_queryset(supplier_id: int = None, updated_after=None):
+    products = Product.objects.all()
+    if supplier_id is not None:
+        products = products.filter(supplier_id=supplier_id)
+    if updated_after is not None:
+        products = products.filter(updated_at__gt=updated_after)
+    return products.order_by('id').values_list(
+        'id', 'name', 'description', 'cost_price', 'profit_margin', current_quantity_expression(),
+        'supplier_id', 'supplier__name', 'updated_at', 'price'
+    )
+
+def iter_product_export(supplier_id: int = None, updated_after=None, chunk_size: int = 2000):
+    # iterator() streams through a server-side cursor on PostgreSQL instead of loading the catalog.
+    for row in get_product_export_queryset(supplier_id, updated_after).iterator(chunk_size=chunk_size):
+        yield dict(zip(EXPORT_COLUMNS, row))
+
+def stream_products_csv(supplier_id: int = None, updated_after=None, chunk_size: int = 2000):
+    writer = csv.writer(Echo())
+    yield writer.writerow(EXPORT_COLUMNS)
+    for record in iter_product_export(supplier_id, updated_after, chunk_size):
+        yield writer.writerow([
+            record['updated_at'].isoformat() if column == 'updated_at' else record[column]
+            for column in EXPORT_COLUMNS
+        ])
+
+def stream_products_ndjson(supplier_id: int = None, updated_after=None, chunk_size: int = 2000):
+    for record in iter_product_export(supplier_id, updated_after, chunk_size):
+        yield json.dumps(record, cls=DjangoJSONEncoder) + '\n'
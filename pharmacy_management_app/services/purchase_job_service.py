@@ -0,0 +1,125 @@
+import logging
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from ..models.bank_account import BankAccount
+from ..models.product import Product
+from ..models.purchase_job import PurchaseJob
+from ..models.user import User
+from ..services.purchase_service import _post_cart_purchase, run_with_retries
+
+logger = logging.getLogger(__name__)
+
+def enqueue_purchase(user: User, items: list[dict]) -> PurchaseJob:
+    return PurchaseJob.objects.create(
+        user=user,
+        items=[{'product_id': item['product_id'], 'quantity': item['quantity']} for item in items],
+    )
+
+def get_user_purchase_job(user: User, job_id: int) -> PurchaseJob:
+    return PurchaseJob.objects.get(pk=job_id, user=user)
+
+def _claimable_jobs():
+    stale_before = timezone.now() - settings.PURCHASE_JOB_LOCK_TIMEOUT
+    return PurchaseJob.objects.filter(
+        Q(status=PurchaseJob.STATUS_PENDING) |
+        Q(status=PurchaseJob.STATUS_PROCESSING, locked_at__lt=stale_before, attempts__lt=settings.PURCHASE_JOB_MAX_ATTEMPTS)
+    ).order_by('id')
+
+def _claim_purchase_job():
+    if connection.features.has_select_for_update_skip_locked:
+        with transaction.atomic():
+            job = _claimable_jobs().select_for_update(skip_locked=True).first()
+            if job is None:
+                return None
+            job.status = PurchaseJob.STATUS_PROCESSING
+            job.locked_at = timezone.now()
+            job.attempts += 1
+            job.save(update_fields=['status', 'locked_at', 'attempts', 'updated_at'])
+            return job
+
+    # Without SKIP LOCKED (e.g. SQLite) claim by compare-and-set on the job's previous state.
+    for job in _claimable_jobs()[:10]:
+        claimed = PurchaseJob.objects.filter(pk=job.pk, status=job.status, attempts=job.attempts).update(
+            status=PurchaseJob.STATUS_PROCESSING,
+            locked_at=timezone.now(),
+            attempts=job.attempts + 1,
+            updated_at=timezone.now(),
+        )
+        if claimed:
+            job.refresh_from_db()
+            return job
+    return None
+
+def claim_purchase_job():
+    return run_with_retries(_claim_purchase_job)
+
+def _claimed(job: PurchaseJob):
+    # Matches only while this worker's claim stands; a reclaim bumps attempts.
+    return PurchaseJob.objects.filter(pk=job.pk, status=PurchaseJob.STATUS_PROCESSING, attempts=job.attempts)
+
+def _finish_job(job: PurchaseJob, status: str, result=None, error: str = ''):
+    finished = run_with_retries(
+        _claimed(job).update, status=status, result=result, error=error, locked_at=None, updated_at=timezone.now()
+    )
+    if finished:
+        job.status, job.result, job.error, job.locked_at = status, result, error, None
+
+def _complete_purchase_job(job: PurchaseJob) -> bool:
+    """
+    Runs the purchase and marks the job succeeded in one transaction, so a worker that dies
+    part-way leaves nothing for a reclaim to charge twice. Touching the job row first also
+    holds its lock for the whole purchase, and SKIP LOCKED claims pass over it however long
+    that takes.
+    """
+    with transaction.atomic():
+        if not _claimed(job).update(locked_at=timezone.now()):
+            return False
+        purchases, total = _post_cart_purchase(user=job.user, items=job.items)
+        job.result = {'purchase_ids': [purchase.pk for purchase in purchases], 'total': str(total)}
+        _claimed(job).update(status=PurchaseJob.STATUS_SUCCEEDED, result=job.result, error='', locked_at=None,
+                             updated_at=timezone.now())
+    job.status, job.error, job.locked_at = PurchaseJob.STATUS_SUCCEEDED, '', None
+    return True
+
+def process_purchase_job(job: PurchaseJob):
+    try:
+        run_with_retries(_complete_purchase_job, job)
+    except (Product.DoesNotExist, BankAccount.DoesNotExist, ValueError) as e:
+        _finish_job(job, PurchaseJob.STATUS_FAILED, error=str(e))
+    except Exception as e:
+        logger.exception('Purchase job %s failed', job.pk)
+        if job.attempts < settings.PURCHASE_JOB_MAX_ATTEMPTS:
+            _finish_job(job, PurchaseJob.STATUS_PENDING, error=str(e))
+        else:
+            _finish_job(job, PurchaseJob.STATUS_FAILED, error=str(e))
+    return job
+
+def fail_abandoned_jobs() -> int:
+    """Fails jobs whose last allowed attempt died mid-purchase; they are never reclaimed."""
+    stale_before = timezone.now() - settings.PURCHASE_JOB_LOCK_TIMEOUT
+    abandoned = PurchaseJob.objects.filter(
+        status=PurchaseJob.STATUS_PROCESSING, locked_at__lt=stale_before, attempts__gte=settings.PURCHASE_JOB_MAX_ATTEMPTS,
+    )
+    with transaction.atomic():
+        if connection.features.has_select_for_update_skip_locked:
+            # A locked row is a purchase still running, not an abandoned one.
+            abandoned = abandoned.filter(pk__in=list(abandoned.select_for_update(skip_locked=True).values_list('pk', flat=True)))
+        return abandoned.update(
+            status=PurchaseJob.STATUS_FAILED,
+            error='The purchase was interrupted on its last attempt.',
+            locked_at=None,
+            updated_at=timezone.now(),
+        )
+
+def process_pending_jobs(limit: int = None) -> int:
+    run_with_retries(fail_abandoned_jobs)
+    processed = 0
+    while limit is None or processed < limit:
+        job = claim_purchase_job()
+        if job is None:
+            break
+        process_purchase_job(job)
+        processed += 1
+    return processed
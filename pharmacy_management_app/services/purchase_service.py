@@ -1,26 +1,137 @@
-from ..models.bank_account import BankAccount
+import random
+import time
+from decimal import Decimal
 from ..models.product import Product
+from ..models.purchase import Purchase
 from ..models.user import User
-from ..services.bank_account_service import get_bank_account, debite_from_bank_account
-from ..services.product_service import get_products
-from django.db.utils import IntegrityError
-from django.db import transaction
-
-
-def validate_purchase_data(user: User, product_id: int, quantity: int):
-    bank_account = get_bank_account(user)
-    product = get_products(product_id)
-    if bank_account.balance <= product.price * quantity:
-        raise ValueError('Insufficient funds')
-    if product.quantity < quantity:
+from ..services.bank_account_service import debite_from_bank_account
+from ..services.stock_service import decrement_sharded_stock
+from django.db.models import Case, F, When
+from django.db.utils import OperationalError
+from django.db import connection, transaction
+
+MAX_PURCHASE_ATTEMPTS = 8
+RETRY_BACKOFF_SECONDS = 0.005
+MAX_RETRY_BACKOFF_SECONDS = 0.5
+
+# serialization_failure and deadlock_detected on PostgreSQL; lock errors on SQLite.
+RETRYABLE_PGCODES = {'40001', '40P01'}
+RETRYABLE_MESSAGES = ('database is locked', 'database table is locked')
+
+
+def is_retryable_error(error: OperationalError) -> bool:
+    cause = getattr(error, '__cause__', None)
+    if getattr(cause, 'pgcode', None) in RETRYABLE_PGCODES:
+        return True
+    return any(message in str(error) for message in RETRYABLE_MESSAGES)
+
+
+def needs_outer_retry(error: OperationalError) -> bool:
+    """A retryable error raised inside an enclosing transaction, which only its outermost caller can retry."""
+    return connection.in_atomic_block and is_retryable_error(error)
+
+
+def run_with_retries(operation, *args, attempts: int = MAX_PURCHASE_ATTEMPTS, **kwargs):
+    # A serialization failure or deadlock dooms the whole transaction on PostgreSQL, so retrying
+    # inside an enclosing one can't help: run once and leave the retry to the outermost caller.
+    if connection.in_atomic_block:
+        attempts = 1
+    for attempt in range(1, attempts + 1):
+        try:
+            return operation(*args, **kwargs)
+        except OperationalError as e:
+            if attempt == attempts or not is_retryable_error(e):
+                raise
+            time.sleep(min(RETRY_BACKOFF_SECONDS * 2 ** attempt, MAX_RETRY_BACKOFF_SECONDS) * random.random())
+
+
+def validate_purchase_data(product: Product, quantity: int):
+    if quantity <= 0:
+        raise ValueError('Quantity must be positive')
+    # Sharded stock is checked shard by shard when it is decremented.
+    if not product.is_sharded and product.available_quantity < quantity:
         raise ValueError('Product out of stock')
 
+
+def get_user_purchases(user: User):
+    return (
+        Purchase.objects.filter(user=user)
+        .select_related('product')
+        .only('id', 'user_id', 'product_id', 'quantity', 'purchase_date', 'product__name')
+    )
+
+
 def create_purchase_record(user: User, product: Product, quantity: int):
-    user.purchased_products.add(product, through_defaults={'quantity': quantity})
+    return Purchase.objects.create(user=user, product=product, quantity=quantity)
+
+
+def _post_purchase(user: User, product_id: int, quantity: int):
+    if quantity <= 0:
+        raise ValueError('Quantity must be positive')
+    # Lock order is always product (or shard) rows first, then the bank account.
+    # The conditional stock UPDATE is the first statement, so the row lock is taken
+    # before anything is read: a read-then-write transaction has to upgrade its lock,
+    # which SQLite refuses outright instead of waiting. Sharded products fall through
+    # to their shards and never serialize on the Product row.
+    with transaction.atomic():
+        decremented = Product.objects.filter(
+            pk=product_id,
+            stock_shards=0,
+            quantity__gte=F('reserved_quantity') + quantity
+        ).update(quantity=F('quantity') - quantity)
+        product = Product.objects.get(pk=product_id)
+        if not decremented:
+            if not product.is_sharded:
+                raise ValueError('Product out of stock')
+            decrement_sharded_stock(product=product, quantity=quantity)
+        amount = Decimal(product.price * quantity).quantize(Decimal('0.01'))
+        debite_from_bank_account(user=user, amount=amount, description=f'Purchase of {quantity} x {product.name}')
+        return create_purchase_record(user=user, product=product, quantity=quantity)
+
 
 def post_purchase(user: User, product_id: int, quantity: int):
+    return run_with_retries(_post_purchase, user=user, product_id=product_id, quantity=quantity)
+
+
+def merge_cart_items(items: list[dict]) -> dict[int, int]:
+    quantities = {}
+    for item in items:
+        quantities[item['product_id']] = quantities.get(item['product_id'], 0) + item['quantity']
+    return quantities
+
+
+def _post_cart_purchase(user: User, items: list[dict]):
+    quantities = merge_cart_items(items)
     with transaction.atomic():
-        product = get_products(product_id)
-        validate_purchase_data(user=user, product_id=product_id, quantity=quantity)
-        debite_from_bank_account(user=user, amount=product.price * quantity)
-        create_purchase_record(user=user, product=product, quantity=quantity)
+        products = list(Product.objects.filter(pk__in=quantities).order_by('pk'))
+        locked_ids = [product.pk for product in products if not product.is_sharded]
+        if locked_ids:
+            locked = {p.pk: p for p in Product.objects.select_for_update().filter(pk__in=locked_ids).order_by('pk')}
+            products = [locked.get(product.pk, product) for product in products]
+        if len(products) != len(quantities):
+            missing = sorted(set(quantities) - {product.pk for product in products})
+            raise Product.DoesNotExist(f'Product not found: {missing}')
+
+        total = Decimal('0.00')
+        for product in products:
+            validate_purchase_data(product=product, quantity=quantities[product.pk])
+            total += product.price * quantities[product.pk]
+        total = total.quantize(Decimal('0.01'))
+
+        if locked_ids:
+            Product.objects.filter(pk__in=locked_ids).update(quantity=Case(
+                *[When(pk=product_id, then=F('quantity') - quantities[product_id]) for product_id in locked_ids],
+                default=F('quantity'),
+            ))
+        for product in products:
+            if product.is_sharded:
+                decrement_sharded_stock(product=product, quantity=quantities[product.pk])
+        debite_from_bank_account(user=user, amount=total, description=f'Checkout of {len(products)} products')
+        purchases = Purchase.objects.bulk_create([
+            Purchase(user=user, product=product, quantity=quantities[product.pk]) for product in products
+        ])
+        return purchases, total
+
+
+def post_cart_purchase(user: User, items: list[dict]):
+    return run_with_retries(_post_cart_purchase, user=user, items=items)
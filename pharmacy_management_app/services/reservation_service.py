@@ -0,0 +1,118 @@
+from decimal import Decimal
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+from ..models.product import Product
+from ..models.stock_reservation import StockReservation
+from ..models.user import User
+from ..services.bank_account_service import debite_from_bank_account
+from ..services.purchase_service import create_purchase_record, run_with_retries
+
+def get_user_reservations(user: User, status: str = ""):
+    reservations = StockReservation.objects.filter(user=user).select_related('product')
+    if status:
+        reservations = reservations.filter(status=status)
+    return reservations.order_by('-created_at')
+
+def get_user_reservation(user: User, reservation_id: int, for_update: bool = False) -> StockReservation:
+    reservations = StockReservation.objects.filter(user=user)
+    if for_update:
+        reservations = reservations.select_for_update()
+    return reservations.get(pk=reservation_id)
+
+def _release_held_stock(reservation: StockReservation):
+    Product.objects.filter(pk=reservation.product_id).update(reserved_quantity=F('reserved_quantity') - reservation.quantity)
+
+def _close_reservation(reservation: StockReservation, status: str):
+    reservation.status = status
+    reservation.save(update_fields=['status', 'updated_at'])
+
+def _create_reservation(user: User, product_id: int, quantity: int) -> StockReservation:
+    with transaction.atomic():
+        product = Product.objects.get(pk=product_id)
+        if product.is_sharded:
+            raise ValueError('Stock reservations are not available for sharded products')
+        held = Product.objects.filter(
+            pk=product.pk,
+            quantity__gte=F('reserved_quantity') + quantity
+        ).update(reserved_quantity=F('reserved_quantity') + quantity)
+        if not held:
+            raise ValueError('Product out of stock')
+        return StockReservation.objects.create(
+            user=user,
+            product=product,
+            quantity=quantity,
+            expires_at=timezone.now() + settings.STOCK_RESERVATION_TTL,
+        )
+
+def create_reservation(user: User, product_id: int, quantity: int) -> StockReservation:
+    return run_with_retries(_create_reservation, user=user, product_id=product_id, quantity=quantity)
+
+def _confirm_reservation(user: User, reservation_id: int):
+    with transaction.atomic():
+        reservation = get_user_reservation(user, reservation_id, for_update=True)
+        if reservation.status != StockReservation.STATUS_ACTIVE:
+            raise ValueError(f'Reservation is {reservation.status}')
+        if reservation.expires_at <= timezone.now():
+            raise ValueError('Reservation expired')
+
+        product = Product.objects.select_for_update().get(pk=reservation.product_id)
+        amount = Decimal(product.price * reservation.quantity).quantize(Decimal('0.01'))
+        # Conditional, so a stock level edited below the hold can't be driven negative.
+        confirmed = Product.objects.filter(
+            pk=product.pk,
+            quantity__gte=reservation.quantity,
+            reserved_quantity__gte=reservation.quantity,
+        ).update(
+            quantity=F('quantity') - reservation.quantity,
+            reserved_quantity=F('reserved_quantity') - reservation.quantity,
+        )
+        if not confirmed:
+            raise ValueError('Product out of stock')
+        debite_from_bank_account(user=user, amount=amount, description=f'Reservation {reservation.pk}: {reservation.quantity} x {product.name}')
+        purchase = create_purchase_record(user=user, product=product, quantity=reservation.quantity)
+        _close_reservation(reservation, StockReservation.STATUS_CONFIRMED)
+        return reservation, purchase
+
+def confirm_reservation(user: User, reservation_id: int):
+    return run_with_retries(_confirm_reservation, user=user, reservation_id=reservation_id)
+
+def _release_reservation(user: User, reservation_id: int) -> StockReservation:
+    with transaction.atomic():
+        reservation = get_user_reservation(user, reservation_id, for_update=True)
+        if reservation.status != StockReservation.STATUS_ACTIVE:
+            raise ValueError(f'Reservation is {reservation.status}')
+        _release_held_stock(reservation)
+        _close_reservation(reservation, StockReservation.STATUS_RELEASED)
+        return reservation
+
+def release_reservation(user: User, reservation_id: int) -> StockReservation:
+    return run_with_retries(_release_reservation, user=user, reservation_id=reservation_id)
+
+def _expire_batch(now, batch_size: int) -> int:
+    with transaction.atomic():
+        reservations = list(
+            StockReservation.objects.select_for_update(skip_locked=True)
+            .filter(status=StockReservation.STATUS_ACTIVE, expires_at__lte=now)
+            .order_by('expires_at')[:batch_size]
+        )
+        held = {}
+        for reservation in reservations:
+            held[reservation.product_id] = held.get(reservation.product_id, 0) + reservation.quantity
+        for product_id in sorted(held):
+            Product.objects.filter(pk=product_id).update(reserved_quantity=F('reserved_quantity') - held[product_id])
+        StockReservation.objects.filter(pk__in=[r.pk for r in reservations]).update(
+            status=StockReservation.STATUS_EXPIRED,
+            updated_at=now,
+        )
+        return len(reservations)
+
+def expire_reservations(batch_size: int = 500) -> int:
+    now = timezone.now()
+    expired = 0
+    while True:
+        count = run_with_retries(_expire_batch, now, batch_size)
+        expired += count
+        if count < batch_size:
+            return expired
@@ -0,0 +1,118 @@
+import re
+from django.db import connection, connections
+from django.db.models import Case, IntegerField, Q, Value, When
+from ..models.product import Product
+from ..services.stock_service import current_quantity_expression
+
+# Must match the generated search_vector column created in migration 0013.
+SEARCH_CONFIG = 'english'
+SEARCH_TABLE = 'pharmacy_management_app_product_search'
+MAX_SEARCH_RESULTS = 100
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+PRODUCT_TABLE = Product._meta.db_table
+SQLITE_TRIGGERS = {
+    'product_search_ai': f"""CREATE TRIGGER IF NOT EXISTS product_search_ai AFTER INSERT ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+    'product_search_ad': f"""CREATE TRIGGER IF NOT EXISTS product_search_ad AFTER DELETE ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+    END""",
+    'product_search_au': f"""CREATE TRIGGER IF NOT EXISTS product_search_au AFTER UPDATE OF name, description ON {PRODUCT_TABLE} BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, name, description) VALUES ('delete', old.id, old.name, old.description);
+        INSERT INTO {SEARCH_TABLE}(rowid, name, description) VALUES (new.id, new.name, new.description);
+    END""",
+}
+
+def ensure_sqlite_search_triggers(using: str = 'default', **kwargs):
+    """
+    post_migrate hook. SQLite rebuilds a table from scratch for most ALTERs, which silently
+    drops its triggers, so any later migration on the product table would stop the FTS index
+    from following writes. Reinstall them and resync the index when that happened.
+    """
+    db = connections[using]
+    if db.vendor != 'sqlite':
+        return
+    with db.cursor() as cursor:
+        cursor.execute("SELECT name FROM sqlite_master WHERE type IN ('table', 'trigger') AND name IN (%s, %s, %s, %s)",
+                       [SEARCH_TABLE, *SQLITE_TRIGGERS])
+        existing = {row[0] for row in cursor.fetchall()}
+        if SEARCH_TABLE not in existing or existing.issuperset(SQLITE_TRIGGERS):
+            return
+        for statement in SQLITE_TRIGGERS.values():
+            cursor.execute(statement)
+        cursor.execute(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')")
+
+def tokenize_query(query: str) -> list[str]:
+    return TOKEN_RE.findall(query or '')[:16]
+
+def _postgres_fulltext(query: str, limit: int) -> list[tuple]:
+    sql = (
+        f'SELECT id, ts_rank_cd(search_vector, query) AS rank '
+        f'FROM {PRODUCT_TABLE}, websearch_to_tsquery(%s, %s) query '
+        f'WHERE search_vector @@ query ORDER BY rank DESC, id LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [SEARCH_CONFIG, query, limit])
+        return cursor.fetchall()
+
+def _postgres_trigram(query: str, limit: int, exclude: list[int]) -> list[tuple]:
+    # name % query is answered by the gin_trgm_ops index; similarity() only ranks the survivors.
+    sql = (
+        f'SELECT id, similarity(name, %s) AS rank FROM {PRODUCT_TABLE} '
+        f'WHERE name %% %s AND NOT (id = ANY(%s)) ORDER BY rank DESC, id LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [query, query, exclude, limit])
+        return cursor.fetchall()
+
+def _sqlite_fulltext(tokens: list[str], limit: int) -> list[tuple]:
+    # Every token must match; the last one as a prefix so partially typed words still hit.
+    match = ' '.join(f'"{token}"' for token in tokens[:-1])
+    match = f'{match} "{tokens[-1]}"*'.strip()
+    sql = (
+        f'SELECT rowid, -bm25({SEARCH_TABLE}, 10.0, 1.0) AS rank FROM {SEARCH_TABLE} '
+        f'WHERE {SEARCH_TABLE} MATCH %s ORDER BY rank DESC, rowid LIMIT %s'
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(sql, [match, limit])
+        return cursor.fetchall()
+
+def _icontains_search(tokens: list[str], limit: int) -> list[tuple]:
+    # Unindexed fallback for backends without a full-text index: every token must appear in the
+    # name or description, and products matching by name rank first.
+    matches, name_matches = Q(), Q()
+    for token in tokens:
+        matches &= Q(name__icontains=token) | Q(description__icontains=token)
+        name_matches &= Q(name__icontains=token)
+    rank = Case(When(name_matches, then=Value(2)), default=Value(1), output_field=IntegerField())
+    return list(
+        Product.objects.filter(matches).annotate(rank=rank).order_by('-rank', 'id').values_list('id', 'rank')[:limit]
+    )
+
+def search_product_ids(query: str, limit: int = 20) -> list[tuple]:
+    """Returns (product_id, rank) pairs, best match first."""
+    tokens = tokenize_query(query)
+    if not tokens:
+        return []
+    limit = max(1, min(limit, MAX_SEARCH_RESULTS))
+    if connection.vendor == 'postgresql':
+        hits = _postgres_fulltext(query, limit)
+        if len(hits) < limit:
+            hits += _postgres_trigram(query, limit - len(hits), [pk for pk, _ in hits])
+        return hits
+    if connection.vendor == 'sqlite':
+        return _sqlite_fulltext(tokens, limit)
+    return _icontains_search(tokens, limit)
+
+def search_products(query: str, limit: int = 20) -> list[Product]:
+    hits = search_product_ids(query, limit)
+    products = Product.objects.annotate(current_quantity=current_quantity_expression()).in_bulk([pk for pk, _ in hits])
+    results = []
+    for pk, rank in hits:
+        if pk in products:
+            product = products[pk]
+            product.search_rank = float(rank)
+            results.append(product)
+    return results
@@ -0,0 +1,137 @@
+import random
+from django.db import transaction
+from django.db.models import Case, F, IntegerField, OuterRef, Q, Subquery, Sum, When
+from django.db.models.functions import Coalesce, Greatest
+from ..models.product import Product
+from ..models.stock_shard import ProductStockShard
+
+MAX_STOCK_SHARDS = 64
+
+def get_sharded_quantity(product: Product) -> int:
+    total = ProductStockShard.objects.filter(product_id=product.pk).aggregate(total=Sum('quantity'))['total']
+    return total or 0
+
+def sharded_quantity_subquery():
+    return Subquery(
+        ProductStockShard.objects.filter(product=OuterRef('pk'))
+        .values('product')
+        .annotate(total=Sum('quantity'))
+        .values('total'),
+        output_field=IntegerField()
+    )
+
+def current_quantity_expression():
+    return Case(
+        When(stock_shards=0, then=F('quantity')),
+        default=Coalesce(sharded_quantity_subquery(), 0),
+        output_field=IntegerField()
+    )
+
+def split_quantity(quantity: int, shards: int) -> list[int]:
+    base, remainder = divmod(quantity, shards)
+    return [base + (1 if index < remainder else 0) for index in range(shards)]
+
+def _write_shards(product: Product, quantity: int):
+    ProductStockShard.objects.filter(product_id=product.pk).delete()
+    ProductStockShard.objects.bulk_create([
+        ProductStockShard(product_id=product.pk, shard_index=index, quantity=shard_quantity)
+        for index, shard_quantity in enumerate(split_quantity(quantity, product.stock_shards))
+    ])
+
+def enable_sharded_stock(product_id: int, shards: int) -> Product:
+    if not 1 <= shards <= MAX_STOCK_SHARDS:
+        raise ValueError(f'Shard count must be between 1 and {MAX_STOCK_SHARDS}')
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        if product.reserved_quantity:
+            raise ValueError('Product has active reservations')
+        quantity = get_sharded_quantity(product) if product.is_sharded else product.quantity
+        product.stock_shards = shards
+        product.quantity = 0
+        product.save(update_fields=['stock_shards', 'quantity', 'updated_at'])
+        _write_shards(product, quantity)
+        return product
+
+def disable_sharded_stock(product_id: int) -> Product:
+    with transaction.atomic():
+        product = Product.objects.select_for_update().get(pk=product_id)
+        if not product.is_sharded:
+            return product
+        shards = ProductStockShard.objects.select_for_update().filter(product_id=product.pk)
+        product.quantity = sum(shard.quantity for shard in shards)
+        product.stock_shards = 0
+        product.save(update_fields=['stock_shards', 'quantity', 'updated_at'])
+        ProductStockShard.objects.filter(product_id=product.pk).delete()
+        return product
+
+def set_sharded_quantity(product: Product, quantity: int):
+    with transaction.atomic():
+        list(ProductStockShard.objects.select_for_update().filter(product_id=product.pk).order_by('shard_index'))
+        _write_shards(product, quantity)
+
+def decrement_sharded_stock(product: Product, quantity: int):
+    candidates = list(
+        ProductStockShard.objects.filter(product_id=product.pk, quantity__gte=quantity)
+        .values_list('shard_index', flat=True)
+    )
+    random.shuffle(candidates)
+    for shard_index in candidates:
+        updated = ProductStockShard.objects.filter(
+            product_id=product.pk,
+            shard_index=shard_index,
+            quantity__gte=quantity
+        ).update(quantity=F('quantity') - quantity)
+        if updated:
+            return
+
+    # No single shard can cover the line; drain shards in index order under lock.
+    shards = list(ProductStockShard.objects.select_for_update().filter(product_id=product.pk, quantity__gt=0).order_by('shard_index'))
+    if sum(shard.quantity for shard in shards) < quantity:
+        raise ValueError('Product out of stock')
+    remaining = quantity
+    for shard in shards:
+        taken = min(shard.quantity, remaining)
+        ProductStockShard.objects.filter(pk=shard.pk).update(quantity=F('quantity') - taken)
+        remaining -= taken
+        if not remaining:
+            break
+
+def get_low_stock_products(supplier_id: int = None):
+    """
+    Products whose stock is below their reorder_level. Unsharded rows come straight from the
+    partial index product_low_stock_idx; sharded products (few, and hot) have their counters summed.
+    """
+    sharded_low = (
+        Product.objects.filter(stock_shards__gt=0, reorder_level__gt=0)
+        .annotate(current_quantity=Coalesce(sharded_quantity_subquery(), 0))
+        .filter(current_quantity__lt=F('reorder_level'))
+        .values('pk')
+    )
+    unsharded_low = Product.objects.filter(stock_shards=0, quantity__lt=F('reorder_level'))
+    if supplier_id is not None:
+        unsharded_low = unsharded_low.filter(supplier_id=supplier_id)
+        sharded_low = sharded_low.filter(supplier_id=supplier_id)
+    # Two IN subqueries rather than one OR'd WHERE: a partial index only serves a predicate that implies it.
+    products = Product.objects.filter(Q(pk__in=unsharded_low.values('pk')) | Q(pk__in=sharded_low))
+    return products.annotate(current_quantity=current_quantity_expression()).order_by('supplier_id', 'id')
+
+def get_reorder_list(supplier_id: int = None) -> list[dict]:
+    """Low-stock products grouped by supplier, with the units to order for each."""
+    rows = (
+        get_low_stock_products(supplier_id)
+        .annotate(order_quantity=Greatest(F('reorder_quantity'), F('reorder_level') - F('current_quantity')))
+        .order_by('supplier__name', 'supplier_id', 'name', 'id')
+        .values_list('supplier_id', 'supplier__name', 'id', 'name', 'current_quantity', 'reorder_level', 'order_quantity')
+    )
+    suppliers = []
+    for supplier_id, supplier_name, product_id, name, current_quantity, reorder_level, order_quantity in rows:
+        if not suppliers or suppliers[-1]['supplier_id'] != supplier_id:
+            suppliers.append({'supplier_id': supplier_id, 'supplier_name': supplier_name, 'products': []})
+        suppliers[-1]['products'].append({
+            'id': product_id,
+            'name': name,
+            'quantity': current_quantity,
+            'reorder_level': reorder_level,
+            'order_quantity': order_quantity,
+        })
+    return suppliers
@@ -1,7 +1,16 @@
+from decimal import Decimal
 from django.db.utils import IntegrityError
 from django.core.exceptions import ObjectDoesNotExist
+from ..models.product import Product
+from ..models.stock_shard import ProductStockShard
 from ..models.suppliers import Suppliers
-from django.db.models import Q
+from django.db.models import Count, DecimalField, F, IntegerField, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from ..services.stock_service import current_quantity_expression
+
+SUPPLIER_STATS_FIELDS = ('product_count', 'total_units', 'inventory_value')
+INVENTORY_VALUE_FIELD = DecimalField(max_digits=20, decimal_places=2)
+INCLUDED_PRODUCTS_LIMIT = 10
 
 def create_supplier(data: dict):
     try:
@@ -11,9 +20,10 @@ def create_supplier(data: dict):
         raise IntegrityError(error_message)
     return supplier
 
-def get_supplier(supplier_id: int):
+def get_supplier(supplier_id: int, for_update: bool = False):
+    queryset = Suppliers.objects.select_for_update() if for_update else Suppliers.objects
     try:
-        return Suppliers.objects.get(pk=supplier_id)
+        return queryset.get(pk=supplier_id)
     except ObjectDoesNotExist as e:
         raise ObjectDoesNotExist("Supplier not found.") from e
 
@@ -41,3 +51,45 @@ def delete_supplier(supplier_id: int):
     supplier = get_supplier(supplier_id)
     supplier.delete()
     return supplier
+
+def _supplier_total(queryset, group_by: str, aggregate, output_field, zero):
+    return Coalesce(
+        Subquery(queryset.order_by().values(group_by).annotate(total=aggregate).values('total'), output_field=output_field),
+        Value(zero),
+        output_field=output_field
+    )
+
+def annotate_supplier_stats(queryset):
+    """
+    Adds product_count, total_units and inventory_value (units at cost price) to each supplier.
+    Correlated subqueries rather than a JOIN/GROUP BY, so a paginated list only aggregates the
+    suppliers on the page. Sharded products keep their units in the stock shards.
+    """
+    products = Product.objects.filter(supplier=OuterRef('pk'))
+    shards = ProductStockShard.objects.filter(product__supplier=OuterRef('pk'), product__stock_shards__gt=0)
+    return queryset.annotate(
+        product_count=_supplier_total(products, 'supplier', Count('pk'), IntegerField(), 0),
+        total_units=(
+            _supplier_total(products, 'supplier', Sum('quantity'), IntegerField(), 0)
+            + _supplier_total(shards, 'product__supplier', Sum('quantity'), IntegerField(), 0)
+        ),
+        inventory_value=(
+            _supplier_total(products, 'supplier', Sum(F('quantity') * F('cost_price'), output_field=INVENTORY_VALUE_FIELD),
+                            INVENTORY_VALUE_FIELD, Decimal('0'))
+            + _supplier_total(shards, 'product__supplier',
+                              Sum(F('quantity') * F('product__cost_price'), output_field=INVENTORY_VALUE_FIELD),
+                              INVENTORY_VALUE_FIELD, Decimal('0'))
+        ),
+    )
+
+def supplier_products(supplier_id: int):
+    return Product.objects.filter(supplier_id=supplier_id).annotate(current_quantity=current_quantity_expression())
+
+def prefetch_supplier_products(queryset, limit: int = INCLUDED_PRODUCTS_LIMIT):
+    """
+    Attaches each supplier's first `limit` products by name as included_products. Django applies
+    the slice per supplier with a window function, so a page of suppliers costs one product
+    query whatever its size.
+    """
+    products = Product.objects.annotate(current_quantity=current_quantity_expression()).order_by('name', 'id')[:limit]
+    return queryset.prefetch_related(Prefetch('products', queryset=products, to_attr='included_products'))
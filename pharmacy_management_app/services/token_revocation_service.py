@@ -0,0 +1,156 @@
+import threading
+import time
+from datetime import datetime, timedelta, timezone as dt_timezone
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Q
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+from ..models.token_revocation import TokenRevocation
+from ..services.cache_service import bump_cache_version, get_cache_version
+
+# Bumped in the shared cache after every committed revocation, so each worker process can tell
+# that its in-memory copy has fallen behind without asking the database.
+REVOCATION_VERSION_NAMESPACE = 'token_revocation'
+# Incremental refreshes re-read rows created this long before the previous refresh, so a row
+# whose transaction committed late, or was stamped by a server with a slightly slow clock, is
+# still picked up. Re-reading a row is harmless.
+REFRESH_OVERLAP = timedelta(minutes=5)
+
+def _token_expires_at(token) -> datetime:
+    return datetime.fromtimestamp(token['exp'], tz=dt_timezone.utc)
+
+def _longest_token_lifetime() -> timedelta:
+    return max(api_settings.ACCESS_TOKEN_LIFETIME, api_settings.REFRESH_TOKEN_LIFETIME)
+
+
+class TokenRevocationList:
+    """
+    In-process mirror of TokenRevocation: a dict of revoked jtis and a dict of per-user cutoffs,
+    both keyed for O(1) lookups. A check costs one shared-cache read of the revocation version;
+    the database is only read when that version has moved or TOKEN_REVOCATION_REFRESH_SECONDS
+    have passed, and then only for rows created since the previous refresh. The time limit
+    covers bumps that never reach this process, e.g. with a per-process locmem cache. Entries
+    are dropped once every token they could match has expired.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._jtis = {}     # jti -> expiry (epoch seconds)
+        self._cutoffs = {}  # user id -> (issued-before, expiry), epoch seconds
+        self._version = None
+        self._loaded_until = None
+        self._refreshed_at = None
+
+    def _is_current(self, version) -> bool:
+        return (
+            self._version == version
+            and time.monotonic() - self._refreshed_at <= settings.TOKEN_REVOCATION_REFRESH_SECONDS
+        )
+
+    def is_revoked(self, jti, user_id, issued_at) -> bool:
+        current = get_cache_version(REVOCATION_VERSION_NAMESPACE)
+        if not self._is_current(current):
+            if connection.in_atomic_block:
+                # Rows read here may never commit; answer from the database without keeping them.
+                return is_revoked_in_database(jti, user_id, issued_at)
+            self.refresh(current)
+        return self._matches(jti, user_id, issued_at)
+
+    def _matches(self, jti, user_id, issued_at) -> bool:
+        if jti is not None and jti in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(str(user_id))
+        # A token without iat can't prove it postdates the cutoff.
+        return cutoff is not None and (issued_at is None or issued_at < cutoff[0])
+
+    def refresh(self, version):
+        with self._lock:
+            if self._is_current(version):
+                return
+            # Read the clock before the rows: a revocation committed during the load is
+            # re-read next time rather than missed.
+            refreshed_at = time.monotonic()
+            started = timezone.now()
+            rows = TokenRevocation.objects.filter(expires_at__gt=started)
+            if self._loaded_until is not None:
+                rows = rows.filter(created_at__gte=self._loaded_until - REFRESH_OVERLAP)
+            else:
+                self._jtis, self._cutoffs = {}, {}
+            for user_id, jti, issued_before, expires_at in rows.values_list('user_id', 'jti', 'issued_before', 'expires_at'):
+                if jti is not None:
+                    self._jtis[jti] = expires_at.timestamp()
+                    continue
+                previous = self._cutoffs.get(str(user_id))
+                if previous is None or previous[0] < issued_before.timestamp():
+                    self._cutoffs[str(user_id)] = (issued_before.timestamp(), expires_at.timestamp())
+            self._prune(started.timestamp())
+            self._loaded_until = started
+            self._refreshed_at = refreshed_at
+            self._version = version
+
+    def _prune(self, now: float):
+        self._jtis = {jti: expires for jti, expires in self._jtis.items() if expires > now}
+        self._cutoffs = {user_id: cutoff for user_id, cutoff in self._cutoffs.items() if cutoff[1] > now}
+
+    def reset(self):
+        with self._lock:
+            self._jtis, self._cutoffs = {}, {}
+            self._version = self._loaded_until = self._refreshed_at = None
+
+
+token_revocations = TokenRevocationList()
+
+def _claims(token):
+    return (
+        token.get(api_settings.JTI_CLAIM),
+        token.get(api_settings.USER_ID_CLAIM),
+        token.get('iat'),
+    )
+
+def is_token_revoked(token) -> bool:
+    """Checks a validated access or refresh token against the in-process revocation list."""
+    return token_revocations.is_revoked(*_claims(token))
+
+def is_revoked_in_database(jti, user_id, issued_at) -> bool:
+    revoked_tokens = Q(jti=jti) if jti is not None else Q(pk__in=[])
+    if user_id is not None:
+        cutoffs = Q(user_id=user_id, issued_before__isnull=False)
+        if issued_at is not None:
+            cutoffs &= Q(issued_before__gt=datetime.fromtimestamp(issued_at, tz=dt_timezone.utc))
+        revoked_tokens |= cutoffs
+    return TokenRevocation.objects.filter(revoked_tokens, expires_at__gt=timezone.now()).exists()
+
+def _publish():
+    transaction.on_commit(lambda: bump_cache_version(REVOCATION_VERSION_NAMESPACE))
+
+def revoke_token(token) -> TokenRevocation:
+    """Revokes one token by its jti until it would have expired anyway."""
+    jti, user_id, _ = _claims(token)
+    revocation, _ = TokenRevocation.objects.get_or_create(
+        jti=jti, defaults={'user_id': user_id, 'expires_at': _token_expires_at(token)},
+    )
+    _publish()
+    return revocation
+
+def revoke_user_tokens(user_id, issued_before: datetime = None) -> TokenRevocation:
+    """
+    Revokes every token issued to the user up to issued_before (now by default), e.g. when staff
+    leave. JWT iat claims carry whole seconds, so the cutoff is rounded up to the next second:
+    a token from the revocation's own second is revoked, and a login in that second has to be
+    repeated.
+    """
+    issued_before = (issued_before or timezone.now()).replace(microsecond=0) + timedelta(seconds=1)
+    revocation = TokenRevocation.objects.create(
+        user_id=user_id, issued_before=issued_before, expires_at=issued_before + _longest_token_lifetime(),
+    )
+    _publish()
+    return revocation
+
+def purge_expired_revocations(batch_size: int = 1000) -> int:
+    deleted = 0
+    while True:
+        ids = list(TokenRevocation.objects.filter(expires_at__lte=timezone.now()).values_list('pk', flat=True)[:batch_size])
+        if not ids:
+            return deleted
+        deleted += TokenRevocation.objects.filter(pk__in=ids).delete()[0]
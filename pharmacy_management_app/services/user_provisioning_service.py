@@ -0,0 +1,101 @@
+from ..models.user import User
+from ..serializers.user import UserProvisionRowSerializer
+from ..services.password_hashing_service import MIN_PARALLEL_PASSWORDS, hash_passwords, password_hashing_pool
+
+PROVISION_BATCH_SIZE = 1000
+
+class UserProvisioningResult:
+    def __init__(self, max_errors: int = 1000):
+        self.created = 0
+        self.skipped = 0
+        self.failed = 0
+        self.duplicates = []
+        self.errors = []
+        self.max_errors = max_errors
+
+    def add_duplicate(self, index: int, email: str):
+        self.skipped += 1
+        if len(self.duplicates) < self.max_errors:
+            self.duplicates.append({'index': index, 'email': email})
+
+    def add_error(self, index: int, email, errors):
+        self.failed += 1
+        if len(self.errors) < self.max_errors:
+            self.errors.append({'index': index, 'email': email, 'errors': errors})
+
+    def as_dict(self) -> dict:
+        return {
+            'created': self.created,
+            'skipped': self.skipped,
+            'failed': self.failed,
+            'duplicates': self.duplicates,
+            'errors': self.errors,
+        }
+
+def _validate_rows(rows, result: UserProvisioningResult) -> list:
+    pending, seen = [], set()
+    for index, row in enumerate(rows):
+        if not isinstance(row, dict):
+            result.add_error(index, None, {'non_field_errors': ['Expected an object.']})
+            continue
+        serializer = UserProvisionRowSerializer(data=row)
+        if not serializer.is_valid():
+            result.add_error(index, row.get('email'), serializer.errors)
+            continue
+        data = serializer.validated_data
+        data['email'] = User.objects.normalize_email(data['email'])
+        if data['email'] in seen:
+            result.add_duplicate(index, data['email'])
+            continue
+        seen.add(data['email'])
+        pending.append((index, data))
+    return pending
+
+def _provision_batch(batch: list, executor, result: UserProvisioningResult):
+    existing = set(User.objects.filter(email__in=[data['email'] for _, data in batch]).values_list('email', flat=True))
+    fresh = []
+    for index, data in batch:
+        if data['email'] in existing:
+            result.add_duplicate(index, data['email'])
+        else:
+            fresh.append((index, data))
+    if not fresh:
+        return
+    hashes = hash_passwords([data['password'] for _, data in fresh], executor)
+    users = [
+        User(email=data['email'], name=data['name'], is_staff=data['is_staff'], password=password)
+        for (_, data), password in zip(fresh, hashes)
+    ]
+    User.objects.bulk_create(users, ignore_conflicts=True)
+    # ignore_conflicts hides which rows lost a race with a concurrent insert; the salted hash
+    # tells our rows apart from theirs.
+    stored = dict(User.objects.filter(email__in=[user.email for user in users]).values_list('email', 'password'))
+    for (index, _), user in zip(fresh, users):
+        if stored.get(user.email) == user.password:
+            result.created += 1
+        else:
+            result.add_duplicate(index, user.email)
+
+def provision_users(rows, batch_size: int = PROVISION_BATCH_SIZE, workers: int = None,
+                    max_errors: int = 1000, executor=None) -> UserProvisioningResult:
+    """
+    Creates accounts from dicts with email, name, password and optional is_staff. Invalid rows
+    and emails that already exist (in the table or earlier in rows) are reported, not fatal.
+    Passwords are hashed across a process pool and users inserted with bulk_create per batch.
+    The pool is executor when given (e.g. shared_password_hashing_pool()), otherwise one of
+    `workers` processes started for this call.
+    """
+    result = UserProvisioningResult(max_errors=max_errors)
+    pending = _validate_rows(rows, result)
+    if not pending:
+        return result
+    if executor is not None:
+        _provision_batches(pending, batch_size, executor, result)
+        return result
+    with password_hashing_pool(workers if len(pending) >= MIN_PARALLEL_PASSWORDS else 1) as executor:
+        _provision_batches(pending, batch_size, executor, result)
+    return result
+
+def _provision_batches(pending: list, batch_size: int, executor, result: UserProvisioningResult):
+    for start in range(0, len(pending), batch_size):
+        _provision_batch(pending[start:start + batch_size], executor, result)
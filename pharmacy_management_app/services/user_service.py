@@ -1,7 +1,18 @@
+from django.conf import settings
+from django.db import connection, router
+from django.db.models.signals import post_delete, post_save
 from django.db.utils import IntegrityError
 from django.core.exceptions import ObjectDoesNotExist
+from ..models.purchase import Purchase
 from ..models.user import User
-from django.db.models import Q
+from django.db.models import Count, DateTimeField, IntegerField, Max, OuterRef, Prefetch, Q, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from ..signals import bulk_write
+from ..services.cache_service import get_cache_versions, get_catalog_cache, invalidate_namespace
+
+RECENT_PURCHASES_LIMIT = 5
+MAX_RECENT_PURCHASES = 20
 
 def create_user(data: dict) :
     try:
@@ -40,4 +51,71 @@ def update_user(user_id: int, data: dict) :
 def delete_user(user_id: int) :
     user = get_user(user_id)
     user.delete()
-    return user
\ No newline at end of file
+    return user
+
+def _purchase_total(aggregate, output_field):
+    purchases = Purchase.objects.filter(user=OuterRef('pk')).order_by().values('user')
+    return Subquery(purchases.annotate(total=aggregate).values('total'), output_field=output_field)
+
+def annotate_purchase_stats(queryset):
+    """
+    Adds purchase_count, units_purchased and last_purchase_at to each user. Correlated
+    subqueries served by purchase_user_date_idx, so a page of users stays one query.
+    """
+    return queryset.annotate(
+        purchase_count=Coalesce(_purchase_total(Count('pk'), IntegerField()), Value(0)),
+        units_purchased=Coalesce(_purchase_total(Sum('quantity'), IntegerField()), Value(0)),
+        last_purchase_at=_purchase_total(Max('purchase_date'), DateTimeField()),
+    )
+
+def prefetch_recent_purchases(queryset, limit: int = RECENT_PURCHASES_LIMIT):
+    """Attaches each user's `limit` latest purchases as recent_purchases, in one query per page."""
+    purchases = Purchase.objects.select_related('product').order_by('-purchase_date', '-id')[:limit]
+    return queryset.prefetch_related(Prefetch('purchase_set', queryset=purchases, to_attr='recent_purchases'))
+
+# Every cached user is keyed by two versions: one per user, bumped when that row is saved or
+# deleted, and one for all users, bumped by queryset updates that don't say which rows changed.
+ALL_USERS_NAMESPACE = 'user'
+# What authentication and permission checks read. The password hash itself is never cached,
+# only the digest JWTs carry to detect a password change.
+AUTH_USER_FIELDS = ('id', 'is_active', 'is_staff', 'is_superuser')
+
+def _user_namespace(user_id) -> str:
+    return f'user:{user_id}'
+
+def get_cached_user(user_id):
+    """
+    The user behind an authenticated request, or None when it doesn't exist. Only
+    AUTH_USER_FIELDS are loaded, as with only(); other fields load on first access.
+    password_digest holds the digest of the password hash.
+    """
+    versions = get_cache_versions([ALL_USERS_NAMESPACE, _user_namespace(user_id)])
+    key = f'auth:user:{user_id}:{versions[ALL_USERS_NAMESPACE]}:{versions[_user_namespace(user_id)]}'
+    cache = get_catalog_cache()
+    row = cache.get(key)
+    if row is None:
+        row = User.objects.filter(pk=user_id).values_list(*AUTH_USER_FIELDS, 'password').first()
+        if row is None:
+            return None
+        row = (*row[:-1], get_md5_hash_password(row[-1]))
+        # A row read inside a transaction may never commit; don't let it outlive the transaction.
+        if not connection.in_atomic_block:
+            cache.set(key, row, timeout=settings.AUTH_USER_CACHE_TIMEOUT)
+    user = User.from_db(router.db_for_read(User), AUTH_USER_FIELDS, row[:-1])
+    user.password_digest = row[-1]
+    return user
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    invalidate_namespace(_user_namespace(instance.pk))
+
+def invalidate_cached_users(sender, objs=None, fields=None, **kwargs):
+    if objs is None:
+        invalidate_namespace(ALL_USERS_NAMESPACE)
+    elif fields is not None:  # inserts have nothing cached yet
+        for user in objs:
+            invalidate_namespace(_user_namespace(user.pk))
+
+def connect_user_cache_invalidation():
+    post_save.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_user_cache_save')
+    post_delete.connect(invalidate_cached_user, sender=User, dispatch_uid='auth_user_cache_delete')
+    bulk_write.connect(invalidate_cached_users, sender=User, dispatch_uid='auth_user_cache_bulk')
@@ -0,0 +1,31 @@
+from django.db import models
+from django.dispatch import Signal
+from django.utils import timezone
+
+# Sent with sender=<model class> after writes that skip post_save/post_delete:
+# QuerySet.update(), bulk_create(), bulk_update() and raw bulk SQL. Receivers also get
+# objs (the written instances, None when unknown) and fields (the written field names,
+# None for inserts).
+bulk_write = Signal()
+
+class BulkWriteQuerySet(models.QuerySet):
+    def bulk_create(self, objs, *args, **kwargs):
+        created = super().bulk_create(objs, *args, **kwargs)
+        bulk_write.send(sender=self.model, objs=created, fields=None)
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        bulk_write.send(sender=self.model, objs=objs, fields=list(fields))
+        return updated
+
+    def update(self, **kwargs):
+        # update() skips auto_now; stamp it so Last-Modified and ETags see the change.
+        for field in self.model._meta.concrete_fields:
+            if getattr(field, 'auto_now', False) and field.name not in kwargs:
+                kwargs[field.name] = timezone.now()
+        updated = super().update(**kwargs)
+        if updated:
+            bulk_write.send(sender=self.model, objs=None, fields=list(kwargs))
+        return updated
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from ..models.bank_account import BankAccount
+from ..models.user import User
+from ..services.user_service import get_cached_user
+
+class CachedJWTAuthenticationTests(APITransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(email='owner@example.com', password='password123', name='Owner')
+        self.other = User.objects.create_user(email='other@example.com', password='password123', name='Other')
+        self.account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Bank',
+                                                  branch_code='001', account_type='Savings', balance=100)
+        self.other_account = BankAccount.objects.create(user=self.other, account_number='2234567890', bank_name='Bank',
+                                                        branch_code='001', account_type='Savings', balance=100)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.url = reverse('bankaccount-detail', args=[self.account.id])
+
+    def user_queries(self, url=None):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url or self.url)
+        return response, [q for q in queries if 'FROM "pharmacy_management_app_user"' in q['sql']]
+
+    def test_user_is_loaded_once(self):
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.user_queries()
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_only_auth_fields_are_cached(self):
+        self.user_queries()
+        with self.assertNumQueries(0):
+            user = get_cached_user(self.user.id)
+        self.assertNotIn('password', user.__dict__)
+        self.assertEqual(user.password_digest, get_md5_hash_password(self.user.password))
+        with self.assertNumQueries(1):
+            self.assertEqual(user.email, 'owner@example.com')
+
+    def test_owner_check_compares_ids(self):
+        self.user_queries()
+        response, queries = self.user_queries(reverse('bankaccount-detail', args=[self.other_account.id]))
+        self.assertIn(response.status_code, (status.HTTP_403_FORBIDDEN, status.HTTP_404_NOT_FOUND))
+        self.assertEqual(queries, [])
+
+    def test_deactivation_is_seen_immediately(self):
+        self.user_queries()
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_queryset_update_and_delete_are_seen(self):
+        self.user_queries()
+        User.objects.filter(email__endswith='@example.com').update(is_active=False)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+        User.objects.update(is_active=True)
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_200_OK)
+        self.user.delete()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
+
+    def test_user_can_update_only_themselves(self):
+        response = self.client.patch(reverse('user-detail', args=[self.user.id]), {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['name'], 'Renamed')
+        response = self.client.patch(reverse('user-detail', args=[self.other.id]), {'name': 'Renamed'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
@@ -0,0 +1,106 @@
+from unittest import mock
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.autocomplete_service import (
+    NAME_VERSION_NAMESPACE,
+    normalize_name,
+    product_name_index,
+    suggest_product_names,
+)
+from ..services.bulk_service import bulk_update_columns
+from ..services.cache_service import bump_cache_version, get_cache_version
+
+class ProductAutocompleteTests(APITestCase):
+    def setUp(self):
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.ibuprofen = self.create_product('Ibuprofen 400mg')
+        self.ibuprofene = self.create_product('Ibuprofène  200mg')
+        self.paracetamol = self.create_product('Paracetamol 500mg')
+        product_name_index.rebuild()
+        self.url = reverse('product-autocomplete')
+
+    def create_product(self, name):
+        return Product.objects.create(name=name, description='test', cost_price=1, quantity=1, supplier=self.supplier)
+
+    def names(self, prefix, limit=10):
+        suggestions = product_name_index.suggest(prefix, limit)
+        return None if suggestions is None else [name for _, name in suggestions]
+
+    def test_normalize_name(self):
+        self.assertEqual(normalize_name('  Ibuprofène\t 400MG '), 'ibuprofene 400mg')
+
+    def test_prefix_match_ignores_case_and_accents(self):
+        self.assertEqual(self.names('IBUPROFE'), ['Ibuprofen 400mg', 'Ibuprofène  200mg'])
+        self.assertEqual(self.names('ibuprofene 2'), ['Ibuprofène  200mg'])
+        self.assertEqual(self.names('ibuprofen', limit=1), ['Ibuprofen 400mg'])
+        self.assertEqual(self.names('aspirin'), [])
+
+    def test_index_follows_committed_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            aspirin = self.create_product('Aspirin 100mg')
+        self.assertEqual(self.names('asp'), ['Aspirin 100mg'])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paracetamol.name = 'Acetaminophen 500mg'
+            self.paracetamol.save()
+        self.assertEqual(self.names('a'), ['Acetaminophen 500mg', 'Aspirin 100mg'])
+        self.assertEqual(self.names('para'), [])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            aspirin.name = 'Zinc 10mg'
+            bulk_update_columns(Product, [aspirin], ['name'])
+            self.ibuprofen.delete()
+        self.assertEqual(self.names('ibu'), ['Ibuprofène  200mg'])
+        self.assertEqual(self.names('zinc'), ['Zinc 10mg'])
+
+    def test_writes_that_leave_names_alone_keep_the_index_current(self):
+        version = get_cache_version(NAME_VERSION_NAMESPACE)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.ibuprofen.cost_price = 2
+            self.ibuprofen.save()
+            Product.objects.filter(pk=self.paracetamol.pk).update(quantity=5)
+            Product.objects.bulk_update([self.ibuprofene], ['quantity'])
+        self.assertEqual(get_cache_version(NAME_VERSION_NAMESPACE), version)
+        self.assertIsNotNone(self.names('ibu'))
+
+    def test_unknown_rows_or_other_processes_make_the_index_stale(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Product.objects.filter(pk=self.paracetamol.pk).update(name='Acetaminophen 500mg')
+        self.assertIsNone(self.names('a'))
+        # Falls back to the database until the index is rebuilt.
+        self.assertEqual([name for _, name in suggest_product_names('acet')], ['Acetaminophen 500mg'])
+
+        product_name_index.rebuild()
+        self.assertEqual(self.names('a'), ['Acetaminophen 500mg'])
+        bump_cache_version(NAME_VERSION_NAMESPACE)
+        self.assertIsNone(self.names('a'))
+
+    def test_rename_is_published_even_when_a_rebuild_saw_it_first(self):
+        version = get_cache_version(NAME_VERSION_NAMESPACE)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.paracetamol.name = 'Acetaminophen 500mg'
+            self.paracetamol.save()
+            product_name_index.rebuild()
+        self.assertEqual(get_cache_version(NAME_VERSION_NAMESPACE), version + 1)
+        self.assertEqual(self.names('acet'), ['Acetaminophen 500mg'])
+
+    def test_old_index_keeps_serving_while_it_rebuilds(self):
+        with mock.patch.object(product_name_index, 'rebuild_in_background') as rebuild:
+            self.assertEqual([name for _, name in suggest_product_names('para')], ['Paracetamol 500mg'])
+            rebuild.assert_not_called()
+            with override_settings(PRODUCT_NAME_INDEX_MAX_AGE=-1):
+                self.assertEqual([name for _, name in suggest_product_names('para')], ['Paracetamol 500mg'])
+            rebuild.assert_called_once()
+
+    def test_endpoint(self):
+        response = self.client.get(self.url, {'q': 'ibu', 'limit': 1})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data, [{'id': self.ibuprofen.id, 'name': 'Ibuprofen 400mg'}])
+
+        self.assertEqual(self.client.get(self.url, {'q': ' '}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'q': 'ibu', 'limit': 'x'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
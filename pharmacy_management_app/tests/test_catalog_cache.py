@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.bank_account import BankAccount
+from ..models.suppliers import Suppliers
+from ..services.bulk_service import bulk_update_columns
+from ..services.purchase_service import post_purchase
+
+class CatalogCacheTests(APITransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Aspirin', description='', cost_price=10, profit_margin=0.5,
+                                              quantity=10, supplier=self.supplier)
+        self.list_url = reverse('product-list')
+        self.detail_url = reverse('product-detail', args=[self.product.id])
+
+    def buy(self, quantity):
+        buyer = User.objects.create_user(email='buyer@example.com', password='password123', name='Buyer')
+        BankAccount.objects.create(user=buyer, account_number='1234567890', bank_name='Bank', branch_code='001',
+                                   account_type='Savings', balance=1000)
+        post_purchase(user=buyer, product_id=self.product.id, quantity=quantity)
+
+    def get_quantity(self, url):
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response.data['results'][0]['quantity'] if 'results' in response.data else response.data['quantity']
+
+    def test_repeated_reads_skip_the_database(self):
+        self.client.get(self.list_url)
+        self.client.get(self.detail_url)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.get_quantity(self.list_url), 10)
+            self.assertEqual(self.get_quantity(self.detail_url), 10)
+
+    def test_query_params_are_part_of_the_key(self):
+        self.client.get(self.list_url, {'name': 'Aspirin'})
+        response = self.client.get(self.list_url, {'name': 'Other'})
+        self.assertEqual(response.data['count'], 0)
+
+    def test_viewset_write_invalidates(self):
+        self.get_quantity(self.detail_url)
+        admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        response = self.client.patch(self.detail_url, {'quantity': 7}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(self.get_quantity(self.detail_url), 7)
+
+    def test_service_and_bulk_writes_invalidate(self):
+        self.get_quantity(self.list_url)
+        self.buy(3)
+        self.assertEqual(self.get_quantity(self.list_url), 7)
+
+        self.product.quantity = 2
+        bulk_update_columns(Product, [self.product], ['quantity'])
+        self.assertEqual(self.get_quantity(self.list_url), 2)
+
+    def test_supplier_write_invalidates_supplier_reads(self):
+        admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        url = reverse('suppliers-detail', args=[self.supplier.id])
+        self.assertEqual(self.client.get(url).data['name'], 'Supplier 1')
+        Suppliers.objects.filter(pk=self.supplier.pk).update(name='Renamed')
+        self.assertEqual(self.client.get(url).data['name'], 'Renamed')
+
+    def test_cached_hit_answers_conditional_requests(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        with self.assertNumQueries(0):
+            response = self.client.get(self.detail_url)
+        self.assertEqual(response['ETag'], etag)
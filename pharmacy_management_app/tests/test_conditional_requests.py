@@ -0,0 +1,123 @@
+from unittest import mock
+from django.db.models import QuerySet
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.bank_account import BankAccount
+from ..models.suppliers import Suppliers
+from ..services.purchase_service import post_purchase
+from ..services.stock_service import enable_sharded_stock
+
+class ConditionalRequestTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Aspirin', description='', cost_price=10, profit_margin=0.5,
+                                              quantity=10, supplier=self.supplier)
+        self.detail_url = reverse('product-detail', args=[self.product.id])
+        self.list_url = reverse('product-list')
+
+    def buy(self, quantity):
+        buyer = User.objects.create_user(email='buyer@example.com', password='password123', name='Buyer')
+        BankAccount.objects.create(user=buyer, account_number='1234567890', bank_name='Bank', branch_code='001',
+                                   account_type='Savings', balance=1000)
+        post_purchase(user=buyer, product_id=self.product.id, quantity=quantity)
+
+    def test_detail_not_modified(self):
+        response = self.client.get(self.detail_url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn('Last-Modified', response)
+        etag = response['ETag']
+        self.assertFalse(etag.startswith('W/'))
+
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(response.content, b'')
+
+        modified = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified'])
+        self.assertEqual(modified.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        self.buy(1)
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 9)
+
+    def test_sharded_stock_changes_the_etag(self):
+        enable_sharded_stock(self.product.id, 2)
+        etag = self.client.get(self.detail_url)['ETag']
+        self.buy(1)
+        self.assertEqual(self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_sharded_products_offer_no_last_modified(self):
+        since = self.client.get(self.detail_url)['Last-Modified']
+        enable_sharded_stock(self.product.id, 2)
+        response = self.client.get(self.detail_url)
+        self.assertNotIn('Last-Modified', response)
+        self.buy(1)
+        response = self.client.get(self.detail_url, HTTP_IF_MODIFIED_SINCE=since)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 9)
+
+    def test_list_not_modified_until_collection_changes(self):
+        etag = self.client.get(self.list_url)['ETag']
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+
+        other = Product.objects.create(name='Other', description='', cost_price=1, quantity=1, supplier=self.supplier)
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        etag = response['ETag']
+        other.delete()
+        self.assertEqual(self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_200_OK)
+
+    def test_if_match_guards_updates(self):
+        etag = self.client.get(self.detail_url)['ETag']
+        response = self.client.patch(self.detail_url, {'quantity': 5}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response['ETag'], etag)
+
+        response = self.client.patch(self.detail_url, {'quantity': 1}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.delete(self.detail_url, HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 5)
+
+    def test_conditional_writes_lock_the_row_they_check(self):
+        locked = []
+        select_for_update = QuerySet.select_for_update
+
+        def record(queryset, *args, **kwargs):
+            locked.append(queryset.model)
+            return select_for_update(queryset, *args, **kwargs)
+
+        supplier_url = reverse('suppliers-detail', args=[self.supplier.id])
+        with mock.patch.object(QuerySet, 'select_for_update', record):
+            self.assertEqual(self.client.patch(self.detail_url, {'quantity': 4}, format='json').status_code, status.HTTP_200_OK)
+            self.assertEqual(locked, [])
+
+            response = self.client.patch(self.detail_url, {'quantity': 5}, format='json',
+                                         HTTP_IF_MATCH=self.client.get(self.detail_url)['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            response = self.client.patch(supplier_url, {'name': 'Renamed'}, format='json',
+                                         HTTP_IF_MATCH=self.client.get(supplier_url)['ETag'])
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertIn(Product, locked)
+        self.assertIn(Suppliers, locked)
+
+    def test_supplier_validators(self):
+        url = reverse('suppliers-detail', args=[self.supplier.id])
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, status.HTTP_304_NOT_MODIFIED)
+        list_etag = self.client.get(reverse('suppliers-list'))['ETag']
+
+        Suppliers.objects.filter(pk=self.supplier.pk).update(name='Renamed')
+        response = self.client.put(url, {'name': 'Again'}, format='json', HTTP_IF_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_412_PRECONDITION_FAILED)
+        response = self.client.get(reverse('suppliers-list'), HTTP_IF_NONE_MATCH=list_etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
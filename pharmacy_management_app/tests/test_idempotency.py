@@ -0,0 +1,147 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+from django.core.management import call_command
+from django.db import connection
+from django.db.utils import OperationalError
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase, APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.bank_account import BankAccount
+from ..models.suppliers import Suppliers
+from ..models.purchase import Purchase
+from ..models.idempotency_key import IdempotencyKey
+from ..services.bank_account_service import get_current_balance
+from ..services.idempotency_service import hash_request
+from ..services.purchase_service import post_purchase
+
+class IdempotentPurchaseTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Test Product', description='Test Description', cost_price=80.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+        self.url = reverse('purchase-product')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_retry_with_same_key_charges_once(self):
+        data = {'product_id': self.product.id, 'quantity': 2}
+        first = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        with CaptureQueriesContext(connection) as queries:
+            second = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(first.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['Idempotent-Replayed'], 'true')
+        self.assertFalse(any('pharmacy_management_app_product' in q['sql'] for q in queries.captured_queries))
+        self.assertFalse(any('pharmacy_management_app_bankaccount' in q['sql'] for q in queries.captured_queries))
+        self.assertEqual(Purchase.objects.count(), 1)
+        self.bank_account.refresh_from_db()
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('800.00'))
+
+    def test_client_errors_are_replayed(self):
+        data = {'product_id': self.product.id, 'quantity': 11}
+        first = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        Product.objects.filter(pk=self.product.pk).update(quantity=20)
+        second = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(first.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(second.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_key_reused_with_different_payload(self):
+        self.client.post(self.url, {'product_id': self.product.id, 'quantity': 1}, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        response = self.client.post(self.url, {'product_id': self.product.id, 'quantity': 2}, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(response.status_code, status.HTTP_422_UNPROCESSABLE_ENTITY)
+        self.assertEqual(Purchase.objects.count(), 1)
+
+    def test_expired_key_is_processed_again(self):
+        data = {'product_id': self.product.id, 'quantity': 1}
+        self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        IdempotencyKey.objects.update(expires_at=timezone.now() - timedelta(seconds=1))
+        response = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(Purchase.objects.count(), 2)
+
+    def test_requests_without_key_are_not_deduplicated(self):
+        data = {'product_id': self.product.id, 'quantity': 1}
+        self.client.post(self.url, data, format='json')
+        self.client.post(self.url, data, format='json')
+        self.assertEqual(Purchase.objects.count(), 2)
+        self.assertFalse(IdempotencyKey.objects.exists())
+
+    def unfinished_key(self, data, lease):
+        return IdempotencyKey.objects.create(user=self.user, key='abc-123', endpoint=self.url, request_hash=hash_request(self.url, data),
+                                             expires_at=timezone.now() + timedelta(hours=1), locked_until=timezone.now() + lease)
+
+    def test_unfinished_key_with_live_lease_conflicts(self):
+        data = {'product_id': self.product.id, 'quantity': 1}
+        self.unfinished_key(data, timedelta(minutes=1))
+        response = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_lapsed_lease_is_taken_over(self):
+        data = {'product_id': self.product.id, 'quantity': 1}
+        self.unfinished_key(data, -timedelta(seconds=1))
+        response = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(IdempotencyKey.objects.get().response_status, status.HTTP_201_CREATED)
+        replay = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(replay['Idempotent-Replayed'], 'true')
+        self.assertEqual(Purchase.objects.count(), 1)
+
+    def test_purchase_is_undone_when_the_key_was_taken_over(self):
+        def purchase_then_lose_lease(**kwargs):
+            post_purchase(**kwargs)
+            IdempotencyKey.objects.update(locked_until=timezone.now() + timedelta(minutes=5))
+
+        data = {'product_id': self.product.id, 'quantity': 1}
+        with mock.patch('pharmacy_management_app.views.transaction.post_purchase', side_effect=purchase_then_lose_lease):
+            response = self.client.post(self.url, data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(response.status_code, status.HTTP_409_CONFLICT)
+        self.assertFalse(Purchase.objects.exists())
+        self.bank_account.refresh_from_db()
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('1000.00'))
+
+    def test_purge_command_removes_expired_keys(self):
+        IdempotencyKey.objects.create(user=self.user, key='old', endpoint=self.url, request_hash='x', expires_at=timezone.now() - timedelta(hours=1))
+        IdempotencyKey.objects.create(user=self.user, key='new', endpoint=self.url, request_hash='x', expires_at=timezone.now() + timedelta(hours=1))
+        out = StringIO()
+        call_command('purge_idempotency_keys', stdout=out)
+        self.assertIn('Deleted 1', out.getvalue())
+        self.assertEqual(list(IdempotencyKey.objects.values_list('key', flat=True)), ['new'])
+
+
+class IdempotentRetryTests(APITransactionTestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Test Product', description='Test Description', cost_price=80.00, profit_margin=0.25, quantity=10, supplier=supplier)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def test_deadlock_retries_the_whole_transaction(self):
+        calls = []
+
+        def purchase_then_deadlock(**kwargs):
+            calls.append(connection.in_atomic_block)
+            post_purchase(**kwargs)
+            if len(calls) == 1:
+                raise OperationalError('database is locked')
+
+        data = {'product_id': self.product.id, 'quantity': 1}
+        with mock.patch('pharmacy_management_app.views.transaction.post_purchase', side_effect=purchase_then_deadlock):
+            response = self.client.post(reverse('purchase-product'), data, format='json', HTTP_IDEMPOTENCY_KEY='abc-123')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(calls, [True, True])
+        # The first attempt's purchase was rolled back with its transaction.
+        self.assertEqual(Purchase.objects.count(), 1)
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('900.00'))
+        self.assertEqual(IdempotencyKey.objects.get().response_status, status.HTTP_201_CREATED)
@@ -0,0 +1,100 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.bank_account import BankAccount
+from ..models.bank_ledger import BankLedgerEntry, BalanceSnapshot
+from ..services.bank_account_service import (
+    get_current_balance,
+    debite_from_bank_account,
+    credit_bank_account,
+    compact_ledger
+)
+
+class BankLedgerTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_debits_and_credits_are_appended(self):
+        debite_from_bank_account(self.user, Decimal('150.00'), description='Purchase')
+        credit_bank_account(self.bank_account, Decimal('20.50'), description='Refund')
+        self.bank_account.refresh_from_db()
+        self.assertEqual(self.bank_account.balance, Decimal('1000.00'))
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('870.50'))
+        self.assertEqual(BankLedgerEntry.objects.filter(account=self.bank_account).count(), 2)
+
+    def settle(self):
+        BankLedgerEntry.objects.update(created_at=F('created_at') - timedelta(minutes=5))
+
+    def test_credit_is_a_single_insert(self):
+        with CaptureQueriesContext(connection) as queries:
+            credit_bank_account(self.bank_account, Decimal('5.00'))
+        self.assertEqual(len(queries), 1)
+        self.assertTrue(queries[0]['sql'].startswith('INSERT INTO "pharmacy_management_app_bankledgerentry"'))
+
+    def test_debit_beyond_balance_is_rejected(self):
+        with self.assertRaisesMessage(ValueError, 'Insufficient funds'):
+            debite_from_bank_account(self.user, Decimal('1000.01'))
+        self.assertFalse(BankLedgerEntry.objects.exists())
+
+    def test_compaction_rolls_entries_into_snapshot(self):
+        debite_from_bank_account(self.user, Decimal('100.00'))
+        debite_from_bank_account(self.user, Decimal('50.00'))
+        self.assertIsNone(compact_ledger(self.bank_account.id))
+        self.settle()
+        snapshot = compact_ledger(self.bank_account.id)
+        self.assertEqual(snapshot.balance, Decimal('850.00'))
+        self.bank_account.refresh_from_db()
+        self.assertEqual(self.bank_account.balance, Decimal('850.00'))
+        self.assertEqual(self.bank_account.snapshot_entry_id, BankLedgerEntry.objects.latest('id').id)
+        self.assertEqual(BankLedgerEntry.objects.count(), 2)
+
+        debite_from_bank_account(self.user, Decimal('25.00'))
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('825.00'))
+        self.assertIsNone(compact_ledger(BankAccount.objects.create(
+            user=User.objects.create_user(email='idle@example.com', password='testpass', name='Idle'),
+            account_number='555', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1.00
+        ).id))
+
+    def test_compact_ledger_command(self):
+        debite_from_bank_account(self.user, Decimal('100.00'))
+        self.settle()
+        out = StringIO()
+        call_command('compact_ledger', stdout=out)
+        self.assertIn('Compacted 1', out.getvalue())
+        self.assertEqual(BalanceSnapshot.objects.get(account=self.bank_account).balance, Decimal('900.00'))
+        call_command('compact_ledger', stdout=out)
+        self.assertEqual(BalanceSnapshot.objects.count(), 1)
+
+    def test_api_reports_current_balance(self):
+        debite_from_bank_account(self.user, Decimal('100.00'))
+        response = self.client.get(reverse('bankaccount-list'))
+        self.assertEqual(response.data['results'][0]['balance'], '900.00')
+        response = self.client.get(reverse('bankaccount-detail', args=[self.bank_account.id]))
+        self.assertEqual(response.data['balance'], '900.00')
+
+    def test_balance_update_is_recorded_as_adjustment(self):
+        url = reverse('bankaccount-detail', args=[self.bank_account.id])
+        response = self.client.patch(url, {'balance': '1200.00'}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['balance'], '1200.00')
+        entry = BankLedgerEntry.objects.get(account=self.bank_account)
+        self.assertEqual((entry.kind, entry.amount), (BankLedgerEntry.KIND_CREDIT, Decimal('200.00')))
+
+    def test_ledger_endpoint(self):
+        debite_from_bank_account(self.user, Decimal('100.00'), description='Purchase')
+        response = self.client.get(reverse('bankaccount-ledger', args=[self.bank_account.id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['results'][0]['description'], 'Purchase')
+        self.assertEqual(response.data['results'][0]['kind'], BankLedgerEntry.KIND_DEBIT)
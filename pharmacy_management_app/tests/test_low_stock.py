@@ -0,0 +1,55 @@
+import json
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.stock_service import enable_sharded_stock, get_low_stock_products
+
+class LowStockTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.alpha = Suppliers.objects.create(name='Alpha', contact_info='alpha@example.com')
+        self.beta = Suppliers.objects.create(name='Beta', contact_info='beta@example.com')
+        self.low = self.create(self.beta, 'Low', quantity=2, reorder_level=10)
+        self.fine = self.create(self.beta, 'Fine', quantity=20, reorder_level=10)
+        self.untracked = self.create(self.alpha, 'Untracked', quantity=0, reorder_level=0)
+        self.bulk = self.create(self.alpha, 'Bulk order', quantity=1, reorder_level=5, reorder_quantity=50)
+        self.sharded = self.create(self.alpha, 'Sharded', quantity=8, reorder_level=10)
+        enable_sharded_stock(self.sharded.id, 4)
+
+    def create(self, supplier, name, **kwargs):
+        return Product.objects.create(name=name, description='', cost_price=1, supplier=supplier, **kwargs)
+
+    def test_low_stock_products(self):
+        self.assertEqual(
+            [p.id for p in get_low_stock_products()],
+            [self.bulk.id, self.sharded.id, self.low.id]
+        )
+        self.assertEqual([p.current_quantity for p in get_low_stock_products(self.alpha.id)], [1, 8])
+
+    def test_endpoint(self):
+        response = self.client.get(reverse('product-low-stock'), {'supplier': self.beta.id})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [self.low.id])
+        self.assertEqual(response.data['results'][0]['reorder_level'], 10)
+
+    def test_reorder_report_groups_by_supplier(self):
+        out = StringIO()
+        call_command('reorder_report', format='json', stdout=out)
+        report = json.loads(out.getvalue())
+        self.assertEqual([s['supplier_name'] for s in report], ['Alpha', 'Beta'])
+        self.assertEqual(
+            [(p['name'], p['order_quantity']) for p in report[0]['products']],
+            [('Bulk order', 50), ('Sharded', 2)]
+        )
+        self.assertEqual(report[1]['products'][0]['order_quantity'], 8)
+
+        out = StringIO()
+        call_command('reorder_report', stdout=out)
+        self.assertIn('Alpha (#', out.getvalue())
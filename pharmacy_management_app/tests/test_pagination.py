@@ -0,0 +1,54 @@
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from django.db import connection
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..pagination import estimate_count
+
+class ListPaginationTests(APITestCase):
+    def setUp(self):
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        Product.objects.bulk_create([
+            Product(name=f'Product {i}', description='', cost_price=i % 5 + 1, quantity=1, supplier=self.supplier)
+            for i in range(25)
+        ])
+        self.url = reverse('product-list')
+
+    def walk(self, params):
+        ids, url, pages = [], self.url, 0
+        while url:
+            response = self.client.get(url, params if pages == 0 else None)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertNotIn('count', response.data)
+            ids.extend(p['id'] for p in response.data['results'])
+            url, pages = response.data['next'], pages + 1
+        return ids, pages
+
+    def test_cursor_mode_walks_every_row_once(self):
+        ids, pages = self.walk({'pagination': 'cursor', 'page_size': 10})
+        self.assertEqual(ids, list(Product.objects.order_by('id').values_list('id', flat=True)))
+        self.assertEqual(pages, 3)
+
+    def test_cursor_mode_follows_requested_ordering(self):
+        ids, _ = self.walk({'pagination': 'cursor', 'page_size': 4, 'ordering': '-price'})
+        self.assertEqual(ids, list(Product.objects.order_by('-price', 'id').values_list('id', flat=True)))
+
+    def test_cursor_mode_skips_count_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'pagination': 'cursor'})
+        self.assertFalse([q for q in queries if 'COUNT(' in q['sql']])
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_estimated_count_mode(self):
+        response = self.client.get(self.url, {'count': 'estimated', 'page': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 25)
+        self.assertEqual(len(response.data['results']), 10)
+
+    def test_estimate_falls_back_to_exact_count(self):
+        self.assertEqual(estimate_count(Product.objects.filter(cost_price__gt=3)), 10)
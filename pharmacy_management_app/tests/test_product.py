@@ -4,6 +4,7 @@ from rest_framework.test import APITestCase
 from django.contrib.auth import get_user_model
 from rest_framework_simplejwt.tokens import RefreshToken
 from io import StringIO
+from decimal import Decimal
 from ..models.product import Product
 from ..models.suppliers import Suppliers
 
@@ -56,6 +57,20 @@ class ProductCRUDTest(APITestCase):
         self.assertEqual(response.status_code, status.HTTP_200_OK)
         self.assertEqual(response.data['name'], updated_data['name'])
 
+    def test_put_without_supplier_keeps_it(self):
+        product = Product.objects.create(name='Test Product', description='Test Description', cost_price=10,
+                                         quantity=100, supplier=self.supplier)
+        updated_data = self.product_data.copy()
+        del updated_data['supplier']
+        updated_data['name'] = 'Updated Product'
+        response = self.client.put(reverse('product-detail', args=[product.id]), updated_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['supplier'], self.supplier.id)
+
+        response = self.client.post(reverse('product-list'), updated_data, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(Product.objects.count(), 1)
+
     def test_delete_product(self):
         product = Product.objects.create(
             name=self.product_data['name'],
@@ -69,3 +84,38 @@ class ProductCRUDTest(APITestCase):
         response = self.client.delete(url, format='json')
         self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
         self.assertFalse(Product.objects.filter(id=product.id).exists())
+
+
+class ProductPriceTest(APITestCase):
+    def setUp(self):
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.cheap = Product.objects.create(name='Cheap', description='', cost_price=4, profit_margin=0.25, quantity=1, supplier=self.supplier)
+        self.middle = Product.objects.create(name='Middle', description='', cost_price=10, profit_margin=0.5, quantity=1, supplier=self.supplier)
+        self.pricey = Product.objects.create(name='Pricey', description='', cost_price=40, profit_margin=0.2, quantity=1, supplier=self.supplier)
+
+    def test_price_is_stored_on_save(self):
+        self.assertEqual(Product.objects.get(pk=self.middle.pk).price, Decimal('15.00'))
+        self.middle.profit_margin = Decimal('0.10')
+        self.middle.save(update_fields=['profit_margin'])
+        self.assertEqual(Product.objects.get(pk=self.middle.pk).price, Decimal('11.00'))
+
+    def test_price_follows_bulk_writes(self):
+        Product.objects.filter(pk=self.cheap.pk).update(cost_price=Decimal('8.00'))
+        self.assertEqual(Product.objects.get(pk=self.cheap.pk).price, Decimal('10.00'))
+        self.pricey.cost_price = Decimal('50.00')
+        Product.objects.bulk_update([self.pricey], ['cost_price'])
+        self.assertEqual(Product.objects.get(pk=self.pricey.pk).price, Decimal('60.00'))
+        created = Product.objects.bulk_create([
+            Product(name='Bulk', description='', cost_price=2, profit_margin=Decimal('0.50'), quantity=1, supplier=self.supplier)
+        ])
+        self.assertEqual(Product.objects.get(pk=created[0].pk).price, Decimal('3.00'))
+
+    def test_filter_and_order_by_price(self):
+        url = reverse('product-list')
+        response = self.client.get(url, {'min_price': 6, 'max_price': 48, 'ordering': '-price'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data['results']], [self.pricey.id, self.middle.id])
+        self.assertEqual(response.data['results'][0]['price'], '48.00')
+
+        response = self.client.get(url, {'ordering': 'price'})
+        self.assertEqual([p['id'] for p in response.data['results']], [self.cheap.id, self.middle.id, self.pricey.id])
@@ -0,0 +1,69 @@
+from decimal import Decimal
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.reservation_service import create_reservation
+from ..services.stock_service import enable_sharded_stock
+
+class ProductBulkUpdateTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='', cost_price=10, profit_margin=0.5,
+                                   quantity=10, supplier=self.supplier)
+            for i in range(5)
+        ]
+        self.url = reverse('product-bulk-update')
+
+    def test_applies_valid_rows_and_reports_the_rest(self):
+        p = self.products
+        create_reservation(self.admin, p[3].id, 4)
+        enable_sharded_stock(p[4].id, 2)
+        items = [
+            {'id': p[0].id, 'cost_price': '20.00'},
+            {'id': p[1].id, 'quantity': 3, 'profit_margin': '0.10'},
+            {'id': p[2].id, 'quantity': -1},
+            {'id': 999999, 'quantity': 1},
+            {'id': p[0].id, 'quantity': 1},
+            {'id': p[3].id, 'quantity': 2},
+            {'id': p[4].id, 'quantity': 2},
+            {'id': p[2].id},
+        ]
+        response = self.client.post(self.url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['updated'], 2)
+        self.assertEqual(response.data['failed'], 6)
+        self.assertEqual([e['index'] for e in response.data['errors']], [2, 4, 7, 3, 5, 6])
+
+        first = Product.objects.get(pk=p[0].pk)
+        self.assertEqual((first.cost_price, first.price, first.quantity), (Decimal('20.00'), Decimal('30.00'), 10))
+        second = Product.objects.get(pk=p[1].pk)
+        self.assertEqual((second.quantity, second.price), (3, Decimal('11.00')))
+        self.assertEqual(Product.objects.get(pk=p[3].pk).quantity, 10)
+
+    def test_reports_non_object_rows_per_row(self):
+        p = self.products
+        items = [{'id': p[0].id, 'quantity': 7}, 'oops', 5, {'id': p[1].id, 'quantity': -1}]
+        response = self.client.post(self.url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual((response.data['updated'], response.data['failed']), (1, 3))
+        self.assertEqual([e['index'] for e in response.data['errors']], [1, 2, 3])
+        self.assertEqual(response.data['errors'][0]['errors'], {'non_field_errors': ['Expected an object.']})
+        self.assertEqual(Product.objects.get(pk=p[0].pk).quantity, 7)
+
+    def test_payload_validation(self):
+        self.assertEqual(self.client.post(self.url, {'items': []}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+        response = self.client.post(self.url, {'items': [{'id': 1, 'quantity': 1}] * 10001}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_admin(self):
+        user = User.objects.create_user(email='user@example.com', password='testpass', name='User')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(user).access_token}')
+        response = self.client.post(self.url, {'items': [{'id': self.products[0].id, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
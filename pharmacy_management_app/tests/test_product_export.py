@@ -0,0 +1,68 @@
+import csv
+import io
+import json
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.stock_service import enable_sharded_stock
+
+class ProductExportTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='partner@example.com', password='testpass', name='Partner')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.other_supplier = Suppliers.objects.create(name='Supplier 2', contact_info='test@example.com')
+        for i in range(30):
+            Product.objects.create(
+                name=f'Product {i}', description='Line one, "quoted"\nline two', cost_price=10, profit_margin=0.5,
+                quantity=i, supplier=self.supplier if i % 3 else self.other_supplier
+            )
+        self.url = reverse('product-export')
+
+    def read(self, response):
+        return b''.join(response.streaming_content).decode('utf-8')
+
+    def test_csv_export(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.DictReader(io.StringIO(self.read(response))))
+        self.assertEqual(len(rows), 30)
+        self.assertEqual(rows[0]['description'], 'Line one, "quoted"\nline two')
+        self.assertEqual(rows[1]['price'], '15.00')
+        self.assertEqual(rows[1]['supplier_name'], 'Supplier 1')
+
+    def test_ndjson_export_with_filters(self):
+        response = self.client.get(self.url, {'output': 'ndjson', 'supplier': self.other_supplier.id})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        records = [json.loads(line) for line in self.read(response).splitlines()]
+        self.assertEqual(len(records), 10)
+        self.assertTrue(all(record['supplier_id'] == self.other_supplier.id for record in records))
+
+        Product.objects.filter(name='Product 5').update(updated_at=timezone.now() + timedelta(days=1))
+        after = (timezone.now() + timedelta(hours=1)).isoformat()
+        response = self.client.get(self.url, {'output': 'ndjson', 'updated_after': after})
+        self.assertEqual([json.loads(line)['name'] for line in self.read(response).splitlines()], ['Product 5'])
+
+    def test_sharded_quantity_is_summed(self):
+        product = Product.objects.get(name='Product 7')
+        enable_sharded_stock(product.id, 3)
+        response = self.client.get(self.url, {'output': 'ndjson'})
+        record = next(json.loads(line) for line in self.read(response).splitlines() if json.loads(line)['id'] == product.id)
+        self.assertEqual(record['quantity'], 7)
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'output': 'xml'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'updated_after': 'yesterday'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(self.url, {'supplier': 'x'}).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_requires_authentication(self):
+        self.client.credentials()
+        self.assertEqual(self.client.get(self.url).status_code, status.HTTP_401_UNAUTHORIZED)
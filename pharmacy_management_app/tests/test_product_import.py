@@ -0,0 +1,91 @@
+from io import StringIO
+from pathlib import Path
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..models.stock_shard import ProductStockShard
+from ..services.product_service import import_products_csv
+from ..services.stock_service import enable_sharded_stock
+
+CATALOG = Path(__file__).resolve().parents[2] / 'products.csv'
+
+class ProductImportTests(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin User')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin_user).access_token}')
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+
+    def test_import_sample_catalog(self):
+        with open(CATALOG, 'rb') as file:
+            response = self.client.post(reverse('product-import-csv'), {'file': file}, format='multipart')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 5)
+        self.assertEqual(response.data['failed'], 0)
+        self.assertEqual(Suppliers.objects.count(), 3)
+        aspirin = Product.objects.get(name='Aspirin')
+        self.assertEqual(aspirin.supplier, self.supplier)
+        self.assertEqual(str(aspirin.profit_margin), '0.20')
+
+    def test_reimport_updates_in_place(self):
+        Product.objects.create(name='aspirin', description='Old', cost_price=1, quantity=1, supplier=self.supplier)
+        csv_data = 'name,description,cost_price,quantity,supplier\nAspirin,Pain reliever,5.99,100,supplier 1\n'
+        result = import_products_csv(SimpleUploadedFile('catalog.csv', csv_data.encode()), chunk_size=1)
+        self.assertEqual((result.created, result.updated), (0, 1))
+        product = Product.objects.get()
+        self.assertEqual((product.description, product.quantity), ('Pain reliever', 100))
+
+    def test_reimport_writes_sharded_stock_to_the_shards(self):
+        product = Product.objects.create(name='Aspirin', cost_price=1, quantity=40, supplier=self.supplier)
+        enable_sharded_stock(product.id, 4)
+        csv_data = 'name,description,cost_price,quantity,supplier\nAspirin,Pain reliever,5.99,100,Supplier 1\n'
+        result = import_products_csv(SimpleUploadedFile('catalog.csv', csv_data.encode()))
+        self.assertEqual((result.updated, result.failed), (1, 0))
+        self.assertEqual(sum(ProductStockShard.objects.filter(product=product).values_list('quantity', flat=True)), 100)
+        self.assertEqual(Product.objects.get().description, 'Pain reliever')
+
+    def test_reimport_rejects_quantity_below_reserved(self):
+        Product.objects.create(name='Aspirin', cost_price=1, quantity=40, reserved_quantity=30, supplier=self.supplier)
+        csv_data = 'name,description,cost_price,quantity,supplier\nAspirin,Pain reliever,5.99,20,Supplier 1\n'
+        result = import_products_csv(SimpleUploadedFile('catalog.csv', csv_data.encode()))
+        self.assertEqual((result.updated, result.failed), (0, 1))
+        self.assertIn('quantity', result.errors[0]['errors'])
+        product = Product.objects.get()
+        self.assertEqual((product.quantity, product.description), (40, ''))
+
+    def test_bad_rows_are_reported_without_aborting(self):
+        csv_data = (
+            'name,description,cost_price,profit_margin,quantity,supplier\n'
+            'Good,ok,1.00,,5,Supplier 1\n'
+            'Bad price,ok,abc,0.1,5,Supplier 1\n'
+            'No supplier,ok,1.00,0.1,5,\n'
+            'Negative,ok,1.00,0.1,-3,Supplier 1\n'
+            'Also good,ok,2.00,0.3,5,New Supplier\n'
+        )
+        result = import_products_csv(SimpleUploadedFile('catalog.csv', csv_data.encode()), chunk_size=2)
+        self.assertEqual(result.created, 2)
+        self.assertEqual(result.failed, 3)
+        self.assertEqual([error['line'] for error in result.errors], [3, 4, 5])
+        self.assertIn('cost_price', result.errors[0]['errors'])
+        self.assertTrue(Suppliers.objects.filter(name='New Supplier').exists())
+
+    def test_missing_columns(self):
+        response = self.client.post(
+            reverse('product-import-csv'),
+            {'file': SimpleUploadedFile('catalog.csv', b'name,quantity\nA,1\n')},
+            format='multipart'
+        )
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_import_command(self):
+        out = StringIO()
+        call_command('import_products', str(CATALOG), chunk_size=2, stdout=out)
+        self.assertIn('Created 5, updated 0, failed 0', out.getvalue())
+        call_command('import_products', str(CATALOG), stdout=out)
+        self.assertIn('Created 0, updated 5, failed 0', out.getvalue())
+        self.assertEqual(Product.objects.count(), 5)
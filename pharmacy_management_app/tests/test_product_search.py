@@ -0,0 +1,66 @@
+from unittest import mock, skipUnless
+from django.db import connection
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.bulk_service import bulk_update_columns
+from ..services.search_service import search_products
+
+class ProductSearchTests(APITestCase):
+    def setUp(self):
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.ibuprofen = Product.objects.create(name='Ibuprofen 400mg', description='Anti-inflammatory tablets',
+                                                cost_price=5, quantity=10, supplier=self.supplier)
+        self.paracetamol = Product.objects.create(name='Paracetamol 500mg', description='Pain relief, not an ibuprofen',
+                                                  cost_price=3, quantity=10, supplier=self.supplier)
+        self.vitamin = Product.objects.create(name='Vitamin C', description='Immune support tablets',
+                                              cost_price=8, quantity=10, supplier=self.supplier)
+        self.url = reverse('product-search')
+
+    def test_name_matches_rank_above_description_matches(self):
+        response = self.client.get(self.url, {'q': 'ibuprofen'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data], [self.ibuprofen.id, self.paracetamol.id])
+
+    def test_searches_description_and_stems(self):
+        ids = [p.id for p in search_products('tablet')]
+        self.assertCountEqual(ids, [self.ibuprofen.id, self.vitamin.id])
+
+    def test_prefix_of_last_word(self):
+        self.assertEqual([p.id for p in search_products('parac')], [self.paracetamol.id])
+
+    def test_index_follows_writes(self):
+        self.vitamin.name = 'Zinc supplement'
+        self.vitamin.save()
+        self.assertEqual(search_products('vitamin'), [])
+        self.assertEqual([p.id for p in search_products('zinc')], [self.vitamin.id])
+
+        self.paracetamol.name = 'Aspirin 100mg'
+        bulk_update_columns(Product, [self.paracetamol], ['name'])
+        self.assertEqual([p.id for p in search_products('aspirin')], [self.paracetamol.id])
+
+        self.ibuprofen.delete()
+        self.assertEqual([p.id for p in search_products('ibuprofen')], [self.paracetamol.id])
+
+    def test_query_is_required(self):
+        response = self.client.get(self.url, {'q': '  '})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_operators_in_query_are_treated_as_text(self):
+        response = self.client.get(self.url, {'q': 'vitamin")*'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['id'] for p in response.data], [self.vitamin.id])
+
+    def test_other_backends_fall_back_to_icontains(self):
+        with mock.patch.object(connection, 'vendor', 'mysql'):
+            response = self.client.get(self.url, {'q': 'ibuprofen'})
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertEqual([p['id'] for p in response.data], [self.ibuprofen.id, self.paracetamol.id])
+            self.assertEqual([p.id for p in search_products('immune tablets')], [self.vitamin.id])
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL full-text and trigram search')
+    def test_postgres_falls_back_to_trigram_for_typos(self):
+        self.assertCountEqual([p.id for p in search_products('tablets')], [self.ibuprofen.id, self.vitamin.id])
+        self.assertEqual([p.id for p in search_products('paracetamoll')], [self.paracetamol.id])
@@ -0,0 +1,67 @@
+from datetime import timedelta
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..models.purchase import Purchase
+
+class PurchaseHistoryTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.other = User.objects.create_user(email='other@example.com', password='testpass', name='Other User')
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Aspirin', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+        self.other_product = Product.objects.create(name='Ibuprofen', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+        Purchase.objects.bulk_create([
+            Purchase(user=self.user, product=self.product if i % 2 else self.other_product, quantity=i + 1)
+            for i in range(25)
+        ])
+        Purchase.objects.create(user=self.other, product=self.product, quantity=1)
+        # Spread dates out, with ties, so ordering has to fall back on id.
+        base = timezone.now()
+        for purchase in Purchase.objects.filter(user=self.user):
+            Purchase.objects.filter(pk=purchase.pk).update(purchase_date=base - timedelta(days=purchase.quantity // 2))
+        self.url = reverse('purchase-list')
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def collect(self, url):
+        ids = []
+        while url:
+            response = self.client.get(url)
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            ids.extend(row['id'] for row in response.data['results'])
+            url = response.data['next']
+        return ids
+
+    def test_pages_walk_the_whole_history_in_order(self):
+        ids = self.collect(self.url + '?page_size=4')
+        expected = list(Purchase.objects.filter(user=self.user).order_by('-purchase_date', '-id').values_list('id', flat=True))
+        self.assertEqual(ids, expected)
+
+    def test_filters(self):
+        ids = self.collect(f'{self.url}?product={self.product.id}')
+        self.assertEqual(len(ids), 12)
+        after = (timezone.now() - timedelta(days=3)).isoformat()
+        response = self.client.get(self.url, {'purchased_after': after, 'page_size': 100})
+        self.assertTrue(all(row['quantity'] <= 7 for row in response.data['results']))
+        self.assertEqual(len(response.data['results']), Purchase.objects.filter(user=self.user, purchase_date__gte=after).count())
+
+    def test_history_row_shape(self):
+        response = self.client.get(self.url, {'page_size': 1})
+        row = response.data['results'][0]
+        self.assertEqual(set(row), {'id', 'product', 'product_name', 'quantity', 'purchase_date'})
+
+    def test_invalid_cursor(self):
+        response = self.client.get(self.url, {'cursor': 'garbage'})
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_other_users_purchases_are_hidden(self):
+        other_purchase = Purchase.objects.get(user=self.other)
+        self.assertNotIn(other_purchase.id, self.collect(self.url))
+        response = self.client.get(reverse('purchase-detail', args=[other_purchase.id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
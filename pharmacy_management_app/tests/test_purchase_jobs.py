@@ -0,0 +1,108 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.conf import settings
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TransactionTestCase
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.bank_account import BankAccount
+from ..models.suppliers import Suppliers
+from ..models.purchase import Purchase
+from ..models.purchase_job import PurchaseJob
+from ..services.bank_account_service import get_current_balance
+from ..services.purchase_job_service import enqueue_purchase, claim_purchase_job, process_pending_jobs, process_purchase_job
+
+class PurchaseJobTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Test Product', description='Test Description', cost_price=80.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_async_purchase_is_queued(self):
+        url = reverse('purchase-product') + '?async=true'
+        response = self.client.post(url, {'product_id': self.product.id, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        self.assertEqual(response.data['status'], PurchaseJob.STATUS_PENDING)
+        self.assertFalse(Purchase.objects.exists())
+
+        self.assertEqual(process_pending_jobs(), 1)
+        response = self.client.get(reverse('purchase-job-detail', args=[response.data['job_id']]))
+        self.assertEqual(response.data['status'], PurchaseJob.STATUS_SUCCEEDED)
+        self.assertEqual(response.data['result']['total'], '200.00')
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('800.00'))
+
+    def test_async_checkout_is_queued(self):
+        url = reverse('cart-checkout') + '?async=1'
+        response = self.client.post(url, {'items': [{'product_id': self.product.id, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        process_pending_jobs()
+        self.assertEqual(PurchaseJob.objects.get(pk=response.data['job_id']).status, PurchaseJob.STATUS_SUCCEEDED)
+        self.assertEqual(Purchase.objects.count(), 1)
+
+    def test_failed_purchase_is_reported(self):
+        job = enqueue_purchase(self.user, [{'product_id': self.product.id, 'quantity': 11}])
+        process_pending_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, PurchaseJob.STATUS_FAILED)
+        self.assertEqual(job.error, 'Product out of stock')
+        self.assertEqual(job.attempts, 1)
+
+    def test_claimed_job_is_not_claimed_twice(self):
+        job = enqueue_purchase(self.user, [{'product_id': self.product.id, 'quantity': 1}])
+        self.assertEqual(claim_purchase_job().pk, job.pk)
+        self.assertIsNone(claim_purchase_job())
+
+    def test_reclaimed_job_is_not_charged_by_the_old_worker(self):
+        enqueue_purchase(self.user, [{'product_id': self.product.id, 'quantity': 1}])
+        job = claim_purchase_job()
+        PurchaseJob.objects.filter(pk=job.pk).update(attempts=F('attempts') + 1)
+        process_purchase_job(job)
+        self.assertFalse(Purchase.objects.exists())
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('1000.00'))
+        self.assertEqual(PurchaseJob.objects.get(pk=job.pk).status, PurchaseJob.STATUS_PROCESSING)
+
+    def test_abandoned_last_attempt_is_failed(self):
+        job = enqueue_purchase(self.user, [{'product_id': self.product.id, 'quantity': 1}])
+        PurchaseJob.objects.filter(pk=job.pk).update(
+            status=PurchaseJob.STATUS_PROCESSING, attempts=settings.PURCHASE_JOB_MAX_ATTEMPTS,
+            locked_at=timezone.now() - settings.PURCHASE_JOB_LOCK_TIMEOUT - timedelta(seconds=1),
+        )
+        self.assertEqual(process_pending_jobs(), 0)
+        job.refresh_from_db()
+        self.assertEqual(job.status, PurchaseJob.STATUS_FAILED)
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_jobs_are_private(self):
+        job = enqueue_purchase(self.user, [{'product_id': self.product.id, 'quantity': 1}])
+        other = User.objects.create_user(email='other@example.com', password='testpass', name='Other User')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(other).access_token}')
+        response = self.client.get(reverse('purchase-job-detail', args=[job.pk]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+class ProcessPurchasesCommandTests(TransactionTestCase):
+    def test_workers_drain_the_queue(self):
+        supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        product = Product.objects.create(name='Test Product', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=15, supplier=supplier)
+        for i in range(4):
+            user = User.objects.create_user(email=f'buyer{i}@example.com', password='testpass', name=f'Buyer {i}')
+            BankAccount.objects.create(user=user, account_number=f'99900{i}', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+            for _ in range(5):
+                enqueue_purchase(user, [{'product_id': product.id, 'quantity': 1}])
+
+        out = StringIO()
+        call_command('process_purchases', workers=4, once=True, stdout=out)
+        self.assertIn('Processed 20 purchase jobs', out.getvalue())
+        self.assertEqual(PurchaseJob.objects.filter(status=PurchaseJob.STATUS_SUCCEEDED).count(), 15)
+        self.assertEqual(PurchaseJob.objects.filter(status=PurchaseJob.STATUS_FAILED).count(), 5)
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 0)
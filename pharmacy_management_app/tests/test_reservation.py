@@ -0,0 +1,113 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.bank_account import BankAccount
+from ..models.suppliers import Suppliers
+from ..models.purchase import Purchase
+from ..models.stock_reservation import StockReservation
+from ..services.bank_account_service import get_current_balance
+
+class StockReservationTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Test Product', description='Test Description', cost_price=80.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def reserve(self, quantity):
+        return self.client.post(reverse('stockreservation-list'), {'product_id': self.product.id, 'quantity': quantity}, format='json')
+
+    def test_reservation_holds_stock(self):
+        response = self.reserve(4)
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 10)
+        self.assertEqual(self.product.available_quantity, 6)
+
+        response = self.client.post(reverse('purchase-product'), {'product_id': self.product.id, 'quantity': 7}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.reserve(7).status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_confirm_reservation(self):
+        reservation_id = self.reserve(2).data['id']
+        response = self.client.post(reverse('stockreservation-confirm', args=[reservation_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], StockReservation.STATUS_CONFIRMED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 8)
+        self.assertEqual(self.product.reserved_quantity, 0)
+        self.bank_account.refresh_from_db()
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('800.00'))
+        self.assertEqual(Purchase.objects.get(user=self.user).quantity, 2)
+
+        response = self.client.post(reverse('stockreservation-confirm', args=[reservation_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+    def test_confirm_with_insufficient_funds_keeps_hold(self):
+        reservation_id = self.reserve(2).data['id']
+        BankAccount.objects.filter(pk=self.bank_account.pk).update(balance=10.00)
+        response = self.client.post(reverse('stockreservation-confirm', args=[reservation_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(StockReservation.objects.get(pk=reservation_id).status, StockReservation.STATUS_ACTIVE)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 2)
+        self.assertEqual(self.product.quantity, 10)
+
+    def test_stock_cannot_be_set_below_the_hold(self):
+        reservation_id = self.reserve(5).data['id']
+        admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(admin).access_token}')
+        response = self.client.patch(reverse('product-detail', args=[self.product.id]), {'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('quantity', response.data)
+
+        # A write that skips the serializer still can't make confirmation drive stock negative.
+        Product.objects.filter(pk=self.product.pk).update(quantity=2)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        response = self.client.post(reverse('stockreservation-confirm', args=[reservation_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db()
+        self.assertEqual((self.product.quantity, self.product.reserved_quantity), (2, 5))
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_release_reservation(self):
+        reservation_id = self.reserve(3).data['id']
+        response = self.client.post(reverse('stockreservation-release', args=[reservation_id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['status'], StockReservation.STATUS_RELEASED)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 0)
+
+    def test_other_users_reservations_are_hidden(self):
+        reservation_id = self.reserve(1).data['id']
+        other = User.objects.create_user(email='other@example.com', password='testpass', name='Other User')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(other).access_token}')
+        response = self.client.post(reverse('stockreservation-release', args=[reservation_id]))
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(self.client.get(reverse('stockreservation-list')).data, [])
+
+    def test_expire_command_releases_stale_holds(self):
+        stale_id = self.reserve(3).data['id']
+        fresh_id = self.reserve(2).data['id']
+        StockReservation.objects.filter(pk=stale_id).update(expires_at=timezone.now() - timedelta(seconds=1))
+
+        response = self.client.post(reverse('stockreservation-confirm', args=[stale_id]))
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+
+        out = StringIO()
+        call_command('expire_reservations', stdout=out)
+        self.assertIn('Expired 1', out.getvalue())
+        self.assertEqual(StockReservation.objects.get(pk=stale_id).status, StockReservation.STATUS_EXPIRED)
+        self.assertEqual(StockReservation.objects.get(pk=fresh_id).status, StockReservation.STATUS_ACTIVE)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.reserved_quantity, 2)
@@ -0,0 +1,65 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.stock_service import enable_sharded_stock
+
+class SparseFieldsetTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='x' * 500, cost_price=10, profit_margin=0.5,
+                                   quantity=i, supplier=self.supplier)
+            for i in range(3)
+        ]
+
+    def test_values_path_renders_like_the_serializer(self):
+        full = self.client.get(reverse('product-list')).data['results']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('product-list'), {'fields': 'id,name,price,updated_at'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(
+            [dict(row) for row in response.data['results']],
+            [{key: row[key] for key in ('id', 'name', 'price', 'updated_at')} for row in full]
+        )
+        select = [q['sql'] for q in queries if 'FROM "pharmacy_management_app_product"' in q['sql'] and 'LIMIT' in q['sql']]
+        self.assertNotIn('description', select[0])
+
+    def test_computed_fields_use_instances(self):
+        enable_sharded_stock(self.products[2].id, 2)
+        response = self.client.get(reverse('product-list'), {'fields': 'id,quantity,available_quantity'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([sorted(row) for row in response.data['results']], [['available_quantity', 'id', 'quantity']] * 3)
+        self.assertEqual(response.data['results'][2]['quantity'], 2)
+
+    def test_cursor_mode_with_fields(self):
+        response = self.client.get(reverse('product-list'), {'fields': 'name', 'pagination': 'cursor', 'page_size': 2})
+        self.assertEqual([row['name'] for row in response.data['results']], ['Product 0', 'Product 1'])
+        response = self.client.get(response.data['next'])
+        self.assertEqual([row['name'] for row in response.data['results']], ['Product 2'])
+
+    def test_unknown_field(self):
+        response = self.client.get(reverse('product-list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('fields', response.data)
+
+    def test_retrieve_user_and_supplier(self):
+        response = self.client.get(reverse('product-detail', args=[self.products[0].id]), {'fields': 'name'})
+        self.assertEqual(response.data, {'name': 'Product 0'})
+        response = self.client.get(reverse('user-list'), {'fields': 'id,email'})
+        self.assertEqual(list(response.data['results'][0]), ['id', 'email'])
+        response = self.client.get(reverse('suppliers-list'), {'fields': 'name'})
+        self.assertEqual(response.data['results'], [{'name': 'Supplier 1'}])
+
+    def test_fields_do_not_narrow_writes(self):
+        url = reverse('product-detail', args=[self.products[0].id])
+        response = self.client.patch(url + '?fields=name', {'quantity': 9}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 9)
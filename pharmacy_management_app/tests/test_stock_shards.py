@@ -0,0 +1,99 @@
+from decimal import Decimal
+from django.db import connection
+from django.db.models import Sum
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.bank_account import BankAccount
+from ..models.suppliers import Suppliers
+from ..models.stock_shard import ProductStockShard
+from ..services.purchase_service import post_purchase, post_cart_purchase
+from ..services.stock_service import enable_sharded_stock, disable_sharded_stock, split_quantity
+from ..services.bank_account_service import get_current_balance
+
+class ShardedStockTests(APITestCase):
+    def setUp(self):
+        self.admin_user = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin User')
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Vaccine', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+
+    def shard_total(self):
+        return ProductStockShard.objects.filter(product=self.product).aggregate(total=Sum('quantity'))['total']
+
+    def test_split_quantity(self):
+        self.assertEqual(split_quantity(10, 4), [3, 3, 2, 2])
+        self.assertEqual(split_quantity(2, 4), [1, 1, 0, 0])
+
+    def test_enable_and_disable(self):
+        enable_sharded_stock(self.product.id, 4)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_shards, 4)
+        self.assertEqual(ProductStockShard.objects.filter(product=self.product).count(), 4)
+        self.assertEqual(self.shard_total(), 10)
+
+        post_purchase(user=self.user, product_id=self.product.id, quantity=3)
+        disable_sharded_stock(self.product.id)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.stock_shards, 0)
+        self.assertEqual(self.product.quantity, 7)
+        self.assertFalse(ProductStockShard.objects.filter(product=self.product).exists())
+
+    def test_purchase_drains_across_shards_when_needed(self):
+        enable_sharded_stock(self.product.id, 4)
+        post_purchase(user=self.user, product_id=self.product.id, quantity=9)
+        self.assertEqual(self.shard_total(), 1)
+        with self.assertRaisesMessage(ValueError, 'Product out of stock'):
+            post_purchase(user=self.user, product_id=self.product.id, quantity=2)
+        self.assertEqual(self.shard_total(), 1)
+        self.bank_account.refresh_from_db()
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('910.00'))
+
+    def test_cart_with_sharded_product(self):
+        other = Product.objects.create(name='Other', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+        enable_sharded_stock(self.product.id, 4)
+        post_cart_purchase(user=self.user, items=[{'product_id': self.product.id, 'quantity': 2}, {'product_id': other.id, 'quantity': 3}])
+        self.assertEqual(self.shard_total(), 8)
+        other.refresh_from_db()
+        self.assertEqual(other.quantity, 7)
+
+    def test_api_reports_summed_quantity(self):
+        enable_sharded_stock(self.product.id, 4)
+        post_purchase(user=self.user, product_id=self.product.id, quantity=1)
+        response = self.client.get(reverse('product-detail', args=[self.product.id]))
+        self.assertEqual(response.data['quantity'], 9)
+        self.assertEqual(response.data['stock_shards'], 4)
+
+    def test_list_sums_shards_in_the_product_query(self):
+        for index in range(3):
+            product = Product.objects.create(name=f'Sharded {index}', description='x', cost_price=1, quantity=5, supplier=self.supplier)
+            enable_sharded_stock(product.id, 2)
+        enable_sharded_stock(self.product.id, 4)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('product-list'))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([p['quantity'] for p in response.data['results']], [10, 5, 5, 5])
+        self.assertFalse(any('pharmacy_management_app_productstockshard' in q['sql'] and 'pharmacy_management_app_product"' not in q['sql']
+                             for q in queries.captured_queries))
+
+    def test_admin_toggles_sharding_through_api(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin_user).access_token}')
+        url = reverse('product-shard-stock', args=[self.product.id])
+        response = self.client.post(url, {'shards': 8}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['quantity'], 10)
+        response = self.client.post(url, {'shards': 0}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['stock_shards'], 0)
+        self.assertEqual(response.data['quantity'], 10)
+
+    def test_sharded_products_cannot_be_reserved(self):
+        enable_sharded_stock(self.product.id, 4)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        response = self.client.post(reverse('stockreservation-list'), {'product_id': self.product.id, 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
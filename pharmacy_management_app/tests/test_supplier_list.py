@@ -0,0 +1,124 @@
+from decimal import Decimal
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..models.product import Product
+from ..models.suppliers import Suppliers
+from ..services.stock_service import enable_sharded_stock
+
+class SupplierListTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.alpha = Suppliers.objects.create(name='Alpha Pharma', contact_info='alpha@example.com')
+        self.beta = Suppliers.objects.create(name='Beta Labs', contact_info='beta@example.com')
+        self.empty = Suppliers.objects.create(name='Gamma Pharma', contact_info='gamma@example.com')
+        Product.objects.create(name='A1', description='x', cost_price=Decimal('2.50'), quantity=4, supplier=self.alpha)
+        sharded = Product.objects.create(name='A2', description='x', cost_price=10, quantity=6, supplier=self.alpha)
+        enable_sharded_stock(sharded.id, 3)
+        Product.objects.create(name='B1', description='x', cost_price=1, quantity=7, supplier=self.beta)
+        self.url = reverse('suppliers-list')
+
+    def test_paginated_and_filtered(self):
+        response = self.client.get(self.url, {'page_size': 2})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 3)
+        self.assertEqual([s['id'] for s in response.data['results']], [self.alpha.id, self.beta.id])
+        self.assertIsNotNone(response.data['next'])
+
+        response = self.client.get(self.url, {'name': 'pharma', 'ordering': '-name'})
+        self.assertEqual([s['name'] for s in response.data['results']], ['Gamma Pharma', 'Alpha Pharma'])
+        self.assertNotIn('product_count', response.data['results'][0])
+
+    def test_stats_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.url, {'include': 'stats', 'pagination': 'cursor'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        stats = {s['id']: (s['product_count'], s['total_units'], s['inventory_value']) for s in response.data['results']}
+        self.assertEqual(stats, {
+            self.alpha.id: (2, 10, '70.00'),
+            self.beta.id: (1, 7, '7.00'),
+            self.empty.id: (0, 0, '0.00'),
+        })
+        supplier_queries = [q for q in queries if 'FROM "pharmacy_management_app_suppliers"' in q['sql']]
+        self.assertEqual(len(supplier_queries), 1)
+
+    def test_stats_ordering_and_values_path(self):
+        response = self.client.get(self.url, {'include': 'stats', 'ordering': '-inventory_value',
+                                              'fields': 'name,inventory_value'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual([dict(row) for row in response.data['results']], [
+            {'name': 'Alpha Pharma', 'inventory_value': '70.00'},
+            {'name': 'Beta Labs', 'inventory_value': '7.00'},
+            {'name': 'Gamma Pharma', 'inventory_value': '0.00'},
+        ])
+
+    def test_unknown_include_is_rejected(self):
+        response = self.client.get(self.url, {'include': 'stats,owners'})
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('include', response.data)
+
+
+class SupplierProductsTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.suppliers = [
+            Suppliers.objects.create(name=f'Supplier {i}', contact_info=f's{i}@example.com') for i in range(4)
+        ]
+        for supplier in self.suppliers:
+            for i in range(12):
+                Product.objects.create(name=f'{supplier.name} product {i:02}', description='x', cost_price=i + 1,
+                                       quantity=i, supplier=supplier)
+        self.sharded = Product.objects.filter(supplier=self.suppliers[0]).order_by('name').first()
+        Product.objects.filter(pk=self.sharded.pk).update(quantity=9)
+        enable_sharded_stock(self.sharded.id, 2)
+
+    def test_nested_products(self):
+        url = reverse('suppliers-products', args=[self.suppliers[1].id])
+        response = self.client.get(url, {'page_size': 5, 'max_price': 6})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['count'], 5)
+        self.assertTrue(all(p['supplier'] == self.suppliers[1].id for p in response.data['results']))
+
+        response = self.client.get(reverse('suppliers-products', args=[self.sharded.supplier_id]),
+                                   {'fields': 'id,quantity'})
+        self.assertEqual(response.data['results'][0], {'id': self.sharded.id, 'quantity': 9})
+
+        self.assertEqual(self.client.get(reverse('suppliers-products', args=[0])).status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_nested_products_are_readable_anonymously(self):
+        self.client.credentials()
+        response = self.client.get(reverse('suppliers-products', args=[self.suppliers[0].id]))
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_product_list_filters_by_supplier(self):
+        response = self.client.get(reverse('product-list'), {'supplier': self.suppliers[2].id, 'page_size': 100})
+        self.assertEqual(response.data['count'], 12)
+
+    def include_products(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('suppliers-list'), {'include': 'products,stats', 'page_size': page_size})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_include_products_is_bounded_with_fixed_queries(self):
+        response, small_page_queries = self.include_products(1)
+        response, queries = self.include_products(4)
+        self.assertEqual(queries, small_page_queries)
+
+        first = response.data['results'][0]
+        self.assertEqual(first['product_count'], 12)
+        self.assertEqual(len(first['products']), 10)
+        self.assertEqual(first['products'][0]['id'], self.sharded.id)
+        self.assertEqual(first['products'][0]['quantity'], 9)
+        self.assertEqual([p['name'] for p in first['products']], sorted(p['name'] for p in first['products']))
+
+    def test_include_products_with_values_fields(self):
+        response = self.client.get(reverse('suppliers-list'), {'include': 'products', 'fields': 'id,name'})
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(list(response.data['results'][0]), ['id', 'name'])
@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from io import StringIO
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITransactionTestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.token_revocation import TokenRevocation
+from ..models.user import User
+from ..services.token_revocation_service import TokenRevocationList, revoke_user_tokens, token_revocations
+
+class TokenRevocationTests(APITransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        token_revocations.reset()
+        self.user = User.objects.create_user(email='staff@example.com', password='password123', name='Staff')
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.url = reverse('user-detail', args=[self.user.id])
+
+    def get(self, token):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {token}')
+        return self.client.get(self.url)
+
+    def revocation_queries(self, token):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.get(token)
+        return response, [q for q in queries if 'pharmacy_management_app_tokenrevocation' in q['sql']]
+
+    def test_checks_do_not_query_until_something_is_revoked(self):
+        access = self.refresh.access_token
+        response, queries = self.revocation_queries(access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(len(queries), 1)
+        response, queries = self.revocation_queries(access)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(queries, [])
+
+    def test_logout_revokes_access_and_refresh_tokens(self):
+        access = self.refresh.access_token
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        response = self.client.post(reverse('token_revoke'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_204_NO_CONTENT)
+
+        response = self.get(access)
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get(RefreshToken.for_user(self.user).access_token).status_code, status.HTTP_200_OK)
+
+    def test_logout_rejects_someone_elses_refresh_token(self):
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+        response = self.client.post(reverse('token_revoke'), {'refresh': str(RefreshToken.for_user(self.admin))}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(TokenRevocation.objects.exists())
+
+    def test_admin_revokes_every_token_of_a_user(self):
+        access = self.refresh.access_token
+        self.assertEqual(self.get(access).status_code, status.HTTP_200_OK)
+
+        url = reverse('user-revoke-tokens', args=[self.user.id])
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {access}')
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_403_FORBIDDEN)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.assertEqual(self.client.post(url).status_code, status.HTTP_200_OK)
+
+        self.assertEqual(self.get(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        self.client.credentials()
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+        self.assertEqual(self.get(RefreshToken.for_user(self.admin).access_token).status_code, status.HTTP_200_OK)
+
+    def test_tokens_issued_after_the_cutoff_still_work(self):
+        revoke_user_tokens(self.user.id, issued_before=timezone.now() - timedelta(minutes=1))
+        self.assertEqual(self.get(self.refresh.access_token).status_code, status.HTTP_200_OK)
+        response = self.client.post(reverse('token_refresh'), {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_other_processes_refresh_incrementally(self):
+        other_process = TokenRevocationList()
+        access = self.refresh.access_token
+        self.assertFalse(other_process.is_revoked(access['jti'], self.user.id, access['iat']))
+
+        call_command('revoke_tokens', 'staff@example.com', stdout=StringIO())
+        with CaptureQueriesContext(connection) as queries:
+            self.assertTrue(other_process.is_revoked(access['jti'], self.user.id, access['iat']))
+        self.assertEqual(len(queries), 1)
+        self.assertIn('created_at', queries[0]['sql'])
+
+    def test_revocations_are_reread_without_a_version_bump(self):
+        other_process = TokenRevocationList()
+        access = self.refresh.access_token
+        self.assertFalse(other_process.is_revoked(access['jti'], self.user.id, access['iat']))
+        # Written by a process whose bump never reaches this one, as with a per-process cache.
+        TokenRevocation.objects.create(user=self.user, jti=access['jti'], expires_at=timezone.now() + timedelta(hours=1))
+        self.assertFalse(other_process.is_revoked(access['jti'], self.user.id, access['iat']))
+        with override_settings(TOKEN_REVOCATION_REFRESH_SECONDS=-1):
+            self.assertTrue(other_process.is_revoked(access['jti'], self.user.id, access['iat']))
+
+    def test_tokens_from_the_revocation_second_are_revoked(self):
+        access = self.refresh.access_token
+        issued_at = datetime.fromtimestamp(access['iat'], tz=dt_timezone.utc)
+        revocation = revoke_user_tokens(self.user.id, issued_before=issued_at.replace(microsecond=300000))
+        self.assertEqual(revocation.issued_before, issued_at + timedelta(seconds=1))
+        self.assertEqual(self.get(access).status_code, status.HTTP_401_UNAUTHORIZED)
+        # A login in the following second is not affected.
+        self.assertFalse(token_revocations.is_revoked(None, self.user.id, access['iat'] + 1))
+
+    def test_purge_expired(self):
+        TokenRevocation.objects.create(user=self.user, jti='old', expires_at=timezone.now() - timedelta(seconds=1))
+        revoke_user_tokens(self.user.id)
+        out = StringIO()
+        call_command('revoke_tokens', '--purge-expired', stdout=out)
+        self.assertIn('Deleted 1 expired revocations', out.getvalue())
+        self.assertEqual(TokenRevocation.objects.count(), 1)
@@ -1,3 +1,8 @@
+import threading
+from decimal import Decimal
+from django.db import connection
+from django.test import TransactionTestCase
+from django.test.utils import CaptureQueriesContext
 from django.urls import reverse
 from rest_framework import status
 from rest_framework.test import APITestCase
@@ -6,6 +11,9 @@ from ..models.user import User
 from ..models.product import Product
 from ..models.bank_account import BankAccount
 from ..models.suppliers import Suppliers
+from ..models.purchase import Purchase
+from ..services.purchase_service import post_purchase
+from ..services.bank_account_service import get_current_balance
 
 class PurchaseProductTests(APITestCase):
     def setUp(self):
@@ -16,3 +24,140 @@ class PurchaseProductTests(APITestCase):
         
         refresh = RefreshToken.for_user(self.user)
         self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_purchase_product(self):
+        url = reverse('purchase-product')
+        response = self.client.post(url, {'product_id': self.product.id, 'quantity': 2}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.product.refresh_from_db()
+        self.bank_account.refresh_from_db()
+        self.assertEqual(self.product.quantity, 8)
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('800.00'))
+        self.assertEqual(Purchase.objects.filter(user=self.user, product=self.product).count(), 1)
+
+    def test_purchase_insufficient_funds(self):
+        BankAccount.objects.filter(pk=self.bank_account.pk).update(balance=500.00)
+        url = reverse('purchase-product')
+        response = self.client.post(url, {'product_id': self.product.id, 'quantity': 6}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.product.refresh_from_db()
+        self.bank_account.refresh_from_db()
+        self.assertEqual(self.product.quantity, 10)
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('500.00'))
+        self.assertFalse(Purchase.objects.exists())
+
+    def test_purchase_out_of_stock(self):
+        url = reverse('purchase-product')
+        response = self.client.post(url, {'product_id': self.product.id, 'quantity': 11}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(response.data['detail'], 'Product out of stock')
+
+    def test_purchase_unknown_product(self):
+        url = reverse('purchase-product')
+        response = self.client.post(url, {'product_id': 999999, 'quantity': 1}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+
+class CartCheckoutTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='testuser@example.com', password='testpass', name='Test User')
+        self.bank_account = BankAccount.objects.create(user=self.user, account_number='1234567890', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=1000.00)
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=10, supplier=self.supplier)
+            for i in range(15)
+        ]
+        refresh = RefreshToken.for_user(self.user)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {refresh.access_token}')
+
+    def test_checkout_many_items(self):
+        url = reverse('cart-checkout')
+        items = [{'product_id': product.id, 'quantity': 2} for product in self.products]
+        response = self.client.post(url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.data['total'], '300.00')
+        self.assertEqual(Purchase.objects.filter(user=self.user).count(), 15)
+        self.assertFalse(Product.objects.exclude(quantity=8).exists())
+        self.bank_account.refresh_from_db()
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('700.00'))
+
+    def test_checkout_merges_duplicate_lines(self):
+        url = reverse('cart-checkout')
+        product = self.products[0]
+        items = [{'product_id': product.id, 'quantity': 3}, {'product_id': product.id, 'quantity': 4}]
+        response = self.client.post(url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        product.refresh_from_db()
+        self.assertEqual(product.quantity, 3)
+        self.assertEqual(Purchase.objects.get(user=self.user).quantity, 7)
+
+    def test_checkout_is_all_or_nothing(self):
+        url = reverse('cart-checkout')
+        items = [{'product_id': self.products[0].id, 'quantity': 1}, {'product_id': self.products[1].id, 'quantity': 11}]
+        response = self.client.post(url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertFalse(Purchase.objects.exists())
+        self.assertFalse(Product.objects.exclude(quantity=10).exists())
+        self.bank_account.refresh_from_db()
+        self.assertEqual(get_current_balance(self.bank_account), Decimal('1000.00'))
+
+    def test_checkout_unknown_product(self):
+        url = reverse('cart-checkout')
+        response = self.client.post(url, {'items': [{'product_id': 999999, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_checkout_query_count_is_independent_of_basket_size(self):
+        url = reverse('cart-checkout')
+        with CaptureQueriesContext(connection) as single:
+            response = self.client.post(url, {'items': [{'product_id': self.products[0].id, 'quantity': 1}]}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        items = [{'product_id': product.id, 'quantity': 1} for product in self.products[1:]]
+        with CaptureQueriesContext(connection) as basket:
+            response = self.client.post(url, {'items': items}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(len(basket), len(single))
+
+class PurchaseConcurrencyTests(TransactionTestCase):
+    THREADS = 8
+    ATTEMPTS_PER_THREAD = 10
+
+    def setUp(self):
+        self.supplier = Suppliers.objects.create(name='Test Supplier', contact_info='test@example.com')
+        self.product = Product.objects.create(name='Hot Product', description='Test Description', cost_price=8.00, profit_margin=0.25, quantity=30, supplier=self.supplier)
+        self.users = []
+        for i in range(self.THREADS):
+            user = User.objects.create_user(email=f'buyer{i}@example.com', password='testpass', name=f'Buyer {i}')
+            BankAccount.objects.create(user=user, account_number=f'99900{i}', bank_name='Test Bank', branch_code='0001', account_type='Savings', balance=55.00)
+            self.users.append(user)
+
+    def _buy(self, user, results):
+        try:
+            for _ in range(self.ATTEMPTS_PER_THREAD):
+                try:
+                    post_purchase(user=user, product_id=self.product.id, quantity=1)
+                    results.append('ok')
+                except Exception as e:
+                    results.append(repr(e))
+        finally:
+            connection.close()
+
+    def test_concurrent_purchases_do_not_oversell_or_lose_debits(self):
+        results = []
+        threads = [threading.Thread(target=self._buy, args=(user, results)) for user in self.users]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        successes = results.count('ok')
+        self.assertEqual(len(results), self.THREADS * self.ATTEMPTS_PER_THREAD)
+        self.assertLessEqual(set(results), {'ok', "ValueError('Product out of stock')", "ValueError('Insufficient funds')"})
+        self.assertEqual(successes, 30)
+        self.product.refresh_from_db()
+        self.assertEqual(self.product.quantity, 0)
+        self.assertEqual(Purchase.objects.count(), successes)
+        for user in self.users:
+            purchases = Purchase.objects.filter(user=user).count()
+            balance = get_current_balance(BankAccount.objects.get(user=user))
+            self.assertEqual(balance, Decimal('55.00') - Decimal('10.00') * purchases)
+            self.assertGreaterEqual(balance, 0)
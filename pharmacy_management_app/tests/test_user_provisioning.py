@@ -0,0 +1,97 @@
+import json
+import tempfile
+from io import StringIO
+from unittest import mock
+from django.contrib.auth import authenticate
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.user import User
+from ..services.password_hashing_service import hash_passwords, password_hashing_pool, shared_password_hashing_pool
+from ..services.user_provisioning_service import provision_users
+
+class UserProvisioningTests(APITestCase):
+    def setUp(self):
+        self.admin = User.objects.create_superuser(email='admin@example.com', password='adminpassword', name='Admin')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.admin).access_token}')
+        self.url = reverse('user-bulk-provision')
+
+    def rows(self, count, start=0):
+        return [
+            {'email': f'staff{i}@Chain.example', 'name': f'Staff {i}', 'password': f'Str0ng-pass-{i}', 'is_staff': i % 2 == 0}
+            for i in range(start, start + count)
+        ]
+
+    def test_process_pool_hashes_verify(self):
+        with password_hashing_pool(workers=2) as executor:
+            hashes = hash_passwords([f'password-{i}' for i in range(4)], executor)
+        self.assertEqual(len(set(hashes)), 4)
+        user = User(email='x@example.com', password=hashes[3])
+        self.assertTrue(user.check_password('password-3'))
+
+    def test_duplicates_and_invalid_rows_do_not_abort(self):
+        User.objects.create_user(email='staff1@chain.example', password='password123', name='Existing')
+        rows = self.rows(4) + [
+            {'email': 'staff2@chain.example', 'name': 'Repeat', 'password': 'Str0ng-pass-x'},
+            {'email': 'not-an-email', 'name': 'Bad', 'password': 'Str0ng-pass-y'},
+            {'email': 'weak@chain.example', 'name': 'Weak', 'password': '123'},
+            'garbage',
+        ]
+        result = provision_users(rows, batch_size=2, workers=1)
+        self.assertEqual((result.created, result.skipped, result.failed), (3, 2, 3))
+        self.assertEqual(result.duplicates, [{'index': 4, 'email': 'staff2@chain.example'},
+                                             {'index': 1, 'email': 'staff1@chain.example'}])
+        self.assertEqual([error['index'] for error in result.errors], [5, 6, 7])
+        self.assertEqual(User.objects.get(email='staff1@chain.example').name, 'Existing')
+        self.assertTrue(User.objects.get(email='staff0@chain.example').is_staff)
+        self.assertEqual(authenticate(email='staff3@chain.example', password='Str0ng-pass-3').name, 'Staff 3')
+
+    def test_endpoint_is_admin_only(self):
+        response = self.client.post(self.url, {'users': self.rows(2)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertEqual(response.data['created'], 2)
+        self.assertEqual(self.client.post(self.url, {'users': []}, format='json').status_code, status.HTTP_400_BAD_REQUEST)
+
+        with override_settings(USER_PROVISIONING_MAX_HTTP_USERS=3):
+            response = self.client.post(self.url, {'users': self.rows(4, start=10)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertIn('provision_users', str(response.data['users'][0]))
+        self.assertFalse(User.objects.filter(email='staff10@chain.example').exists())
+
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(User.objects.get(email="staff1@chain.example")).access_token}')
+        response = self.client.post(self.url, {'users': self.rows(1, start=5)}, format='json')
+        self.assertEqual(response.status_code, status.HTTP_403_FORBIDDEN)
+
+    @override_settings(USER_PROVISIONING_HTTP_WORKERS=2)
+    def test_requests_share_one_bounded_pool(self):
+        executor = shared_password_hashing_pool()
+        self.assertIs(shared_password_hashing_pool(), executor)
+        self.assertEqual(executor.workers, 2)
+        with mock.patch('pharmacy_management_app.views.user.provision_users', wraps=provision_users) as provision:
+            response = self.client.post(self.url, {'users': self.rows(4)}, format='json')
+        self.assertEqual(response.data['created'], 4)
+        self.assertIs(provision.call_args.kwargs['executor'], executor)
+        self.assertTrue(User.objects.get(email='staff3@chain.example').check_password('Str0ng-pass-3'))
+
+        with override_settings(USER_PROVISIONING_HTTP_WORKERS=1):
+            self.assertIsNone(shared_password_hashing_pool())
+
+    def test_command_reads_csv(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.csv', delete=False) as file:
+            file.write('email,name,password,is_staff\n')
+            file.write('pharmacist@chain.example,Pharmacist,Str0ng-pass-1,yes\n')
+            file.write('admin@example.com,Admin again,Str0ng-pass-2,no\n')
+        out, err = StringIO(), StringIO()
+        call_command('provision_users', file.name, '--workers', '1', stdout=out, stderr=err)
+        self.assertIn('Created 1, skipped 1 duplicates, failed 0 users', out.getvalue())
+        self.assertIn('admin@example.com already exists', err.getvalue())
+        self.assertTrue(User.objects.get(email='pharmacist@chain.example').is_staff)
+
+    def test_command_reads_json(self):
+        with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as file:
+            json.dump(self.rows(1), file)
+        call_command('provision_users', file.name, '--workers', '1', stdout=StringIO(), stderr=StringIO())
+        self.assertTrue(User.objects.filter(email='staff0@chain.example').exists())
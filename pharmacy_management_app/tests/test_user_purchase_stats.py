@@ -0,0 +1,75 @@
+from datetime import timedelta
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from rest_framework.test import APITestCase
+from rest_framework_simplejwt.tokens import RefreshToken
+from ..models.product import Product
+from ..models.purchase import Purchase
+from ..models.suppliers import Suppliers
+from ..models.user import User
+
+class UserPurchaseStatsTests(APITestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email='buyer0@example.com', password='password123', name='Buyer 0')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+        supplier = Suppliers.objects.create(name='Supplier 1', contact_info='test@example.com')
+        self.products = [
+            Product.objects.create(name=f'Product {i}', description='x', cost_price=1, quantity=100, supplier=supplier)
+            for i in range(3)
+        ]
+        self.buyers = [self.user] + [
+            User.objects.create_user(email=f'buyer{i}@example.com', password='password123', name=f'Buyer {i}')
+            for i in range(1, 5)
+        ]
+        self.idle = User.objects.create_user(email='idle@example.com', password='password123', name='Idle')
+        now = timezone.now()
+        for buyer in self.buyers:
+            for day in range(8):
+                purchase = Purchase.objects.create(user=buyer, product=self.products[day % 3], quantity=day + 1)
+                Purchase.objects.filter(pk=purchase.pk).update(purchase_date=now - timedelta(days=day))
+        self.last_purchase = now
+
+    def list_users(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse('user-list'), params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response, len(queries)
+
+    def test_list_has_stats_without_per_user_queries(self):
+        response, _ = self.list_users(page_size=1)
+        response, one_user_queries = self.list_users(page_size=1)
+        response, queries = self.list_users(page_size=6)
+        self.assertEqual(queries, one_user_queries)
+
+        users = {user['id']: user for user in response.data['results']}
+        buyer = users[self.user.id]
+        self.assertEqual(buyer['purchase_count'], 8)
+        self.assertEqual(buyer['units_purchased'], 36)
+        self.assertEqual(buyer['last_purchase_at'], self.last_purchase.isoformat().replace('+00:00', 'Z'))
+        self.assertNotIn('recent_purchases', buyer)
+        self.assertNotIn('purchased_products', buyer)
+        self.assertEqual((users[self.idle.id]['purchase_count'], users[self.idle.id]['last_purchase_at']), (0, None))
+
+    def test_recent_purchases_are_opt_in_and_bounded(self):
+        response, default_queries = self.list_users(include='recent_purchases', page_size=1)
+        response, queries = self.list_users(include='recent_purchases', page_size=6, recent_limit=3)
+        self.assertEqual(queries, default_queries)
+        recent = {user['id']: user['recent_purchases'] for user in response.data['results']}
+        self.assertEqual([p['quantity'] for p in recent[self.user.id]], [1, 2, 3])
+        self.assertEqual(recent[self.user.id][0]['product_name'], 'Product 0')
+        self.assertEqual(recent[self.idle.id], [])
+
+        response = self.client.get(reverse('user-detail', args=[self.user.id]), {'include': 'recent_purchases'})
+        self.assertEqual(len(response.data['recent_purchases']), 5)
+
+    def test_values_path_and_bad_params(self):
+        response, _ = self.list_users(fields='id,purchase_count')
+        self.assertEqual(dict(response.data['results'][0]), {'id': self.user.id, 'purchase_count': 8})
+
+        url = reverse('user-detail', args=[self.user.id])
+        self.assertEqual(self.client.get(url, {'include': 'purchases'}).status_code, status.HTTP_400_BAD_REQUEST)
+        self.assertEqual(self.client.get(reverse('user-list'), {'include': 'recent_purchases', 'recent_limit': 'x'}).status_code,
+                         status.HTTP_400_BAD_REQUEST)
@@ -1,13 +1,15 @@
 from rest_framework import viewsets
+from rest_framework.decorators import action
+from drf_yasg.utils import swagger_auto_schema
 from rest_framework.permissions import IsAuthenticated
 from ..models.bank_account import BankAccount
-from ..serializers.bank_account import BankAccountSerializer
+from ..serializers.bank_account import BankAccountSerializer, BankLedgerEntrySerializer
 from ..permissions import IsOwner
-from ..services.bank_account_service import get_user_bank_accounts, create_bank_account
+from ..services.bank_account_service import get_user_bank_accounts, create_bank_account, get_ledger_entries
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
+from ..pagination import ListPagination
 
-class BankAccountPagination(PageNumberPagination):
+class BankAccountPagination(ListPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -29,3 +31,14 @@ class BankAccountViewSet(viewsets.ModelViewSet):
 
     def perform_create(self, serializer):
         create_bank_account(serializer, self.request.user)
+
+    @swagger_auto_schema(
+        operation_description="List the ledger entries of a bank account, newest first",
+        responses={200: BankLedgerEntrySerializer(many=True)}
+    )
+    @action(detail=True, methods=['get'])
+    def ledger(self, request, pk=None):
+        bank_account = self.get_object()
+        page = self.paginate_queryset(get_ledger_entries(bank_account))
+        serializer = BankLedgerEntrySerializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
@@ -4,18 +4,36 @@ from rest_framework import status, viewsets
 from rest_framework.views import APIView
 from rest_framework.parsers import MultiPartParser, FormParser
 from rest_framework.response import Response
+from rest_framework.decorators import action
 from rest_framework.permissions import IsAuthenticated, IsAuthenticatedOrReadOnly
 from drf_yasg.utils import swagger_auto_schema
 from drf_yasg import openapi
 from ..models.product import Product
-from ..serializers.product import ProductSerializer
+from ..serializers.product import ProductSerializer, ProductBulkUpdateSerializer
 from ..permissions import IsAdminUser
+from ..filters import ProductFilter, StableOrderingFilter
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
+from ..pagination import ListPagination, paginated_list_response
 from ..models.suppliers import Suppliers
+from ..services.stock_service import current_quantity_expression, enable_sharded_stock, disable_sharded_stock, get_low_stock_products
+from ..services.product_service import import_products_csv, stream_products_csv, stream_products_ndjson, bulk_update_products
+from ..services.search_service import search_products, MAX_SEARCH_RESULTS
+from ..services.autocomplete_service import suggest_product_names, MAX_SUGGESTIONS
+from ..services.cache_service import cached_response
+from ..services.etag_service import (
+    evaluate_preconditions,
+    get_product_page_validators,
+    get_product_validators,
+    has_preconditions,
+    set_validators,
+)
+from django.db import transaction
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
 logger = logging.getLogger(__name__)
 
-class ProductPagination(PageNumberPagination):
+class ProductPagination(ListPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -24,23 +42,42 @@ class ProductPagination(PageNumberPagination):
 class ProductViewSet(viewsets.ModelViewSet):
     queryset = Product.objects.all()
     serializer_class = ProductSerializer
-    filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['name']
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
+    filterset_class = ProductFilter
+    ordering_fields = ['price', 'name', 'created_at', 'updated_at']
+    ordering = ['id']
     pagination_class = ProductPagination
 
     def get_permissions(self):
-        if self.action in ['list', 'retrieve']:
+        if self.action in ['list', 'retrieve', 'search', 'autocomplete']:
             self.permission_classes = [IsAuthenticatedOrReadOnly]
+        elif self.action == 'export':
+            self.permission_classes = [IsAuthenticated]
         else:
             self.permission_classes = [IsAuthenticated, IsAdminUser]
         return super().get_permissions()
 
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        if getattr(self, 'lock_object', False):
+            queryset = queryset.select_for_update()
+        if self.action in ('list', 'retrieve'):
+            # Sums sharded stock in the same query instead of one shard query per product. Writes
+            # skip it: the annotation would be stale once the serializer changes the stock.
+            queryset = queryset.annotate(current_quantity=current_quantity_expression())
+        return queryset
+
     @swagger_auto_schema(
-        operation_description="Retrieve a list of products",
+        operation_description="Retrieve a list of products, filterable by min_price/max_price, sortable with ordering=price or -price, narrowed with fields=id,name,price",
         responses={200: ProductSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        def build_response():
+            queryset = self.filter_queryset(self.get_queryset())
+            return paginated_list_response(self, request, queryset, get_product_page_validators,
+                                           extra=('updated_at', 'stock_shards'))
+
+        return cached_response(request, ['product'], build_response)
 
     @swagger_auto_schema(
         operation_description="Create a new product",
@@ -61,7 +98,32 @@ class ProductViewSet(viewsets.ModelViewSet):
         responses={200: ProductSerializer}
     )
     def retrieve(self, request, *args, **kwargs):
-        return super().retrieve(request, *args, **kwargs)
+        def build_response():
+            product = self.get_object()
+            etag, last_modified = get_product_validators(product)
+            not_modified = evaluate_preconditions(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            return set_validators(Response(self.get_serializer(product).data), etag, last_modified)
+
+        return cached_response(request, ['product'], build_response)
+
+    def write_if_unmodified(self, request, write, *args, **kwargs):
+        # If-Match / If-Unmodified-Since on writes: 412 when the client edited a stale copy. The
+        # row stays locked from the check to the write, so two clients holding the same
+        # validator can't both pass.
+        if not has_preconditions(request):
+            return write(request, *args, **kwargs)
+        with transaction.atomic():
+            self.lock_object = True
+            failed = evaluate_preconditions(request, *get_product_validators(self.get_object()))
+            if failed is not None:
+                return failed
+            return write(request, *args, **kwargs)
+
+    def perform_update(self, serializer):
+        super().perform_update(serializer)
+        self.updated_instance = serializer.instance
 
     @swagger_auto_schema(
         operation_description="Update a product by ID",
@@ -69,7 +131,10 @@ class ProductViewSet(viewsets.ModelViewSet):
         responses={200: ProductSerializer}
     )
     def update(self, request, *args, **kwargs):
-        return super().update(request, *args, **kwargs)
+        response = self.write_if_unmodified(request, super().update, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        return set_validators(response, *get_product_validators(self.updated_instance))
 
     @swagger_auto_schema(
         operation_description="Partially update a product by ID",
@@ -84,4 +149,157 @@ class ProductViewSet(viewsets.ModelViewSet):
         responses={204: 'No Content'}
     )
     def destroy(self, request, *args, **kwargs):
-        return super().destroy(request, *args, **kwargs)
+        return self.write_if_unmodified(request, super().destroy, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="Split a product's stock across N counter rows (0 folds it back into the product row)",
+        request_body=openapi.Schema(
+            type=openapi.TYPE_OBJECT,
+            properties={'shards': openapi.Schema(type=openapi.TYPE_INTEGER)},
+            required=['shards']
+        ),
+        responses={200: ProductSerializer, 400: 'Bad Request', 404: 'Product not found'}
+    )
+    @action(detail=True, methods=['post'], url_path='shard-stock')
+    def shard_stock(self, request, pk=None):
+        try:
+            shards = int(request.data.get('shards'))
+        except (TypeError, ValueError):
+            return Response({'detail': 'shards must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            product = enable_sharded_stock(pk, shards) if shards else disable_sharded_stock(pk)
+        except Product.DoesNotExist:
+            return Response({'detail': 'Product not found.'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(self.get_serializer(product).data)
+
+    @swagger_auto_schema(
+        operation_description="Import or update products from a CSV file (name, description, cost_price, profit_margin, quantity, supplier)",
+        manual_parameters=[
+            openapi.Parameter('file', openapi.IN_FORM, type=openapi.TYPE_FILE, required=True),
+            openapi.Parameter('chunk_size', openapi.IN_FORM, type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: 'Import summary', 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['post'], url_path='import', parser_classes=[MultiPartParser, FormParser])
+    def import_csv(self, request):
+        file = request.FILES.get('file')
+        if file is None:
+            return Response({'detail': 'No file provided.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            chunk_size = max(1, min(int(request.data.get('chunk_size', 1000)), 10000))
+        except (TypeError, ValueError):
+            return Response({'detail': 'chunk_size must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            result = import_products_csv(file, chunk_size=chunk_size)
+        except (ValueError, UnicodeDecodeError, csv.Error) as e:
+            logger.warning('Product import failed: %s', e)
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Update cost_price, profit_margin and/or quantity of up to 10000 products in one transaction",
+        request_body=ProductBulkUpdateSerializer,
+        responses={200: 'Update summary', 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-update')
+    def bulk_update(self, request):
+        serializer = ProductBulkUpdateSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = bulk_update_products(serializer.validated_data['items'])
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="List products whose stock is below their reorder_level",
+        manual_parameters=[
+            openapi.Parameter('supplier', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: ProductSerializer(many=True), 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['get'], url_path='low-stock')
+    def low_stock(self, request):
+        try:
+            supplier_id = int(request.query_params['supplier']) if request.query_params.get('supplier') else None
+        except ValueError:
+            return Response({'detail': 'supplier must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        page = self.paginate_queryset(get_low_stock_products(supplier_id))
+        return self.get_paginated_response(self.get_serializer(page, many=True).data)
+
+    @swagger_auto_schema(
+        operation_description="Stream the whole catalog as CSV or NDJSON",
+        manual_parameters=[
+            openapi.Parameter('output', openapi.IN_QUERY, type=openapi.TYPE_STRING, enum=['csv', 'ndjson'], required=False),
+            openapi.Parameter('supplier', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
+            openapi.Parameter('updated_after', openapi.IN_QUERY, type=openapi.TYPE_STRING, format=openapi.FORMAT_DATETIME, required=False),
+        ],
+        responses={200: 'Catalog stream', 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        output = request.query_params.get('output', 'csv')
+        if output not in ('csv', 'ndjson'):
+            return Response({'detail': 'output must be csv or ndjson.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            supplier_id = int(request.query_params['supplier']) if request.query_params.get('supplier') else None
+        except ValueError:
+            return Response({'detail': 'supplier must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        updated_after = None
+        if request.query_params.get('updated_after'):
+            try:
+                updated_after = parse_datetime(request.query_params['updated_after'])
+            except ValueError:
+                pass
+            if updated_after is None:
+                return Response({'detail': 'updated_after must be an ISO 8601 datetime.'}, status=status.HTTP_400_BAD_REQUEST)
+            if timezone.is_naive(updated_after):
+                updated_after = timezone.make_aware(updated_after)
+
+        if output == 'csv':
+            response = StreamingHttpResponse(stream_products_csv(supplier_id, updated_after), content_type='text/csv')
+            response['Content-Disposition'] = 'attachment; filename="products.csv"'
+        else:
+            response = StreamingHttpResponse(stream_products_ndjson(supplier_id, updated_after), content_type='application/x-ndjson')
+        return response
+
+    @swagger_auto_schema(
+        operation_description="Ranked full-text search over product names and descriptions, tolerant of typos on PostgreSQL",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: ProductSerializer(many=True), 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', 20)), MAX_SEARCH_RESULTS))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        return cached_response(
+            request, ['product'],
+            lambda: Response(self.get_serializer(search_products(query, limit=limit), many=True).data)
+        )
+
+    @swagger_auto_schema(
+        operation_description="Product name suggestions for a search box, matched on the start of the name",
+        manual_parameters=[
+            openapi.Parameter('q', openapi.IN_QUERY, type=openapi.TYPE_STRING, required=True),
+            openapi.Parameter('limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False),
+        ],
+        responses={200: 'List of {id, name}', 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['get'])
+    def autocomplete(self, request):
+        query = request.query_params.get('q', '').strip()
+        if not query:
+            return Response({'detail': 'q is required.'}, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            limit = max(1, min(int(request.query_params.get('limit', MAX_SUGGESTIONS)), MAX_SUGGESTIONS))
+        except ValueError:
+            return Response({'detail': 'limit must be an integer.'}, status=status.HTTP_400_BAD_REQUEST)
+        suggestions = suggest_product_names(query, limit=limit)
+        return Response([{'id': pk, 'name': name} for pk, name in suggestions])
@@ -0,0 +1,41 @@
+from rest_framework import viewsets
+from rest_framework.permissions import IsAuthenticated
+from django_filters.rest_framework import DjangoFilterBackend
+from drf_yasg.utils import swagger_auto_schema
+from ..filters import PurchaseFilter
+from ..models.purchase import Purchase
+from ..pagination import KeysetPagination
+from ..serializers.purchase import PurchaseHistorySerializer
+from ..services.purchase_service import get_user_purchases
+
+class PurchaseHistoryPagination(KeysetPagination):
+    page_size = 20
+    max_page_size = 100
+    ordering = ('-purchase_date', '-id')
+
+class PurchaseHistoryViewSet(viewsets.ReadOnlyModelViewSet):
+    queryset = Purchase.objects.all()
+    serializer_class = PurchaseHistorySerializer
+    permission_classes = [IsAuthenticated]
+    filter_backends = [DjangoFilterBackend]
+    filterset_class = PurchaseFilter
+    pagination_class = PurchaseHistoryPagination
+
+    def get_queryset(self):
+        if getattr(self, 'swagger_fake_view', False):
+            return Purchase.objects.none()
+        return get_user_purchases(self.request.user)
+
+    @swagger_auto_schema(
+        operation_description="List the current user's purchases, newest first, with keyset pagination",
+        responses={200: PurchaseHistorySerializer(many=True)}
+    )
+    def list(self, request, *args, **kwargs):
+        return super().list(request, *args, **kwargs)
+
+    @swagger_auto_schema(
+        operation_description="Retrieve one of the current user's purchases",
+        responses={200: PurchaseHistorySerializer}
+    )
+    def retrieve(self, request, *args, **kwargs):
+        return super().retrieve(request, *args, **kwargs)
@@ -0,0 +1,94 @@
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from drf_yasg.utils import swagger_auto_schema
+from ..models.bank_account import BankAccount
+from ..models.product import Product
+from ..models.stock_reservation import StockReservation
+from ..serializers.reservation import StockReservationSerializer
+from ..serializers.transaction import PurchaseSerializer
+from ..services.reservation_service import (
+    get_user_reservations,
+    get_user_reservation,
+    create_reservation,
+    confirm_reservation,
+    release_reservation
+)
+
+class StockReservationViewSet(viewsets.ViewSet):
+    queryset = StockReservation.objects.all()
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="List the current user's stock reservations",
+        responses={200: StockReservationSerializer(many=True)}
+    )
+    def list(self, request, *args, **kwargs):
+        reservations = get_user_reservations(request.user, status=request.query_params.get('status', ''))
+        serializer = StockReservationSerializer(reservations, many=True)
+        return Response(serializer.data)
+
+    @swagger_auto_schema(
+        operation_description="Hold stock for a product until the reservation expires",
+        request_body=PurchaseSerializer,
+        responses={201: StockReservationSerializer, 400: 'Bad Request', 404: 'Product not found'}
+    )
+    def create(self, request, *args, **kwargs):
+        serializer = PurchaseSerializer(data=request.data)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        try:
+            reservation = create_reservation(
+                user=request.user,
+                product_id=serializer.validated_data['product_id'],
+                quantity=serializer.validated_data['quantity']
+            )
+        except Product.DoesNotExist:
+            return Response({'detail': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(StockReservationSerializer(reservation).data, status=status.HTTP_201_CREATED)
+
+    @swagger_auto_schema(
+        operation_description="Retrieve a stock reservation by ID",
+        responses={200: StockReservationSerializer, 404: 'Reservation not found'}
+    )
+    def retrieve(self, request, *args, **kwargs):
+        try:
+            reservation = get_user_reservation(request.user, kwargs['pk'])
+        except StockReservation.DoesNotExist:
+            return Response({'detail': 'Reservation not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(StockReservationSerializer(reservation).data)
+
+    @swagger_auto_schema(
+        operation_description="Pay for a reservation and turn it into a purchase",
+        request_body=None,
+        responses={200: StockReservationSerializer, 400: 'Bad Request', 404: 'Reservation not found'}
+    )
+    @action(detail=True, methods=['post'])
+    def confirm(self, request, pk=None):
+        try:
+            reservation, _ = confirm_reservation(user=request.user, reservation_id=pk)
+        except StockReservation.DoesNotExist:
+            return Response({'detail': 'Reservation not found'}, status=status.HTTP_404_NOT_FOUND)
+        except BankAccount.DoesNotExist:
+            return Response({'detail': 'Bank account not found'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(StockReservationSerializer(reservation).data)
+
+    @swagger_auto_schema(
+        operation_description="Release the stock held by a reservation",
+        request_body=None,
+        responses={200: StockReservationSerializer, 400: 'Bad Request', 404: 'Reservation not found'}
+    )
+    @action(detail=True, methods=['post'])
+    def release(self, request, pk=None):
+        try:
+            reservation = release_reservation(user=request.user, reservation_id=pk)
+        except StockReservation.DoesNotExist:
+            return Response({'detail': 'Reservation not found'}, status=status.HTTP_404_NOT_FOUND)
+        except ValueError as e:
+            return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(StockReservationSerializer(reservation).data)
@@ -1,10 +1,32 @@
-from rest_framework import viewsets, status
-from rest_framework.permissions import IsAuthenticated, IsAdminUser
+from django.db import transaction
+from django.shortcuts import get_object_or_404
+from django_filters.rest_framework import DjangoFilterBackend
+from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import action
+from rest_framework.permissions import IsAuthenticated, IsAdminUser, IsAuthenticatedOrReadOnly
 from rest_framework.response import Response
+from drf_yasg import openapi
 from drf_yasg.utils import swagger_auto_schema
+from ..filters import ProductFilter, StableOrderingFilter, SupplierFilter
 from ..models.suppliers import Suppliers
-from ..serializers.supplier import SupplierSerializer
+from ..pagination import ListPagination, paginated_list_response
+from ..serializers.product import ProductSerializer
+from ..serializers.supplier import SupplierListSerializer, SupplierSerializer
+from ..serializers.sparse import INCLUDE_QUERY_PARAM, get_requested_includes
+from ..services.cache_service import cached_response
+from ..services.etag_service import (
+    evaluate_preconditions,
+    get_instance_validators,
+    get_page_validators,
+    has_preconditions,
+    set_validators,
+)
 from ..services.suppliers_service import (
+    INCLUDED_PRODUCTS_LIMIT,
+    SUPPLIER_STATS_FIELDS,
+    annotate_supplier_stats,
+    prefetch_supplier_products,
+    supplier_products,
     create_supplier,
     get_supplier,
     get_all_suppliers,
@@ -12,18 +34,113 @@ from ..services.suppliers_service import (
     delete_supplier
 )
 
-class SupplierViewSet(viewsets.ViewSet):
+def supplier_page_validators(suppliers, envelope: dict) -> tuple:
+    # Stats and included products change without touching the supplier row.
+    return get_page_validators(suppliers, envelope, [
+        (
+            tuple(getattr(supplier, name, None) for name in SUPPLIER_STATS_FIELDS),
+            [(product.pk, product.updated_at.isoformat(), product.current_quantity)
+             for product in getattr(supplier, 'included_products', [])],
+        )
+        for supplier in suppliers
+    ])
+
+def supplier_product_page_validators(products, envelope: dict) -> tuple:
+    return get_page_validators(products, envelope, [product.current_quantity for product in products])
+
+class SupplierPagination(ListPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+
+
+class SupplierViewSet(viewsets.GenericViewSet):
     queryset = Suppliers.objects.all()
+    serializer_class = SupplierSerializer
     permission_classes = [IsAuthenticated, IsAdminUser]
+    filter_backends = [DjangoFilterBackend, StableOrderingFilter]
+    filterset_class = SupplierFilter
+    ordering = ['id']
+    pagination_class = SupplierPagination
+    include_options = ('stats', 'products')
+
+    def get_permissions(self):
+        # Supplier product listings are catalog reads, open like the product list.
+        if self.action == 'products':
+            self.permission_classes = [IsAuthenticatedOrReadOnly]
+        return super().get_permissions()
+
+    @property
+    def ordering_fields(self):
+        fields = ['name', 'created_at', 'updated_at']
+        if 'stats' in self.get_includes():
+            fields += SUPPLIER_STATS_FIELDS
+        return fields
+
+    def get_includes(self) -> set:
+        if self.action != 'list':
+            return set()
+        return get_requested_includes(self.request, self.include_options)
+
+    def get_queryset(self):
+        queryset = get_all_suppliers()
+        includes = self.get_includes()
+        if 'stats' in includes:
+            queryset = annotate_supplier_stats(queryset)
+        if 'products' in includes:
+            queryset = prefetch_supplier_products(queryset)
+        return queryset
+
+    def get_serializer_class(self):
+        if self.action == 'list':
+            return SupplierListSerializer
+        if self.action == 'products':
+            return ProductSerializer
+        return SupplierSerializer
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['includes'] = self.get_includes()
+        return context
 
     @swagger_auto_schema(
-        operation_description="Retrieve a list of suppliers",
-        responses={200: SupplierSerializer(many=True)}
+        operation_description="Retrieve a page of suppliers, filterable by name/contact_info/created_after/created_before, "
+                              "narrowed with fields=id,name. include=stats adds product_count, total_units and inventory_value; "
+                              f"include=products adds each supplier's first {INCLUDED_PRODUCTS_LIMIT} products by name.",
+        manual_parameters=[
+            openapi.Parameter(INCLUDE_QUERY_PARAM, openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description='Comma-separated: stats, products'),
+        ],
+        responses={200: SupplierListSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        suppliers = get_all_suppliers()
-        serializer = SupplierSerializer(suppliers, many=True)
-        return Response(serializer.data)
+        # Product writes move the aggregates and the included products, so those responses
+        # follow the product namespace too.
+        includes = self.get_includes()
+        namespaces = ['supplier', 'product'] if includes else ['supplier']
+
+        def build_response():
+            queryset = self.filter_queryset(self.get_queryset())
+            return paginated_list_response(self, request, queryset, supplier_page_validators)
+
+        return cached_response(request, namespaces, build_response)
+
+    @swagger_auto_schema(
+        operation_description="Retrieve a page of one supplier's products, filterable and narrowed like the product list",
+        responses={200: ProductSerializer(many=True), 404: 'Not Found'}
+    )
+    @action(detail=True, methods=['get'])
+    def products(self, request, pk=None):
+        def build_response():
+            supplier = get_object_or_404(Suppliers, pk=pk)
+            filterset = ProductFilter(request.query_params, queryset=supplier_products(supplier.pk).order_by('id'),
+                                      request=request)
+            if not filterset.is_valid():
+                raise serializers.ValidationError(filterset.errors)
+            return paginated_list_response(self, request, filterset.qs, supplier_product_page_validators,
+                                           extra=('updated_at', 'stock_shards'))
+
+        return cached_response(request, ['supplier', 'product'], build_response)
 
     @swagger_auto_schema(
         operation_description="Create a new supplier",
@@ -40,9 +157,16 @@ class SupplierViewSet(viewsets.ViewSet):
         responses={200: SupplierSerializer}
     )
     def retrieve(self, request, *args, **kwargs):
-        supplier = get_supplier(kwargs['pk'])
-        serializer = SupplierSerializer(supplier)
-        return Response(serializer.data)
+        def build_response():
+            supplier = get_supplier(kwargs['pk'])
+            etag, last_modified = get_instance_validators(supplier)
+            not_modified = evaluate_preconditions(request, etag, last_modified)
+            if not_modified is not None:
+                return not_modified
+            serializer = SupplierSerializer(supplier, context={'request': request})
+            return set_validators(Response(serializer.data), etag, last_modified)
+
+        return cached_response(request, ['supplier'], build_response)
 
     @swagger_auto_schema(
         operation_description="Update a supplier by ID",
@@ -50,9 +174,7 @@ class SupplierViewSet(viewsets.ViewSet):
         responses={200: SupplierSerializer}
     )
     def update(self, request, *args, **kwargs):
-        supplier = update_supplier(kwargs['pk'], request.data)
-        serializer = SupplierSerializer(supplier)
-        return Response(serializer.data)
+        return self.write_if_unmodified(request, kwargs['pk'], self.apply_update)
 
     @swagger_auto_schema(
         operation_description="Partially update a supplier by ID",
@@ -60,14 +182,31 @@ class SupplierViewSet(viewsets.ViewSet):
         responses={200: SupplierSerializer}
     )
     def partial_update(self, request, *args, **kwargs):
-        supplier = update_supplier(kwargs['pk'], request.data)
-        serializer = SupplierSerializer(supplier)
-        return Response(serializer.data)
+        return self.write_if_unmodified(request, kwargs['pk'], self.apply_update)
 
     @swagger_auto_schema(
         operation_description="Delete a supplier by ID",
         responses={204: 'No Content'}
     )
     def destroy(self, request, *args, **kwargs):
-        delete_supplier(kwargs['pk'])
+        return self.write_if_unmodified(request, kwargs['pk'], self.apply_destroy)
+
+    def apply_update(self, request, pk):
+        supplier = update_supplier(pk, request.data)
+        serializer = SupplierSerializer(supplier)
+        return set_validators(Response(serializer.data), *get_instance_validators(supplier))
+
+    def apply_destroy(self, request, pk):
+        delete_supplier(pk)
         return Response(status=status.HTTP_204_NO_CONTENT)
+
+    def write_if_unmodified(self, request, pk, write):
+        # The supplier stays locked from the If-Match / If-Unmodified-Since check to the write,
+        # so two clients holding the same validator can't both pass.
+        if not has_preconditions(request):
+            return write(request, pk)
+        with transaction.atomic():
+            failed = evaluate_preconditions(request, *get_instance_validators(get_supplier(pk, for_update=True)))
+            if failed is not None:
+                return failed
+            return write(request, pk)
@@ -1,13 +1,41 @@
+from django.db.utils import OperationalError
 from rest_framework import status
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from drf_yasg.utils import swagger_auto_schema
+from drf_yasg import openapi
 from ..models.product import Product
 from ..models.bank_account import BankAccount
 from ..models.user import User
-from ..serializers.transaction import PurchaseSerializer
-from ..services.purchase_service import post_purchase
+from ..models.purchase_job import PurchaseJob
+from ..serializers.transaction import PurchaseSerializer, CartCheckoutSerializer
+from ..serializers.purchase_job import PurchaseJobSerializer
+from ..services.purchase_service import needs_outer_retry, post_purchase, post_cart_purchase
+from ..services.idempotency_service import idempotent_response
+from ..services.purchase_job_service import enqueue_purchase, get_user_purchase_job
+
+idempotency_key_header = openapi.Parameter(
+    'Idempotency-Key',
+    openapi.IN_HEADER,
+    description='Replays the stored response when the same key is sent again',
+    type=openapi.TYPE_STRING,
+    required=False
+)
+
+async_query_param = openapi.Parameter(
+    'async',
+    openapi.IN_QUERY,
+    description='Queue the purchase and return 202 with a job id instead of waiting for it',
+    type=openapi.TYPE_BOOLEAN,
+    required=False
+)
+
+def is_async_request(request) -> bool:
+    return request.query_params.get('async', '').lower() in ('1', 'true', 'yes')
+
+def accepted_job_response(job: PurchaseJob) -> Response:
+    return Response({'job_id': job.pk, 'status': job.status}, status=status.HTTP_202_ACCEPTED)
 
 class PurchaseProductView(APIView):
     permission_classes = [IsAuthenticated]
@@ -15,20 +43,30 @@ class PurchaseProductView(APIView):
     @swagger_auto_schema(
         operation_description="Purchase a product",
         request_body=PurchaseSerializer,
+        manual_parameters=[idempotency_key_header, async_query_param],
         responses={
             200: 'Purchase successful',
+            202: 'Purchase queued',
             400: 'Bad Request',
             404: 'Product not found',
+            409: 'Request with this Idempotency-Key in progress',
+            422: 'Idempotency-Key reused with a different request',
             500: 'Internal Server Error'
         }
     )
     def post(self, request, *args, **kwargs):
+        return idempotent_response(request, lambda: self.purchase(request))
+
+    def purchase(self, request):
         serializer = PurchaseSerializer(data=request.data)
         if serializer.is_valid():
             product_id = serializer.validated_data['product_id']
             quantity = serializer.validated_data['quantity']
             user = request.user
 
+            if is_async_request(request):
+                return accepted_job_response(enqueue_purchase(user, [serializer.validated_data]))
+
             try: 
                 post_purchase(product_id=product_id, quantity=quantity, user=user)
                 return Response(serializer.data, status=status.HTTP_201_CREATED)
@@ -38,6 +76,79 @@ class PurchaseProductView(APIView):
                 return Response({'detail': 'Product not found'}, status=status.HTTP_404_NOT_FOUND)
             except BankAccount.DoesNotExist:
                 return Response({'detail': 'Bank account not found'}, status=status.HTTP_404_NOT_FOUND)
+            except ValueError as e:
+                return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except OperationalError as e:
+                if needs_outer_retry(e):
+                    # Idempotent requests retry their whole transaction; see idempotent_response().
+                    raise
+                return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+            except Exception as e:
+                return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
+        return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class CartCheckoutView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Purchase several products in a single transaction",
+        request_body=CartCheckoutSerializer,
+        manual_parameters=[idempotency_key_header, async_query_param],
+        responses={
+            201: 'Checkout successful',
+            202: 'Checkout queued',
+            400: 'Bad Request',
+            404: 'Product not found',
+            409: 'Request with this Idempotency-Key in progress',
+            422: 'Idempotency-Key reused with a different request',
+            500: 'Internal Server Error'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        return idempotent_response(request, lambda: self.checkout(request))
+
+    def checkout(self, request):
+        serializer = CartCheckoutSerializer(data=request.data)
+        if serializer.is_valid():
+            items = serializer.validated_data['items']
+            user = request.user
+
+            if is_async_request(request):
+                return accepted_job_response(enqueue_purchase(user, items))
+
+            try:
+                purchases, total = post_cart_purchase(user=user, items=items)
+                return Response({
+                    'items': [{'product_id': p.product_id, 'quantity': p.quantity} for p in purchases],
+                    'total': str(total),
+                }, status=status.HTTP_201_CREATED)
+            except Product.DoesNotExist as e:
+                return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+            except BankAccount.DoesNotExist:
+                return Response({'detail': 'Bank account not found'}, status=status.HTTP_404_NOT_FOUND)
+            except ValueError as e:
+                return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+            except OperationalError as e:
+                if needs_outer_retry(e):
+                    # Idempotent requests retry their whole transaction; see idempotent_response().
+                    raise
+                return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
             except Exception as e:
                 return Response({'detail': str(e)}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class PurchaseJobStatusView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Retrieve the state of a queued purchase",
+        responses={200: PurchaseJobSerializer, 404: 'Purchase job not found'}
+    )
+    def get(self, request, pk, *args, **kwargs):
+        try:
+            job = get_user_purchase_job(request.user, pk)
+        except PurchaseJob.DoesNotExist:
+            return Response({'detail': 'Purchase job not found'}, status=status.HTTP_404_NOT_FOUND)
+        return Response(PurchaseJobSerializer(job).data)
@@ -1,21 +1,44 @@
-from rest_framework import viewsets, status
+from rest_framework import serializers, viewsets, status
+from rest_framework.decorators import action
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from django.contrib.auth import authenticate
 from ..models.user import User
-from ..serializers.user import UserSerializer, RegisterSerializer, LoginSerializer, TokenSerializer
+from ..serializers.user import (
+    UserSerializer,
+    RegisterSerializer,
+    LoginSerializer,
+    TokenSerializer,
+    TokenRevokeSerializer,
+    UserProvisionSerializer,
+)
+from ..serializers.sparse import INCLUDE_QUERY_PARAM, get_requested_includes, paginate_sparse
 from django.db.utils import IntegrityError
-from ..services.user_service import create_user, get_user, update_user, delete_user
+from ..services.user_service import (
+    MAX_RECENT_PURCHASES,
+    RECENT_PURCHASES_LIMIT,
+    annotate_purchase_stats,
+    create_user,
+    get_user,
+    update_user,
+    delete_user,
+    prefetch_recent_purchases,
+)
+from ..services.password_hashing_service import shared_password_hashing_pool
+from ..services.user_provisioning_service import provision_users
+from ..services.token_revocation_service import revoke_token, revoke_user_tokens
 from django.core.exceptions import ObjectDoesNotExist
-from drf_yasg.utils import swagger_auto_schema
+from django.shortcuts import get_object_or_404
+from drf_yasg.utils import no_body, swagger_auto_schema
 from drf_yasg import openapi
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework.exceptions import PermissionDenied
 from rest_framework.permissions import IsAuthenticated
-from ..permissions import IsOwner
+from ..permissions import IsAdminUser, IsOwner
 from django_filters.rest_framework import DjangoFilterBackend
-from rest_framework.pagination import PageNumberPagination
+from ..pagination import ListPagination
 
-class UserPagination(PageNumberPagination):
+class UserPagination(ListPagination):
     page_size = 10
     page_size_query_param = 'page_size'
     max_page_size = 100
@@ -26,10 +49,36 @@ class UserViewSet(viewsets.ModelViewSet):
     filter_backends = [DjangoFilterBackend]
     filterset_fields = ['name', 'email']
     pagination_class = UserPagination
+    include_options = ('recent_purchases',)
+
+    def get_includes(self) -> set:
+        if self.action not in ('list', 'retrieve'):
+            return set()
+        return get_requested_includes(self.request, self.include_options)
+
+    def get_recent_purchases_limit(self) -> int:
+        raw = self.request.query_params.get('recent_limit', RECENT_PURCHASES_LIMIT)
+        try:
+            return max(1, min(int(raw), MAX_RECENT_PURCHASES))
+        except ValueError:
+            raise serializers.ValidationError({'recent_limit': ['Must be an integer.']})
+
+    def get_queryset(self):
+        queryset = annotate_purchase_stats(User.objects.order_by('id'))
+        if 'recent_purchases' in self.get_includes():
+            queryset = prefetch_recent_purchases(queryset, self.get_recent_purchases_limit())
+        return queryset
+
+    def get_serializer_context(self):
+        context = super().get_serializer_context()
+        context['includes'] = self.get_includes()
+        return context
 
     def get_permissions(self):
         if self.action in ['update', 'partial_update', 'destroy']:
             self.permission_classes = [IsAuthenticated, IsOwner]
+        elif self.action in ('bulk_provision', 'revoke_tokens'):
+            self.permission_classes = [IsAuthenticated, IsAdminUser]
         else:
             self.permission_classes = [IsAuthenticated]
         return super().get_permissions()
@@ -47,7 +96,7 @@ class UserViewSet(viewsets.ModelViewSet):
         try:
             data = request.data
             user = create_user(data)
-            serializer = self.get_serializer(user)
+            serializer = self.get_serializer(self.get_queryset().get(pk=user.pk))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         except IntegrityError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
@@ -55,7 +104,13 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({'detail': 'Unexpected error.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @swagger_auto_schema(
-        operation_description="Retrieve a user by ID",
+        operation_description="Retrieve a user by ID with purchase stats; include=recent_purchases adds the latest purchases",
+        manual_parameters=[
+            openapi.Parameter(INCLUDE_QUERY_PARAM, openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description='Comma-separated: recent_purchases'),
+            openapi.Parameter('recent_limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                              description=f'Purchases per user, default {RECENT_PURCHASES_LIMIT}, at most {MAX_RECENT_PURCHASES}'),
+        ],
         responses={
             200: openapi.Response('User retrieved successfully', UserSerializer),
             404: 'User not found',
@@ -67,6 +122,8 @@ class UserViewSet(viewsets.ModelViewSet):
             user = self.get_object()
             serializer = self.get_serializer(user)
             return Response(serializer.data)
+        except serializers.ValidationError as e:
+            return Response(e.detail, status=status.HTTP_400_BAD_REQUEST)
         except ObjectDoesNotExist as e:
             return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
         except Exception:
@@ -94,6 +151,9 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
         except IntegrityError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except PermissionDenied:
+            # IsOwner failures must stay 403s.
+            raise
         except Exception:
             return Response({'detail': 'Unexpected error.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -119,6 +179,8 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
         except IntegrityError as e:
             return Response({'detail': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        except PermissionDenied:
+            raise
         except Exception:
             return Response({'detail': 'Unexpected error.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
@@ -137,15 +199,53 @@ class UserViewSet(viewsets.ModelViewSet):
             return Response(status=status.HTTP_204_NO_CONTENT)
         except ObjectDoesNotExist as e:
             return Response({'detail': str(e)}, status=status.HTTP_404_NOT_FOUND)
+        except PermissionDenied:
+            raise
         except Exception:
             return Response({'detail': 'Unexpected error.'}, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
 
     @swagger_auto_schema(
-        operation_description="Retrieve a list of users",
+        operation_description="Retrieve a list of users with purchase stats, optionally narrowed with fields=id,name,email; "
+                              "include=recent_purchases adds each user's latest purchases",
+        manual_parameters=[
+            openapi.Parameter(INCLUDE_QUERY_PARAM, openapi.IN_QUERY, type=openapi.TYPE_STRING, required=False,
+                              description='Comma-separated: recent_purchases'),
+            openapi.Parameter('recent_limit', openapi.IN_QUERY, type=openapi.TYPE_INTEGER, required=False,
+                              description=f'Purchases per user, default {RECENT_PURCHASES_LIMIT}, at most {MAX_RECENT_PURCHASES}'),
+        ],
         responses={200: UserSerializer(many=True)}
     )
     def list(self, request, *args, **kwargs):
-        return super().list(request, *args, **kwargs)
+        page, data = paginate_sparse(self, self.filter_queryset(self.get_queryset()))
+        if data is None:
+            data = self.get_serializer(page, many=True).data
+        return self.get_paginated_response(data)
+
+    @swagger_auto_schema(
+        operation_description="Create up to USER_PROVISIONING_MAX_HTTP_USERS (default 20) accounts in one call; "
+                              "larger batches go through the provision_users management command. Passwords are "
+                              "hashed in parallel; invalid rows and existing emails are reported without stopping the rest",
+        request_body=UserProvisionSerializer,
+        responses={200: 'Provisioning summary', 400: 'Bad Request'}
+    )
+    @action(detail=False, methods=['post'], url_path='bulk-provision')
+    def bulk_provision(self, request):
+        serializer = UserProvisionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        result = provision_users(serializer.validated_data['users'], batch_size=serializer.validated_data['batch_size'],
+                                 executor=shared_password_hashing_pool())
+        return Response(result.as_dict(), status=status.HTTP_200_OK)
+
+    @swagger_auto_schema(
+        operation_description="Revoke every access and refresh token issued to the user so far, e.g. when staff leave",
+        request_body=no_body,
+        responses={200: 'Tokens revoked', 404: 'User not found'}
+    )
+    @action(detail=True, methods=['post'], url_path='revoke-tokens')
+    def revoke_tokens(self, request, pk=None):
+        user = get_object_or_404(User.objects.only('id'), pk=pk)
+        revocation = revoke_user_tokens(user.pk)
+        return Response({'revoked_before': revocation.issued_before}, status=status.HTTP_200_OK)
 
 class RegisterView(APIView):
     @swagger_auto_schema(
@@ -184,3 +284,24 @@ class LoginView(APIView):
             })
             return Response(token_serializer.data, status=status.HTTP_200_OK)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+class TokenRevokeView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    @swagger_auto_schema(
+        operation_description="Log out: revoke the access token used for this request and, if given, a refresh token",
+        request_body=TokenRevokeSerializer,
+        responses={
+            204: 'Tokens revoked',
+            400: 'Bad Request',
+            401: 'Unauthorized'
+        }
+    )
+    def post(self, request, *args, **kwargs):
+        serializer = TokenRevokeSerializer(data=request.data, context={'request': request})
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        revoke_token(request.auth)
+        if 'refresh' in serializer.validated_data:
+            revoke_token(serializer.validated_data['refresh'])
+        return Response(status=status.HTTP_204_NO_CONTENT)
@@ -127,7 +127,7 @@ AUTH_USER_MODEL = 'pharmacy_management_app.User'
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'pharmacy_management_app.authentication.CachedJWTAuthentication',
     ),
 }
 
@@ -144,6 +144,8 @@ SIMPLE_JWT = {
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
     'TOKEN_TYPE_CLAIM': 'token_type',
+    # Checks the in-process revocation list; see services/token_revocation_service.py.
+    'TOKEN_REFRESH_SERIALIZER': 'pharmacy_management_app.serializers.user.RevocationCheckingTokenRefreshSerializer',
 }
 
 SWAGGER_SETTINGS = {
@@ -158,9 +160,46 @@ SWAGGER_SETTINGS = {
     'JSON_EDITOR': True,
 }
 
+CACHES = {
+    'default': env.cache('CACHE_URL', default='locmemcache://'),
+}
+CATALOG_CACHE_ALIAS = env('CATALOG_CACHE_ALIAS', default='default')
+CATALOG_CACHE_TIMEOUT = env.int('CATALOG_CACHE_TIMEOUT', default=300)
+# Each process rebuilds its product name index at least this often, which bounds how long it can
+# miss a rename that never reached it through the catalog cache (e.g. a per-process locmem cache).
+PRODUCT_NAME_INDEX_MAX_AGE = env.int('PRODUCT_NAME_INDEX_MAX_AGE', default=300)
+# Users resolved from JWTs are cached this long. Saves and deletes invalidate the entry at once
+# only where the catalog cache is shared; with a per-process cache such as the default locmem,
+# other workers can keep accepting a deactivated or deleted user for up to this long.
+AUTH_USER_CACHE_TIMEOUT = env.int('AUTH_USER_CACHE_TIMEOUT', default=60)
+
 ADMIN_EMAIL = env('ADMIN_EMAIL', default='admin@example.com')
 ADMIN_PASSWORD = env('ADMIN_PASSWORD', default='adminpassword')
 
+IDEMPOTENCY_KEY_TTL = timedelta(hours=env.int('IDEMPOTENCY_KEY_TTL_HOURS', default=24))
+# How long a request may hold an unfinished key before a retry can take it over.
+IDEMPOTENCY_KEY_LEASE = timedelta(seconds=env.int('IDEMPOTENCY_KEY_LEASE_SECONDS', default=60))
+
+STOCK_RESERVATION_TTL = timedelta(minutes=env.int('STOCK_RESERVATION_TTL_MINUTES', default=15))
+
+# Ledger entries younger than this are left for the next compaction run.
+LEDGER_COMPACTION_SETTLE_TIME = timedelta(seconds=env.int('LEDGER_COMPACTION_SETTLE_SECONDS', default=60))
+
+PURCHASE_JOB_LOCK_TIMEOUT = timedelta(minutes=env.int('PURCHASE_JOB_LOCK_TIMEOUT_MINUTES', default=5))
+PURCHASE_JOB_MAX_ATTEMPTS = env.int('PURCHASE_JOB_MAX_ATTEMPTS', default=3)
+
+# Each process re-reads new token revocations at least this often, even when no version bump
+# reached it through the catalog cache.
+TOKEN_REVOCATION_REFRESH_SECONDS = env.int('TOKEN_REVOCATION_REFRESH_SECONDS', default=5)
+
+# Password hashing processes shared by bulk provisioning requests in each server process; the
+# provision_users command starts its own pool sized to the CPU count instead.
+USER_PROVISIONING_HTTP_WORKERS = env.int('USER_PROVISIONING_HTTP_WORKERS', default=2)
+
+# Largest batch the bulk provisioning endpoint hashes inside the request (roughly half a second of
+# PBKDF2 per account per worker); bigger imports go through the provision_users command.
+USER_PROVISIONING_MAX_HTTP_USERS = env.int('USER_PROVISIONING_MAX_HTTP_USERS', default=20)
+
 
 
 